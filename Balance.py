@@ -0,0 +1,395 @@
+import argparse
+import dataclasses
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+#SDL przechwytuje SIGTERM, a Pool.terminate() konczy nim procesy robocze
+os.environ.setdefault('SDL_NO_SIGNAL_HANDLERS', '1')
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+import pygame
+import Game
+from Benchmark import git_commit, percentile
+from Enemy import ENEMY_DATA
+from Input import FrameInput, InputFrame
+from Settings import *
+from Sprites import WEAPONS, ARMORS, Wall
+from TileGrid import FlowField, OccupancyGrid
+
+BALANCE_MAP: str = 'level2.tmx'
+#co ile krokow symulacji bot zaglada do sklepu
+SHOP_INTERVAL: int = 2 * SIM_RATE
+MOVE_DEADZONE: int = 8
+STUCK_TICKS: int = SIM_RATE // 3
+COIN_PICKUP_DISTANCE: int = 6 * TILE_SIZE
+
+#wartosci bazowe - kazdy zestaw parametrow startuje od nich, nawet gdy proces liczy kilka zestawow po kolei
+BASE_TABLES: Dict[str, Dict[str, Any]] = {
+    'enemies': dict(ENEMY_DATA),
+    'weapons': dict(WEAPONS),
+    'armors': dict(ARMORS)
+}
+TABLES: Dict[str, Dict[str, Any]] = {
+    'enemies': ENEMY_DATA,
+    'weapons': WEAPONS,
+    'armors': ARMORS
+}
+
+
+class BotInput(FrameInput):
+    #prosty gracz: bije najblizszego widocznego wroga, a bez wroga idzie do najblizszej zamknietej skrzyni
+    def __init__(self, seed: Optional[int] = None) -> None:
+        super().__init__()
+        self.rng = random.Random(seed)
+        self.game: Optional[Game.Game] = None
+        self.paths: Optional[FlowField] = None
+        self.goal: Optional[Any] = None
+        self.visited: Set[Any] = set()
+        self.wander: Tuple[int, int] = (0, 0)
+        self.last_pos: Optional[pygame.math.Vector2] = None
+        self.still_ticks = 0
+        self.mouse_down = False
+
+    def attach(self, game: Game.Game) -> None:
+        self.game = game
+        #siatka scian blokujacych gracza (drzwi przechodnie - bot je otwiera), bez warstwy Overhead
+        grid = OccupancyGrid(game.sight_grid.width, game.sight_grid.height)
+        for sprite in game.player_obstacles:
+            if isinstance(sprite, Wall):
+                grid.set_blocked(*grid.tile_at(sprite.rect.topleft))
+        #pole odleglosci od celu po calej mapie, liczone tylko przy zmianie celu
+        self.paths = FlowField(grid, grid.width + grid.height)
+
+    def nearest_enemy(self) -> Optional[Any]:
+        game = self.game
+        player = game.player
+        best, best_distance = None, float('inf')
+        for enemy in game.enemy_sprites:
+            distance = enemy.pos.distance_to(player.pos)
+            if distance < best_distance and distance < enemy.notice_radius:
+                #tuz obok (np. w przejsciu przez drzwi) linia wzroku nie ma znaczenia
+                if distance < 2 * TILE_SIZE or game.sight_grid.line_of_sight(player.hitbox.center, enemy.hitbox.center):
+                    best, best_distance = enemy, distance
+        return best
+
+    def nearest_coin(self) -> Optional[Any]:
+        player = self.game.player
+        coins = [coin for coin in self.game.coin_sprites
+                 if 0 < player.pos.distance_to(coin.rect.center) < COIN_PICKUP_DISTANCE]
+        if not coins:
+            return None
+        return min(coins, key=lambda coin: player.pos.distance_to(coin.rect.center))
+
+    def next_goal(self) -> Optional[Any]:
+        player = self.game.player
+        goals = [chest for chest in self.game.chest_sprites if not chest.is_open and chest not in self.visited]
+        if not goals:
+            return None
+        return min(goals, key=lambda chest: player.pos.distance_to(chest.rect.center))
+
+    def door_nearby(self) -> bool:
+        area = self.game.player.hitbox.inflate(40, 40)
+        return any(not door.is_open and door.hitbox.colliderect(area) for door in self.game.door_sprites)
+
+    @staticmethod
+    def move_keys(direction: pygame.math.Vector2, keys: Set[int]) -> None:
+        if abs(direction.x) > MOVE_DEADZONE:
+            keys.add(pygame.K_d if direction.x > 0 else pygame.K_a)
+        if abs(direction.y) > MOVE_DEADZONE:
+            keys.add(pygame.K_s if direction.y > 0 else pygame.K_w)
+
+    def next_tick(self) -> None:
+        if self.game is None or self.game.player is None:
+            return
+        game = self.game
+        player = game.player
+        offset = game.all_sprites.offset
+
+        if self.last_pos is not None and player.pos.distance_to(self.last_pos) < 1:
+            self.still_ticks += 1
+        else:
+            self.still_ticks = 0
+        self.last_pos = pygame.math.Vector2(player.pos)
+
+        keys: Set[int] = set()
+        mouse = InputFrame().mouse_pos
+        attack = False
+        target = self.nearest_enemy()
+
+        if target is not None:
+            delta = target.pos - player.pos
+            mouse = (int(target.pos.x - offset.x), int(target.pos.y - offset.y))
+            if player.inventory['weapon'] == 'bow':
+                attack = True
+                #lucznik trzyma dystans
+                if delta.length() < 200:
+                    delta = -delta
+                elif delta.length() < 300:
+                    delta = pygame.math.Vector2(0, 0)
+            else:
+                attack = delta.length() < player.get_effective_range()
+            self.move_keys(delta, keys)
+        else:
+            if self.goal is None or self.goal.is_open or not self.goal.alive():
+                if self.goal is not None:
+                    self.visited.add(self.goal)
+                self.goal = self.next_goal()
+
+            goal = self.goal
+            direction = None
+            coin = self.nearest_coin()
+            if coin is not None:
+                direction = (pygame.math.Vector2(coin.rect.center) - player.pos).normalize()
+            elif goal is not None:
+                if player.hitbox.inflate(40, 40).colliderect(goal.hitbox):
+                    keys.add(pygame.K_SPACE)
+                    self.visited.add(goal)
+                    self.goal = None
+                else:
+                    self.paths.update(self.paths.grid.tile_at(goal.rect.center))
+                    direction = self.paths.direction(player.pos)
+                    if direction is None:
+                        direction = pygame.math.Vector2(goal.rect.center) - player.pos
+                        if direction.length() > 3 * TILE_SIZE:
+                            #cel nieosiagalny - szukamy innego
+                            self.visited.add(goal)
+                            self.goal = None
+                            direction = None
+                        elif direction.length_squared() > 0:
+                            direction = direction.normalize()
+
+            if direction is not None and self.still_ticks <= STUCK_TICKS:
+                self.move_keys(direction * TILE_SIZE, keys)
+            else:
+                if self.still_ticks > STUCK_TICKS or self.wander == (0, 0):
+                    self.wander = (self.rng.choice((-1, 0, 1)), self.rng.choice((-1, 0, 1)))
+                    self.still_ticks = 0
+                self.move_keys(pygame.math.Vector2(self.wander) * TILE_SIZE, keys)
+
+        #zamkniete drzwi na drodze otwiera spacja, jak w grze
+        if self.still_ticks > STUCK_TICKS // 2 and self.door_nearby():
+            keys.add(pygame.K_SPACE)
+
+        #klikniecie to wcisniecie i puszczenie, atak co druga klatke
+        events = []
+        was_down = self.mouse_down
+        self.mouse_down = attack and not was_down
+        if was_down and not self.mouse_down:
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONUP, button=1, pos=mouse))
+
+        self.set_frame(InputFrame(frozenset(keys), (self.mouse_down, False, False), mouse, tuple(events)))
+
+
+def apply_parameters(parameters: Dict[str, Any]) -> None:
+    for table, entries in TABLES.items():
+        base = BASE_TABLES[table]
+        entries.clear()
+        entries.update(base)
+        for name, fields in parameters.get(table, {}).items():
+            if name not in base:
+                raise KeyError(f"Unknown {table} entry: {name}")
+            entries[name] = dataclasses.replace(base[name], **fields)
+
+
+def apply_upgrade_costs(game: Game.Game, parameters: Dict[str, Any]) -> None:
+    upgrades = parameters.get('upgrades', {})
+    for option in game.upgrade_menu.stats_options:
+        option.update(upgrades.get(option['name'], {}))
+
+
+#zakupy przez UpgradeMenu, zeby obowiazywaly te same ceny i efekty co w grze
+def shop(game: Game.Game) -> int:
+    menu = game.upgrade_menu
+    player = game.player
+    money_before = player.money
+
+    def buy(state: str, name: str) -> None:
+        menu.state = state
+        for item in menu.get_current_options():
+            if item['name'] == name:
+                menu.trigger_item(item)
+                return
+
+    melee = [name for name, data in WEAPONS.items() if data.range >= 0]
+    current = WEAPONS[player.inventory['weapon']].damage
+    for name in melee:
+        data = WEAPONS[name]
+        if name not in player.owned_weapons and data.damage > current and data.cost <= player.money:
+            buy('weapon', name)
+            break
+
+    for name, data in ARMORS.items():
+        if name not in player.owned_armors and data.cost <= player.money:
+            buy('armor', name)
+
+    stat = 'health' if player.stats['health'] < 60 else 'attack'
+    for option in menu.stats_options:
+        if option['name'] == stat and option['cost'] <= player.money:
+            buy('stats', stat)
+
+    menu.state = 'main'
+    return money_before - player.money
+
+
+def run_playthrough(job: Tuple[str, Dict[str, Any], int, int]) -> Dict[str, Any]:
+    set_name, parameters, seed, ticks = job
+    apply_parameters(parameters)
+
+    random.seed(seed)
+    bot = BotInput(seed)
+    game = Game.Game(headless=True, input_source=bot, map_name=BALANCE_MAP)
+    apply_upgrade_costs(game, parameters)
+
+    dt = SIM_STEP
+    done = 0
+    spent = 0
+    seconds = 0.0
+    cpu_start = time.process_time()
+    while done < ticks and not (game.game_over or game.victory):
+        result = game.run_headless(min(SHOP_INTERVAL, ticks - done), dt, restart_on_end=False)
+        done += result['ticks']
+        seconds += result['seconds']
+        if not (game.game_over or game.victory):
+            spent += shop(game)
+
+    return {
+        'set': set_name,
+        'seed': seed,
+        'ticks': done,
+        'seconds': seconds,
+        'cpu_seconds': time.process_time() - cpu_start,
+        'sim_seconds': done * dt,
+        'died': game.game_over,
+        'victory': game.victory,
+        'kills': list(game.kill_log),
+        'gold_earned': game.player.money + spent,
+        'gold_spent': spent
+    }
+
+
+def aggregate(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ttk = [ms for run in runs for _, ms in run['kills']]
+    ttk_by_enemy: Dict[str, List[int]] = defaultdict(list)
+    for run in runs:
+        for name, ms in run['kills']:
+            ttk_by_enemy[name].append(ms)
+    sim_minutes = sum(run['sim_seconds'] for run in runs) / 60
+    #czas procesora, nie zegar - przy wiekszej liczbie procesow niz rdzeni zegar sie rozciaga
+    seconds = sum(run['cpu_seconds'] for run in runs)
+    ticks = sum(run['ticks'] for run in runs)
+
+    def ttk_stats(samples: List[int]) -> Dict[str, float]:
+        return {
+            'count': len(samples),
+            'mean': sum(samples) / len(samples) if samples else 0.0,
+            'p50': percentile(samples, 0.50),
+            'p90': percentile(samples, 0.90)
+        }
+
+    return {
+        'runs': len(runs),
+        'death_rate': sum(run['died'] for run in runs) / len(runs),
+        'victory_rate': sum(run['victory'] for run in runs) / len(runs),
+        'survival_seconds': sum(run['sim_seconds'] for run in runs) / len(runs),
+        'kills_per_minute': len(ttk) / sim_minutes if sim_minutes else 0.0,
+        'gold_per_minute': sum(run['gold_earned'] for run in runs) / sim_minutes if sim_minutes else 0.0,
+        'ticks_per_second': ticks / seconds if seconds > 0 else 0.0,
+        'ttk_ms': ttk_stats(ttk),
+        'ttk_ms_by_enemy': {name: ttk_stats(samples) for name, samples in sorted(ttk_by_enemy.items())}
+    }
+
+
+def load_parameter_sets(path: Optional[str]) -> List[Dict[str, Any]]:
+    sets: List[Dict[str, Any]] = []
+    if path:
+        with open(path) as file:
+            data = json.load(file)
+        sets = data['sets'] if isinstance(data, dict) else data
+    if not any(entry['name'] == 'baseline' for entry in sets):
+        sets.insert(0, {'name': 'baseline'})
+    return sets
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    meta = report['meta']
+    print(f"\n{meta['runs']} runs on {meta['workers']} workers in {meta['wall_seconds']:.1f} s, "
+          f"{meta['ticks_per_second']:.0f} ticks/s total, parallel efficiency {meta['efficiency']:.0%}")
+    for name, stats in report['sets'].items():
+        print(f"\n{name}: {stats['runs']} runs")
+        print(f"  death rate      {stats['death_rate']:6.1%}   survival {stats['survival_seconds']:7.1f} s   "
+              f"victory {stats['victory_rate']:6.1%}")
+        print(f"  kills/min       {stats['kills_per_minute']:7.2f}   gold/min {stats['gold_per_minute']:8.1f}")
+        print(f"  time-to-kill    mean {stats['ttk_ms']['mean']:6.0f} ms  p50 {stats['ttk_ms']['p50']:6.0f} ms  "
+              f"p90 {stats['ttk_ms']['p90']:6.0f} ms")
+        for enemy, ttk in stats['ttk_ms_by_enemy'].items():
+            print(f"    {enemy:<12} {ttk['count']:5d} kills  p50 {ttk['p50']:6.0f} ms")
+        print(f"  ticks/s         {stats['ticks_per_second']:7.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Balance sweep: headless bot playthroughs over parameter sets')
+    parser.add_argument('--params', default=None,
+                        help='JSON file with parameter sets (enemies/weapons/armors/upgrades overrides)')
+    parser.add_argument('--seeds', type=int, default=16, help='playthroughs per parameter set')
+    parser.add_argument('--first-seed', type=int, default=1)
+    parser.add_argument('--ticks', type=int, default=SIM_RATE * 180, help='tick limit per playthrough')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--out', default='balance_output.json')
+    args = parser.parse_args()
+
+    sets = load_parameter_sets(args.params)
+    jobs = [(entry['name'], entry, seed, args.ticks)
+            for entry in sets for seed in range(args.first_seed, args.first_seed + args.seeds)]
+
+    #procesy niezalezne, kazdy z wlasnym pygame - skaluje sie z liczba rdzeni
+    runs: List[Dict[str, Any]] = []
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        for run in pool.imap_unordered(run_playthrough, jobs):
+            runs.append(run)
+            print(f"\r{len(runs)}/{len(jobs)} runs", end='', file=sys.stderr)
+        pool.close()
+        pool.join()
+    wall = time.perf_counter() - start
+    print(file=sys.stderr)
+
+    by_set: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for run in runs:
+        by_set[run['set']].append(run)
+    busy = sum(run['cpu_seconds'] for run in runs)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'map': BALANCE_MAP,
+            'workers': args.workers,
+            'runs': len(runs),
+            'ticks_limit': args.ticks,
+            'wall_seconds': wall,
+            'ticks_per_second': sum(run['ticks'] for run in runs) / wall if wall > 0 else 0.0,
+            'efficiency': busy / (wall * args.workers) if wall > 0 else 0.0
+        },
+        'parameters': sets,
+        'sets': {entry['name']: aggregate(by_set[entry['name']]) for entry in sets}
+    }
+
+    with open(args.out, 'w') as file:
+        json.dump(report, file, indent=2)
+    print_report(report)
+    print(f"\nreport written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
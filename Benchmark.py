@@ -0,0 +1,297 @@
+import argparse
+import functools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+import pygame
+import Game
+from Camera import Camera
+from Enemy import Enemy, ENEMY_DATA
+from Entity import Entity
+from Hud import HUD
+from Input import RandomInput
+from MapCache import cache_path
+from Settings import *
+from Sprites import Player, Projectile
+from Support import sim_clock
+
+MAPS: List[str] = ['level2.tmx', 'maps/level1.tmx']
+PHASES: List[str] = ['player', 'ai', 'collision', 'projectiles', 'other', 'draw', 'hud', 'frame']
+
+
+class PhaseTimer:
+    #mierzy czas wlasny (bez zagniezdzonych faz) wybranych metod gry
+    def __init__(self) -> None:
+        self.totals: Dict[str, float] = defaultdict(float)
+        self.stack: List[float] = []
+        self.patched: List[Tuple[Any, str, Callable]] = []
+
+    def wrap(self, owner: Any, attr: str, phase: str) -> None:
+        original = owner.__dict__[attr]
+        timer = self
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            timer.stack.append(0.0)
+            try:
+                return original(*args, **kwargs)
+            finally:
+                child = timer.stack.pop()
+                elapsed = time.perf_counter() - start
+                timer.totals[phase] += elapsed - child
+                if timer.stack:
+                    timer.stack[-1] += elapsed
+
+        setattr(owner, attr, timed)
+        self.patched.append((owner, attr, original))
+
+    def restore(self) -> None:
+        for owner, attr, original in reversed(self.patched):
+            setattr(owner, attr, original)
+        self.patched.clear()
+
+    def take(self) -> Dict[str, float]:
+        totals = dict(self.totals)
+        self.totals.clear()
+        return totals
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    millis = [sample * 1000 for sample in samples]
+    return {
+        'mean': sum(millis) / len(millis) if millis else 0.0,
+        'p50': percentile(millis, 0.50),
+        'p90': percentile(millis, 0.90),
+        'p99': percentile(millis, 0.99),
+        'max': max(millis) if millis else 0.0
+    }
+
+
+#mapa syntetyczna: kopia mapy zrodlowej powielona scale x scale razy
+def build_synthetic_map(source: str, scale: int, directory: str) -> str:
+    tree = ET.parse(source)
+    root = tree.getroot()
+    width = int(root.get('width'))
+    height = int(root.get('height'))
+    tile_w = int(root.get('tilewidth'))
+    tile_h = int(root.get('tileheight'))
+
+    for tileset in root.findall('tileset'):
+        tileset_source = tileset.get('source')
+        if tileset_source:
+            tileset.set('source', os.path.abspath(os.path.join(os.path.dirname(source), tileset_source)))
+
+    for layer in root.findall('layer'):
+        data = layer.find('data')
+        rows = [row.rstrip(',') for row in data.text.strip().splitlines()]
+        tiled_rows = [','.join([row] * scale) for row in rows] * scale
+        data.text = '\n' + ',\n'.join(tiled_rows) + '\n'
+        layer.set('width', str(width * scale))
+        layer.set('height', str(height * scale))
+
+    next_id = int(root.get('nextobjectid', '1'))
+    for group in root.findall('objectgroup'):
+        originals = list(group.findall('object'))
+        for copy_y in range(scale):
+            for copy_x in range(scale):
+                if copy_x == 0 and copy_y == 0:
+                    continue
+                for obj in originals:
+                    clone = ET.SubElement(group, 'object', dict(obj.attrib))
+                    clone.set('id', str(next_id))
+                    clone.set('x', str(float(obj.get('x')) + copy_x * width * tile_w))
+                    clone.set('y', str(float(obj.get('y')) + copy_y * height * tile_h))
+                    next_id += 1
+
+    root.set('width', str(width * scale))
+    root.set('height', str(height * scale))
+    root.set('nextobjectid', str(next_id))
+
+    name = f"{os.path.splitext(os.path.basename(source))[0]}_x{scale}.tmx"
+    path = os.path.join(directory, name)
+    tree.write(path, encoding='UTF-8', xml_declaration=True)
+    return path
+
+
+def top_up_enemies(game: Game.Game, target: int, rng: random.Random) -> None:
+    grid = game.sight_grid
+    open_tiles = [(x, y) for y in range(grid.height) for x in range(grid.width) if not grid.is_blocked(x, y)]
+    names = list(ENEMY_DATA.keys())
+    weights = [ENEMY_DATA[name].spawn_weigt for name in names]
+
+    while len(game.enemy_sprites) < target and open_tiles:
+        x, y = rng.choice(open_tiles)
+        game.spawn_enemy((x * TILE_SIZE, y * TILE_SIZE), rng.choices(names, weights=weights, k=1)[0])
+
+
+def run_scenario(map_path: str, label: str, enemies: int, ticks: int, warmup: int,
+                 seed: int, dt: float) -> Dict[str, Any]:
+    random.seed(seed)
+    game = Game.Game(headless=True, input_source=RandomInput(seed), map_name=map_path)
+    top_up_enemies(game, enemies, random.Random(seed))
+    enemies_start = len(game.enemy_sprites)
+    #gracz niesmiertelny, zeby obciazenie bylo stale przez caly pomiar
+    game.player.stats['health'] = 10 ** 9
+
+    timer = PhaseTimer()
+    timer.wrap(Player, 'update', 'player')
+    timer.wrap(Enemy, 'update', 'ai')
+    timer.wrap(Entity, 'collision', 'collision')
+    timer.wrap(Projectile, 'update', 'projectiles')
+    timer.wrap(Camera, 'custom_draw', 'draw')
+    timer.wrap(HUD, 'display', 'hud')
+
+    samples: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+    started = 0.0
+    try:
+        for tick in range(warmup + ticks):
+            if tick == warmup:
+                started = time.perf_counter()
+            frame_start = time.perf_counter()
+
+            sim_clock.advance(dt)
+            game.input.next_tick()
+            game.events()
+            update_start = time.perf_counter()
+            game.update(dt)
+            game.all_sprites.update_offset(game.player)
+            update_time = time.perf_counter() - update_start
+
+            game.screen.fill(BLACK)
+            game.all_sprites.custom_draw(game.player)
+            game.hud.display()
+            frame_time = time.perf_counter() - frame_start
+
+            totals = timer.take()
+            if tick < warmup:
+                continue
+            for phase in ('player', 'ai', 'collision', 'projectiles', 'draw', 'hud'):
+                samples[phase].append(totals.get(phase, 0.0))
+            inner = sum(totals.get(phase, 0.0) for phase in ('player', 'ai', 'collision', 'projectiles'))
+            samples['other'].append(max(0.0, update_time - inner))
+            samples['frame'].append(frame_time)
+    finally:
+        timer.restore()
+
+    elapsed = time.perf_counter() - started
+    return {
+        'name': label,
+        'map': map_path,
+        'map_tiles': [game.sight_grid.width, game.sight_grid.height],
+        'enemies_target': enemies,
+        'enemies_start': enemies_start,
+        'enemies_end': len(game.enemy_sprites),
+        'sprites': len(game.all_sprites),
+        'ticks': ticks,
+        'ticks_per_second': ticks / elapsed if elapsed > 0 else 0.0,
+        'phases': {phase: summarize(values) for phase, values in samples.items()}
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    previous = {}
+    if baseline:
+        previous = {scenario['name']: scenario for scenario in baseline['scenarios']}
+
+    for scenario in report['scenarios']:
+        print(f"\n{scenario['name']}: {scenario['enemies_start']} enemies, "
+              f"{scenario['map_tiles'][0]}x{scenario['map_tiles'][1]} tiles, "
+              f"{scenario['ticks_per_second']:.0f} ticks/s")
+        old = previous.get(scenario['name'])
+        for phase in PHASES:
+            stats = scenario['phases'][phase]
+            line = (f"  {phase:<12} p50 {stats['p50']:7.3f} ms  p90 {stats['p90']:7.3f} ms  "
+                    f"p99 {stats['p99']:7.3f} ms")
+            if old and old['phases'][phase]['p50'] > 0:
+                line += f"  ({stats['p50'] / old['phases'][phase]['p50']:.2f}x vs baseline p50)"
+            print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Frame update and draw benchmark')
+    parser.add_argument('--ticks', type=int, default=600)
+    parser.add_argument('--warmup', type=int, default=60)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--enemies', type=int, nargs='+', default=[0, 100, 300],
+                        help='enemy counts to top up to (0 keeps the random spawns only)')
+    parser.add_argument('--scales', type=int, nargs='+', default=[2, 4],
+                        help='synthetic map sizes as multiples of level2.tmx')
+    parser.add_argument('--out', default='bench_output.json')
+    parser.add_argument('--compare', default=None, help='earlier JSON report to compare against')
+    args = parser.parse_args()
+
+    dt = 1 / FPS
+    scenarios = []
+    with tempfile.TemporaryDirectory() as directory:
+        maps = [(path, os.path.splitext(os.path.basename(path))[0]) for path in MAPS]
+        for scale in args.scales:
+            path = build_synthetic_map(DEFAULT_MAP, scale, directory)
+            maps.append((path, os.path.splitext(os.path.basename(path))[0]))
+
+        for map_path, map_label in maps:
+            for enemies in args.enemies:
+                label = f"{map_label}/enemies={enemies}"
+                print(f"running {label}...", file=sys.stderr)
+                scenarios.append(run_scenario(map_path, label, enemies, args.ticks, args.warmup, args.seed, dt))
+
+        #skompilowane kopie map tymczasowych nie sa potrzebne po pomiarze
+        for map_path, _ in maps[len(MAPS):]:
+            if os.path.exists(cache_path(map_path)):
+                os.remove(cache_path(map_path))
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'ticks': args.ticks,
+            'dt': dt
+        },
+        'scenarios': scenarios
+    }
+
+    with open(args.out, 'w') as file:
+        json.dump(report, file, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print_report(report, baseline)
+    print(f"\nreport written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
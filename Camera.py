@@ -1,69 +1,243 @@
-import pygame
-from Settings import *
-
-class Camera(pygame.sprite.Group):
-    def __init__(self):
-        super().__init__()
-        self.screen = pygame.display.get_surface()
-        self.offset = pygame.math.Vector2(0, 0)
-        self.center = (WIDTH / 2, HEIGHT / 2)
-        self.map_width = MAP_WIDTH
-        self.map_height = MAP_HEIGHT
-
-    def set_limits(self, width, height):
-        self.map_width = width
-        self.map_height = height
-
-    def custom_draw(self, player):
-        self.offset.x = player.rect.centerx - self.center[0]
-        self.offset.y = player.rect.centery - self.center[1]
-
-        if self.offset.x < 0: self.offset.x = 0
-        if self.offset.y < 0: self.offset.y = 0
-
-        right_limit = max(self.map_width - WIDTH, 0)
-        if self.offset.x > right_limit:
-            self.offset.x = right_limit
-
-        bottom_limit = max(self.map_height - HEIGHT, 0)
-        if self.offset.y > bottom_limit:
-            self.offset.y = bottom_limit
-
-        for sprite in self.sprites():
-            if sprite.z == LAYERS['floor']:
-                offset_pos = sprite.rect.topleft - self.offset
-                if -TILE_SIZE < offset_pos.x < WIDTH and -TILE_SIZE < offset_pos.y < HEIGHT:
-                    self.screen.blit(sprite.image, offset_pos)
-
-        main_sprites = [s for s in self.sprites() if s.z == LAYERS['main']]
-        main_sprites.sort(key=lambda s: s.rect.bottom)
-
-        for sprite in main_sprites:
-            offset_pos = sprite.rect.topleft - self.offset
-            if -TILE_SIZE < offset_pos.x < WIDTH and -TILE_SIZE < offset_pos.y < HEIGHT:
-                self.screen.blit(sprite.image, offset_pos)
-
-        for sprite in self.sprites():
-            if sprite.z == LAYERS['overhead_always']:
-                offset_pos = sprite.rect.topleft - self.offset
-                if -TILE_SIZE < offset_pos.x < WIDTH and -TILE_SIZE < offset_pos.y < HEIGHT:
-                    self.screen.blit(sprite.image, offset_pos)
-
-        for sprite in self.sprites():
-            if sprite.z == LAYERS['doors']:
-                offset_pos = sprite.rect.topleft - self.offset
-                if -TILE_SIZE < offset_pos.x < WIDTH and -TILE_SIZE < offset_pos.y < HEIGHT:
-                    self.screen.blit(sprite.image, offset_pos)
-
-        if player.hit:
-            attack_range = player.get_effective_range()
-            if attack_range > 0:
-                circle_surf = pygame.Surface((attack_range * 2 + 4, attack_range * 2 + 4), pygame.SRCALPHA)
-                center = (attack_range + 2, attack_range + 2)
-                pygame.draw.circle(circle_surf, (255, 255, 255, 80), center, attack_range, 1)
-
-                draw_pos = player.rect.center - self.offset
-                draw_pos.x -= (attack_range + 2)
-                draw_pos.y -= (attack_range + 2)
-
+import pygame
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+from Settings import *
+from TileGrid import TileMap
+
+class Camera(pygame.sprite.Group):
+    def __init__(self):
+        super().__init__()
+        self.screen = pygame.display.get_surface()
+        #offset - kamera symulacji (LOD, celowanie), draw_offset - kamera klatki po interpolacji
+        self.offset = pygame.math.Vector2(0, 0)
+        self.draw_offset = pygame.math.Vector2(0, 0)
+        self.center = (WIDTH / 2, HEIGHT / 2)
+        self.map_width = MAP_WIDTH
+        self.map_height = MAP_HEIGHT
+
+        self.chunk_pixels = CHUNK_SIZE * TILE_SIZE
+        self.floor_chunks: Dict[Tuple[int, int], pygame.Surface] = {}
+        self.overhead_chunks: Dict[Tuple[int, int], pygame.Surface] = {}
+        self.tilemap: Optional[TileMap] = None
+
+        #kolejnosc rysowania: numer dodania rozstrzyga remisy tak jak kolejnosc w grupie
+        self.draw_order: Dict[pygame.sprite.Sprite, int] = {}
+        self.next_order = 0
+        self.pending: List[pygame.sprite.Sprite] = []
+        self.sprite_bucket: Dict[pygame.sprite.Sprite, List[pygame.sprite.Sprite]] = {}
+        self.layer_sprites: Dict[int, List[pygame.sprite.Sprite]] = {}
+        #statyczne sprite'y warstwy main posortowane raz po (rect.bottom, kolejnosc)
+        self.static_main: List[pygame.sprite.Sprite] = []
+        self.static_keys: List[Tuple[int, int]] = []
+        self.static_max_height = 0
+        self.dynamic_main: List[pygame.sprite.Sprite] = []
+        #ruchome sprite'y z pozostalych warstw (do interpolacji), podzial robiony raz w sort_pending
+        self.dynamic_layers: List[pygame.sprite.Sprite] = []
+        #pozycje z poczatku ostatniego kroku symulacji, do interpolacji przy rysowaniu
+        self.previous: Dict[pygame.sprite.Sprite, Tuple[int, int]] = {}
+        self.alpha: float = 1.0
+
+    def set_limits(self, width, height):
+        self.map_width = width
+        self.map_height = height
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.draw_order[sprite] = self.next_order
+        self.next_order += 1
+        self.pending.append(sprite)
+        #bez rysowania (tryb headless) lista nie moze rosnac w nieskonczonosc
+        if len(self.pending) > 2 * len(self.draw_order) + 64:
+            self.pending = [s for s in self.pending if s in self.draw_order and s not in self.sprite_bucket]
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        order = self.draw_order.pop(sprite, None)
+        self.previous.pop(sprite, None)
+        bucket = self.sprite_bucket.pop(sprite, None)
+        if bucket is None:
+            return
+        if bucket is self.static_main:
+            index = bisect_left(self.static_keys, (sprite.rect.bottom, order))
+            del self.static_main[index]
+            del self.static_keys[index]
+        else:
+            bucket.remove(sprite)
+            if bucket is not self.dynamic_main and not getattr(sprite, 'is_static', False):
+                self.dynamic_layers.remove(sprite)
+
+    #z jest ustawiane po dodaniu do grupy, wiec przydzial do list odkladamy do rysowania
+    def sort_pending(self) -> None:
+        for sprite in self.pending:
+            #usuniete przed rysowaniem albo dodane dwa razy
+            if sprite not in self.draw_order or sprite in self.sprite_bucket:
+                continue
+            if sprite.z == LAYERS['main']:
+                if getattr(sprite, 'is_static', False):
+                    key = (sprite.rect.bottom, self.draw_order[sprite])
+                    index = bisect_right(self.static_keys, key)
+                    self.static_keys.insert(index, key)
+                    self.static_main.insert(index, sprite)
+                    self.static_max_height = max(self.static_max_height, sprite.rect.height)
+                    bucket = self.static_main
+                else:
+                    bucket = self.dynamic_main
+                    bucket.append(sprite)
+            else:
+                bucket = self.layer_sprites.setdefault(sprite.z, [])
+                bucket.append(sprite)
+                if not getattr(sprite, 'is_static', False):
+                    self.dynamic_layers.append(sprite)
+            self.sprite_bucket[sprite] = bucket
+        self.pending.clear()
+
+    def visible_main(self) -> List[pygame.sprite.Sprite]:
+        order = self.draw_order
+        top = self.draw_offset.y - TILE_SIZE
+        bottom = self.draw_offset.y + HEIGHT
+
+        first = bisect_left(self.static_keys, (int(top), -1))
+        last = bisect_left(self.static_keys, (int(bottom) + self.static_max_height + 1, -1))
+        visible = [sprite for sprite in self.static_main[first:last] if self.on_screen(sprite)]
+
+        #lista dynamiczna jest prawie posortowana z poprzedniej klatki, timsort robi to w O(n)
+        self.dynamic_main.sort(key=lambda sprite: (sprite.rect.bottom, order[sprite]))
+        visible += [sprite for sprite in self.dynamic_main if self.on_screen(sprite)]
+        #dwa posortowane odcinki - sort tylko je scala
+        visible.sort(key=lambda sprite: (sprite.rect.bottom, order[sprite]))
+        return visible
+
+    def on_screen(self, sprite) -> bool:
+        x = sprite.rect.left - self.draw_offset.x
+        y = sprite.rect.top - self.draw_offset.y
+        return -TILE_SIZE < x < WIDTH and -TILE_SIZE < y < HEIGHT
+
+    #statyczne sprite'y sie nie ruszaja, wiec zapamietujemy tylko dynamiczne
+    def store_previous(self) -> None:
+        previous = self.previous
+        previous.clear()
+        for sprite in self.dynamic_main:
+            previous[sprite] = sprite.rect.topleft
+        for sprite in self.dynamic_layers:
+            previous[sprite] = sprite.rect.topleft
+
+    def interpolated(self, sprite) -> Tuple[float, float]:
+        x, y = sprite.rect.topleft
+        previous = self.previous.get(sprite)
+        if previous is not None and self.alpha < 1:
+            dx, dy = x - previous[0], y - previous[1]
+            #skok (teleport, odrodzenie) rysujemy od razu w nowym miejscu
+            if abs(dx) < TILE_SIZE and abs(dy) < TILE_SIZE:
+                x = previous[0] + dx * self.alpha
+                y = previous[1] + dy * self.alpha
+        return x, y
+
+    def draw_position(self, sprite) -> Tuple[float, float]:
+        x, y = self.interpolated(sprite)
+        return x - self.draw_offset.x, y - self.draw_offset.y
+
+    def set_tilemap(self, tilemap: Optional[TileMap]) -> None:
+        self.tilemap = tilemap
+
+    def draw_tiles(self, z: int) -> None:
+        if self.tilemap:
+            self.tilemap.draw(self.screen, z, self.draw_offset)
+
+    #sklejanie statycznych kafelkow w duze powierzchnie, rysowane potem tylko widoczne fragmenty
+    def bake_static_layers(self) -> None:
+        self.floor_chunks.clear()
+        self.overhead_chunks.clear()
+
+        for sprite in self.sprites():
+            #tylko kafelki bez wlasnej logiki update, reszta rysowana normalnie
+            if type(sprite).update is not pygame.sprite.Sprite.update:
+                continue
+            if sprite.z == LAYERS['floor']:
+                chunks = self.floor_chunks
+            elif sprite.z == LAYERS['overhead_always']:
+                chunks = self.overhead_chunks
+            else:
+                continue
+
+            key = (sprite.rect.x // self.chunk_pixels, sprite.rect.y // self.chunk_pixels)
+            chunk = chunks.get(key)
+            if chunk is None:
+                chunk = pygame.Surface((self.chunk_pixels, self.chunk_pixels), pygame.SRCALPHA)
+                chunks[key] = chunk
+
+            chunk.blit(sprite.image, (sprite.rect.x - key[0] * self.chunk_pixels,
+                                      sprite.rect.y - key[1] * self.chunk_pixels))
+            self.remove(sprite)
+
+    def draw_chunks(self, chunks: Dict[Tuple[int, int], pygame.Surface]) -> None:
+        if not chunks:
+            return
+
+        first_x = int(self.draw_offset.x // self.chunk_pixels)
+        first_y = int(self.draw_offset.y // self.chunk_pixels)
+        last_x = int((self.draw_offset.x + WIDTH) // self.chunk_pixels)
+        last_y = int((self.draw_offset.y + HEIGHT) // self.chunk_pixels)
+
+        for cy in range(first_y, last_y + 1):
+            for cx in range(first_x, last_x + 1):
+                chunk = chunks.get((cx, cy))
+                if chunk:
+                    self.screen.blit(chunk, (cx * self.chunk_pixels - self.draw_offset.x,
+                                             cy * self.chunk_pixels - self.draw_offset.y))
+
+    def draw_layer(self, z: int) -> None:
+        for sprite in self.layer_sprites.get(z, ()):
+            if self.on_screen(sprite):
+                self.screen.blit(sprite.image, self.draw_position(sprite))
+
+    def follow(self, offset: pygame.math.Vector2, center_x: float, center_y: float) -> None:
+        offset.x = center_x - self.center[0]
+        offset.y = center_y - self.center[1]
+
+        if offset.x < 0: offset.x = 0
+        if offset.y < 0: offset.y = 0
+
+        right_limit = max(self.map_width - WIDTH, 0)
+        if offset.x > right_limit:
+            offset.x = right_limit
+
+        bottom_limit = max(self.map_height - HEIGHT, 0)
+        if offset.y > bottom_limit:
+            offset.y = bottom_limit
+
+    def update_offset(self, player):
+        self.follow(self.offset, player.rect.centerx, player.rect.centery)
+
+    #alpha - ulamek kroku symulacji od ostatniego stanu; 1 rysuje stan biezacy
+    def custom_draw(self, player, alpha: float = 1.0):
+        self.alpha = alpha
+        x, y = self.interpolated(player)
+        self.follow(self.draw_offset, x + player.rect.width // 2, y + player.rect.height // 2)
+
+        self.draw_tiles(LAYERS['floor'])
+        self.draw_chunks(self.floor_chunks)
+
+        self.sort_pending()
+        self.draw_layer(LAYERS['floor'])
+
+        for sprite in self.visible_main():
+            self.screen.blit(sprite.image, self.draw_position(sprite))
+
+        self.draw_tiles(LAYERS['overhead_always'])
+        self.draw_chunks(self.overhead_chunks)
+        self.draw_layer(LAYERS['overhead_always'])
+        self.draw_layer(LAYERS['doors'])
+
+        if player.hit:
+            attack_range = player.get_effective_range()
+            if attack_range > 0:
+                circle_surf = pygame.Surface((attack_range * 2 + 4, attack_range * 2 + 4), pygame.SRCALPHA)
+                center = (attack_range + 2, attack_range + 2)
+                pygame.draw.circle(circle_surf, (255, 255, 255, 80), center, attack_range, 1)
+
+                x, y = self.draw_position(player)
+                draw_pos = pygame.math.Vector2(x + player.rect.width // 2, y + player.rect.height // 2)
+                draw_pos.x -= (attack_range + 2)
+                draw_pos.y -= (attack_range + 2)
+
                 self.screen.blit(circle_surf, draw_pos)
\ No newline at end of file
@@ -1,241 +1,379 @@
-import pygame
-from typing import List, Any, Dict, Tuple
-from dataclasses import dataclass
-from Entity import Entity
-from Settings import *
-from Sprites import Coin, Player, Projectile, PROJECTILES
-
-
-@dataclass(frozen=True)
-class EnemyData:
-    health: int
-    damage: int
-    attack_type: str
-    speed: int
-    resistance: int
-    attack_radius: int
-    notice_radius: int
-    attack_cooldown: int
-    image: str
-    gold_drop: int
-    projectile_type: str = 'None'
-    spawn_weigt: int = 10
-
-
-ENEMY_DATA: Dict[str, EnemyData] = {
-    'ghoul': EnemyData(
-        health=60, damage=15, attack_type='slash', speed=160, resistance=3,
-        attack_radius=60, notice_radius=400, attack_cooldown=1000,
-        image='sprites/SandGhoul.gif',
-        gold_drop=40,
-        projectile_type='None',
-        spawn_weigt=15
-    ),
-    'skeleton': EnemyData(
-        health=40, damage=10, attack_type='projectile', speed=110, resistance=1,
-        attack_radius=250, notice_radius=550, attack_cooldown=2000,
-        image='sprites/BrittleArcher.gif',
-        gold_drop=50,
-        projectile_type='arrow',
-        spawn_weigt=35
-    ),
-    'ghastlyEye': EnemyData(
-        health=30, damage=5, attack_type='projectile', speed=140, resistance=1,
-        attack_radius=250, notice_radius=700, attack_cooldown=1000,
-        image='sprites/GhastlyEye.gif',
-        gold_drop=30,
-        projectile_type='venom',
-        spawn_weigt=50
-    )
-}
-
-class Enemy(Entity):
-
-    def __init__(self, groups: List[pygame.sprite.Group], pos: Tuple[int, int],
-                 obstacles: pygame.sprite.Group, player: Any, coin_group: pygame.sprite.Group,
-                 enemy_name: str) -> None:
-        super().__init__(groups)
-        self.all_sprites_ref = groups[0]
-        enemy_info = ENEMY_DATA.get(enemy_name, ENEMY_DATA['ghoul'])
-        self.gold_drop = enemy_info.gold_drop
-
-        try:
-            full_image = pygame.image.load(enemy_info.image).convert_alpha()
-            self.image = pygame.transform.scale(full_image, (TILE_SIZE, TILE_SIZE))
-            self.death_sound = pygame.mixer.Sound('audio/kill.wav')
-
-        except (FileNotFoundError, pygame.error) as e:
-            print(f"Error ({enemy_name}): {e}")
-            self.image = pygame.Surface((TILE_SIZE, TILE_SIZE))
-            self.image.fill('red')
-
-        self.original_image = self.image.copy()
-        self.rect = self.image.get_rect(topleft=pos)
-        self.hitbox = self.rect.inflate(-10, -26)
-        self.z = LAYERS['main']
-        self.czy_pierwszy_raz = True
-        self.zombie_sound = pygame.mixer.Sound('audio/zombie.wav')
-        self.zombie_sound.set_volume(0.01)
-
-        self.speed = enemy_info.speed
-        self.pos = pygame.math.Vector2(self.rect.center)
-        self.velocity = pygame.math.Vector2(0, 0)
-
-        self.obstacle_sprites = obstacles
-        self.player = player
-
-        self.health = enemy_info.health
-        self.max_health = self.health
-        self.attack_damage = enemy_info.damage
-        self.attack_type = enemy_info.attack_type
-        self.projectile_type = getattr(enemy_info, 'projectile_type', 'None')
-
-        self.attack_radius = enemy_info.attack_radius
-        self.notice_radius = enemy_info.notice_radius
-        self.attack_cooldown = enemy_info.attack_cooldown
-
-        self.last_attack_time = 0
-        self.resistance = enemy_info.resistance
-
-        self.vulnerable = True
-        self.hit_time = 0
-        self.invincibility_duration = 400
-
-        self.coin_group = coin_group
-        self.knockback_direction = pygame.math.Vector2(0, 0)
-
-    def apply_health_color(self) -> None:
-        self.image = self.original_image.copy()
-        if self.health < self.max_health:
-            current_health = max(0, self.health)
-            missing_hp_ratio = 1.0 - (current_health / self.max_health)
-
-            tint_intensity = int(missing_hp_ratio * 255)
-            tint_intensity = min(max(tint_intensity, 0), 255)
-
-            tint_surface = pygame.Surface(self.image.get_size()).convert_alpha()
-            tint_surface.fill((tint_intensity, 0, 0, 0))
-            self.image.blit(tint_surface, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
-
-    def get_player_distance_direction(self) -> Tuple[float, pygame.math.Vector2]:
-        enemy_vec = self.pos
-        player_vec = self.player.pos
-        distance_vec = player_vec - enemy_vec
-        distance = distance_vec.length()
-
-        if distance > 0:
-            direction = distance_vec.normalize()
-        else:
-            direction = pygame.math.Vector2()
-
-        return distance, direction
-
-    def get_damage(self, player: Player) -> None:
-        if self.vulnerable:
-            damage = player.get_full_weapon_damage()
-            self.health -= damage
-            self.vulnerable = False
-            self.hit_time = pygame.time.get_ticks()
-
-            enemy_vec = self.pos
-            player_vec = player.pos
-            knockback_vec = enemy_vec - player_vec
-
-            if knockback_vec.length() > 0:
-                self.knockback_direction = knockback_vec.normalize()
-            else:
-                self.knockback_direction = pygame.math.Vector2(1, 0)
-
-    def check_death(self) -> None:
-        if self.health <= 0:
-            if self.death_sound:
-                self.death_sound.play()
-            Coin([self.all_sprites_ref, self.coin_group], self.rect.center, self.gold_drop)
-            self.kill()
-
-    def check_hit_cooldown(self) -> None:
-        if not self.vulnerable:
-            current_time = pygame.time.get_ticks()
-            if current_time - self.hit_time > self.invincibility_duration:
-                self.vulnerable = True
-
-    def attack_behavior(self) -> None:
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_attack_time < self.attack_cooldown:
-            return
-
-        if self.attack_type == 'projectile':
-            self.last_attack_time = current_time
-
-            _, direction = self.get_player_distance_direction()
-
-            if self.projectile_type in PROJECTILES:
-                target_group = pygame.sprite.Group()
-                target_group.add(self.player)
-
-                Projectile(
-                    pos=self.rect.center,
-                    direction=direction,
-                    groups=[self.all_sprites_ref],
-                    obstacles=self.obstacle_sprites,
-                    damage_group=target_group,
-                    projectile_data=PROJECTILES[self.projectile_type]
-                )
-
-    def check_attack_collision(self) -> None:
-        attack_range_rect = self.hitbox.inflate(20, 20)
-
-        if attack_range_rect.colliderect(self.player.hitbox):
-            current_time = pygame.time.get_ticks()
-            if current_time - self.last_attack_time > self.attack_cooldown:
-                self.player.get_damage(self.attack_damage)
-                self.last_attack_time = current_time
-
-    def check_line_of_sight(self) -> bool:
-        if not self.obstacle_sprites:
-            return True
-
-        enemy_center = self.rect.center
-        player_center = self.player.rect.center
-
-        for obstacle in self.obstacle_sprites:
-            if obstacle is self.player:
-                continue
-
-            if obstacle.rect.clipline(enemy_center, player_center):
-                return False
-
-        return True
-
-    def update(self, dt: float) -> None:
-        self.check_death()
-        self.check_hit_cooldown()
-        self.apply_health_color()
-
-        if self.attack_type != 'projectile':
-            self.check_attack_collision()
-
-        distance, direction = self.get_player_distance_direction()
-
-        if not self.vulnerable:
-            self.velocity = self.knockback_direction * self.speed
-
-            if self.obstacle_sprites and self.player in self.obstacle_sprites:
-                self.obstacle_sprites.remove(self.player)
-                self.move(dt)
-                self.obstacle_sprites.add(self.player)
-            else:
-                self.move(dt)
-
-        elif distance < self.notice_radius and self.check_line_of_sight():
-            if self.attack_type == 'projectile' and distance < self.attack_radius:
-                self.velocity = pygame.math.Vector2(0, 0)
-                self.attack_behavior()
-            else:
-                self.velocity = direction * self.speed
-
-            self.move(dt)
-
-        else:
-            self.velocity = pygame.math.Vector2(0, 0)
-            self.move(dt)
+import math
+import pygame
+from typing import List, Any, Callable, Dict, Tuple, Optional
+from dataclasses import dataclass
+from Entity import Entity
+from Settings import *
+from Support import assets, sim_clock, tints
+from Sprites import Coin, Player, Projectile, PROJECTILES
+from TileGrid import FlowField, OccupancyGrid
+from EnemyBatch import EnemyBatch, BatchField, IDLE, ATTACK, KNOCKBACK
+
+NEAR, MID, DORMANT = 0, 1, 2
+
+
+@dataclass(frozen=True)
+class EnemyData:
+    health: int
+    damage: int
+    attack_type: str
+    speed: int
+    resistance: int
+    attack_radius: int
+    notice_radius: int
+    attack_cooldown: int
+    image: str
+    gold_drop: int
+    projectile_type: str = 'None'
+    spawn_weigt: int = 10
+
+
+ENEMY_DATA: Dict[str, EnemyData] = {
+    'ghoul': EnemyData(
+        health=60, damage=15, attack_type='slash', speed=160, resistance=3,
+        attack_radius=60, notice_radius=400, attack_cooldown=1000,
+        image='sprites/SandGhoul.gif',
+        gold_drop=40,
+        projectile_type='None',
+        spawn_weigt=15
+    ),
+    'skeleton': EnemyData(
+        health=40, damage=10, attack_type='projectile', speed=110, resistance=1,
+        attack_radius=250, notice_radius=550, attack_cooldown=2000,
+        image='sprites/BrittleArcher.gif',
+        gold_drop=50,
+        projectile_type='arrow',
+        spawn_weigt=35
+    ),
+    'ghastlyEye': EnemyData(
+        health=30, damage=5, attack_type='projectile', speed=140, resistance=1,
+        attack_radius=250, notice_radius=700, attack_cooldown=1000,
+        image='sprites/GhastlyEye.gif',
+        gold_drop=30,
+        projectile_type='venom',
+        spawn_weigt=50
+    )
+}
+
+class Enemy(Entity):
+    health = BatchField()
+    hit_time = BatchField()
+    last_attack_time = BatchField()
+    vulnerable = BatchField()
+
+    def __init__(self, groups: List[pygame.sprite.Group], pos: Tuple[int, int],
+                 obstacles: pygame.sprite.Group, player: Any, coin_group: pygame.sprite.Group,
+                 enemy_name: str, sight_grid: Optional[OccupancyGrid] = None,
+                 batch: Optional[EnemyBatch] = None, flow_field: Optional[FlowField] = None,
+                 on_death: Optional[Callable[['Enemy'], None]] = None) -> None:
+        self.batch: Optional[EnemyBatch] = None
+        self.batch_index: int = -1
+        super().__init__(groups)
+        self.all_sprites_ref = groups[0]
+        enemy_info = ENEMY_DATA.get(enemy_name, ENEMY_DATA['ghoul'])
+        self.enemy_name = enemy_name
+        self.gold_drop = enemy_info.gold_drop
+
+        try:
+            self.image = assets.image(enemy_info.image, (TILE_SIZE, TILE_SIZE))
+            self.death_sound = assets.sound('audio/kill.wav')
+
+        except (FileNotFoundError, pygame.error) as e:
+            print(f"Error ({enemy_name}): {e}")
+            self.image = pygame.Surface((TILE_SIZE, TILE_SIZE))
+            self.image.fill('red')
+
+        self.original_image = self.image
+        self.tint_key = enemy_info.image
+        self.tint_bucket = 0
+        self.rect = self.image.get_rect(topleft=pos)
+        self.hitbox = self.rect.inflate(-10, -26)
+        self.z = LAYERS['main']
+        self.czy_pierwszy_raz = True
+        self.zombie_sound = assets.sound('audio/zombie.wav')
+        self.zombie_sound.set_volume(0.01)
+
+        self.speed = enemy_info.speed
+        self.pos = pygame.math.Vector2(self.rect.center)
+        self.velocity = pygame.math.Vector2(0, 0)
+
+        self.obstacle_sprites = obstacles
+        self.sight_grid = sight_grid
+        self.flow_field = flow_field
+        self.player = player
+
+        self.health = enemy_info.health
+        self.max_health = self.health
+        self.attack_damage = enemy_info.damage
+        self.attack_type = enemy_info.attack_type
+        self.projectile_type = getattr(enemy_info, 'projectile_type', 'None')
+
+        self.attack_radius = enemy_info.attack_radius
+        self.notice_radius = enemy_info.notice_radius
+        self.attack_cooldown = enemy_info.attack_cooldown
+
+        self.last_attack_time = 0
+        self.resistance = enemy_info.resistance
+
+        self.vulnerable = True
+        self.hit_time = 0
+        self.invincibility_duration = 400
+
+        self.coin_group = coin_group
+        self.on_death = on_death
+        #czas pierwszego trafienia, do pomiaru czasu zabicia (time-to-kill)
+        self.first_hit_time: Optional[int] = None
+        self.knockback_direction = pygame.math.Vector2(0, 0)
+
+        #przesuniecie fazy wg kafelka startowego, zeby wrogowie w strefie srodkowej nie budzili sie razem
+        self.lod_phase = (pos[0] // TILE_SIZE + pos[1] // TILE_SIZE) % LOD_MID_INTERVAL
+        self.lod_dt: float = 0.0
+        self.update_spatial_groups()
+
+        if batch is not None:
+            batch.add(self)
+
+    #obrazek podmieniany tylko przy zmianie progu zdrowia, kopie podbarwione wspolne dla typu wroga
+    def apply_health_color(self) -> None:
+        current_health = max(0, self.health)
+        missing_hp_ratio = 1.0 - (current_health / self.max_health)
+        bucket = min(max(math.ceil(missing_hp_ratio * (TINT_BUCKETS - 1)), 0), TINT_BUCKETS - 1)
+        if bucket == self.tint_bucket:
+            return
+
+        self.tint_bucket = bucket
+        if bucket == 0:
+            self.image = self.original_image
+        else:
+            tint_intensity = bucket * 255 // (TINT_BUCKETS - 1)
+            self.image = tints.tinted(self.tint_key, self.original_image, (tint_intensity, 0, 0, 0))
+
+    #strefa aktywnosci: blisko (pelne AI), srodek (co LOD_MID_INTERVAL klatek), daleko (uspiony)
+    def activity_zone(self) -> int:
+        if not self.vulnerable:
+            return NEAR
+
+        distance = self.pos.distance_to(self.player.pos)
+        if distance < self.notice_radius + LOD_VIEW_MARGIN:
+            return NEAR
+
+        offset = getattr(self.all_sprites_ref, 'offset', None)
+        if offset is not None:
+            if (offset.x - LOD_VIEW_MARGIN < self.rect.right and self.rect.left < offset.x + WIDTH + LOD_VIEW_MARGIN and
+                    offset.y - LOD_VIEW_MARGIN < self.rect.bottom and self.rect.top < offset.y + HEIGHT + LOD_VIEW_MARGIN):
+                return NEAR
+
+        if distance < LOD_MID_DISTANCE:
+            return MID
+        return DORMANT
+
+    #zwraca dt do symulacji albo None, gdy w tej klatce wrog spi
+    def lod_step(self, dt: float) -> Optional[float]:
+        zone = self.activity_zone()
+        if zone == DORMANT:
+            self.lod_dt = 0.0
+            return None
+
+        self.lod_dt += dt
+        if zone == MID:
+            self.lod_phase = (self.lod_phase + 1) % LOD_MID_INTERVAL
+            if self.lod_phase:
+                return None
+
+        step = self.lod_dt
+        self.lod_dt = 0.0
+        return step
+
+    #kierunek z pola przeplywu omija sciany, None gdy trzeba isc prosto na gracza
+    def flow_direction(self, direct: pygame.math.Vector2) -> Optional[pygame.math.Vector2]:
+        if self.flow_field is None:
+            return None
+        return self.flow_field.direction(self.pos, direct)
+
+    def get_player_distance_direction(self) -> Tuple[float, pygame.math.Vector2]:
+        enemy_vec = self.pos
+        player_vec = self.player.pos
+        distance_vec = player_vec - enemy_vec
+        distance = distance_vec.length()
+
+        if distance > 0:
+            direction = distance_vec.normalize()
+        else:
+            direction = pygame.math.Vector2()
+
+        return distance, direction
+
+    def get_damage(self, player: Player) -> None:
+        if self.vulnerable:
+            damage = player.get_full_weapon_damage()
+            self.health -= damage
+            self.vulnerable = False
+            self.hit_time = sim_clock.get_ticks()
+
+            enemy_vec = self.pos
+            player_vec = player.pos
+            knockback_vec = enemy_vec - player_vec
+
+            if knockback_vec.length() > 0:
+                self.knockback_direction = knockback_vec.normalize()
+            else:
+                self.knockback_direction = pygame.math.Vector2(1, 0)
+
+    def check_death(self) -> None:
+        if self.first_hit_time is None and self.health < self.max_health:
+            self.first_hit_time = self.hit_time
+        if self.health <= 0:
+            if self.on_death:
+                self.on_death(self)
+            if self.batch is not None:
+                self.batch.remove(self)
+            if self.death_sound:
+                self.death_sound.play()
+            Coin.spawn([self.all_sprites_ref, self.coin_group], self.rect.center, self.gold_drop)
+            self.kill()
+
+    def check_hit_cooldown(self) -> None:
+        if not self.vulnerable:
+            current_time = sim_clock.get_ticks()
+            if current_time - self.hit_time > self.invincibility_duration:
+                self.vulnerable = True
+
+    def attack_behavior(self) -> None:
+        current_time = sim_clock.get_ticks()
+        if current_time - self.last_attack_time < self.attack_cooldown:
+            return
+
+        if self.attack_type == 'projectile':
+            self.last_attack_time = current_time
+
+            _, direction = self.get_player_distance_direction()
+
+            if self.projectile_type in PROJECTILES:
+                Projectile.spawn(
+                    pos=self.rect.center,
+                    direction=direction,
+                    groups=[self.all_sprites_ref],
+                    obstacles=self.obstacle_sprites,
+                    damage_group=self.player.target_group,
+                    projectile_data=PROJECTILES[self.projectile_type]
+                )
+
+    def check_attack_collision(self) -> None:
+        attack_range_rect = self.hitbox.inflate(20, 20)
+
+        if attack_range_rect.colliderect(self.player.hitbox):
+            current_time = sim_clock.get_ticks()
+            if current_time - self.last_attack_time > self.attack_cooldown:
+                self.player.get_damage(self.attack_damage)
+                self.last_attack_time = current_time
+
+    def check_line_of_sight(self) -> bool:
+        enemy_center = self.rect.center
+        player_center = self.player.rect.center
+
+        if self.sight_grid is not None:
+            return self.sight_grid.line_of_sight(enemy_center, player_center)
+
+        if not self.obstacle_sprites:
+            return True
+
+        for obstacle in self.obstacle_sprites:
+            if obstacle is self.player:
+                continue
+
+            if obstacle.rect.clipline(enemy_center, player_center):
+                return False
+
+        return True
+
+    #wariant update, w ktorym odleglosc, kierunek i stan AI przychodza z EnemyBatch
+    def update_batched(self, dt: float) -> None:
+        self.check_death()
+        if self.batch is None:
+            return
+
+        batch = self.batch
+        batch.ensure_updated()
+        self.apply_health_color()
+
+        if self.attack_type != 'projectile':
+            self.check_attack_collision()
+
+        state = batch.state[self.batch_index]
+
+        if state == KNOCKBACK:
+            self.velocity = self.knockback_direction * self.speed
+
+            if self.obstacle_sprites and self.player in self.obstacle_sprites:
+                self.obstacle_sprites.remove(self.player)
+                self.move(dt)
+                self.obstacle_sprites.add(self.player)
+            else:
+                self.move(dt)
+
+        elif state != IDLE and self.check_line_of_sight():
+            if state == ATTACK:
+                self.velocity = pygame.math.Vector2(0, 0)
+                self.attack_behavior()
+            else:
+                velocity = pygame.math.Vector2(*batch.velocity[self.batch_index])
+                flow = self.flow_direction(velocity / self.speed) if self.speed else None
+                if flow is not None:
+                    self.velocity = flow * self.speed
+                else:
+                    self.velocity = velocity
+
+            self.move(dt)
+
+        else:
+            self.velocity = pygame.math.Vector2(0, 0)
+            self.move(dt)
+
+        batch.sync_position(self)
+
+    def update(self, dt: float) -> None:
+        if ENEMY_LOD:
+            dt = self.lod_step(dt)
+            if dt is None:
+                #smierc od zablakanej strzaly obslugujemy zawsze, tez we snie
+                self.check_death()
+                if self.batch is None:
+                    self.check_hit_cooldown()
+                return
+
+        if self.batch is not None:
+            self.update_batched(dt)
+            return
+
+        self.check_death()
+        self.check_hit_cooldown()
+        self.apply_health_color()
+
+        if self.attack_type != 'projectile':
+            self.check_attack_collision()
+
+        distance, direction = self.get_player_distance_direction()
+
+        if not self.vulnerable:
+            self.velocity = self.knockback_direction * self.speed
+
+            if self.obstacle_sprites and self.player in self.obstacle_sprites:
+                self.obstacle_sprites.remove(self.player)
+                self.move(dt)
+                self.obstacle_sprites.add(self.player)
+            else:
+                self.move(dt)
+
+        elif distance < self.notice_radius and self.check_line_of_sight():
+            if self.attack_type == 'projectile' and distance < self.attack_radius:
+                self.velocity = pygame.math.Vector2(0, 0)
+                self.attack_behavior()
+            else:
+                flow = self.flow_direction(direction)
+                self.velocity = (flow if flow is not None else direction) * self.speed
+
+            self.move(dt)
+
+        else:
+            self.velocity = pygame.math.Vector2(0, 0)
+            self.move(dt)
@@ -0,0 +1,164 @@
+from typing import Any, List
+from Support import sim_clock
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+IDLE = 0
+CHASE = 1
+ATTACK = 2
+KNOCKBACK = 3
+
+
+class BatchField:
+    #atrybut Enemy, ktory po dodaniu do EnemyBatch jest czytany i zapisywany w tablicach batcha
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+        self.slot = '_' + name
+
+    def __get__(self, enemy: Any, owner: type = None) -> Any:
+        if enemy is None:
+            return self
+        batch = enemy.__dict__.get('batch')
+        if batch is None:
+            return enemy.__dict__[self.slot]
+        return batch.arrays[self.name][enemy.batch_index].item()
+
+    def __set__(self, enemy: Any, value: Any) -> None:
+        batch = enemy.__dict__.get('batch')
+        if batch is None:
+            enemy.__dict__[self.slot] = value
+        else:
+            batch.arrays[self.name][enemy.batch_index] = value
+
+
+class EnemyBatch:
+    #stan wszystkich przeciwnikow w tablicach numpy (struktura tablic), decyzje AI liczone jednym przebiegiem
+    SHARED_FIELDS = ('health', 'hit_time', 'last_attack_time', 'vulnerable')
+
+    def __init__(self, player: Any, capacity: int = 64) -> None:
+        self.player = player
+        self.count: int = 0
+        self.capacity: int = 0
+        self.enemies: List[Any] = []
+        self.dirty: bool = True
+        self.arrays = {}
+        self._allocate(capacity)
+
+    @staticmethod
+    def available() -> bool:
+        return np is not None
+
+    def _allocate(self, capacity: int) -> None:
+        layout = {
+            'pos': (np.float64, 2),
+            'velocity': (np.float64, 2),
+            'direction': (np.float64, 2),
+            'distance': (np.float64, 1),
+            'speed': (np.float64, 1),
+            'notice_radius': (np.float64, 1),
+            'attack_radius': (np.float64, 1),
+            'attack_cooldown': (np.int64, 1),
+            'invincibility_duration': (np.int64, 1),
+            'ranged': (np.bool_, 1),
+            'health': (np.float64, 1),
+            'hit_time': (np.int64, 1),
+            'last_attack_time': (np.int64, 1),
+            'vulnerable': (np.bool_, 1),
+            'state': (np.int8, 1),
+        }
+        for name, (dtype, width) in layout.items():
+            shape = (capacity, width) if width > 1 else (capacity,)
+            array = np.zeros(shape, dtype=dtype)
+            old = self.arrays.get(name)
+            if old is not None:
+                array[:self.count] = old[:self.count]
+            self.arrays[name] = array
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def add(self, enemy: Any) -> None:
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+
+        index = self.count
+        self.pos[index] = (enemy.pos.x, enemy.pos.y)
+        self.velocity[index] = 0
+        self.speed[index] = enemy.speed
+        self.notice_radius[index] = enemy.notice_radius
+        self.attack_radius[index] = enemy.attack_radius
+        self.attack_cooldown[index] = enemy.attack_cooldown
+        self.invincibility_duration[index] = enemy.invincibility_duration
+        self.ranged[index] = enemy.attack_type == 'projectile'
+        for name in self.SHARED_FIELDS:
+            self.arrays[name][index] = getattr(enemy, name)
+        self.state[index] = IDLE
+
+        enemy.batch = self
+        enemy.batch_index = index
+        self.enemies.append(enemy)
+        self.count += 1
+        self.dirty = True
+
+    def remove(self, enemy: Any) -> None:
+        if enemy.batch is not self:
+            return
+
+        index = enemy.batch_index
+        values = {name: getattr(enemy, name) for name in self.SHARED_FIELDS}
+        enemy.batch = None
+        enemy.batch_index = -1
+        for name, value in values.items():
+            setattr(enemy, name, value)
+
+        last = self.count - 1
+        if index != last:
+            for array in self.arrays.values():
+                array[index] = array[last]
+            moved = self.enemies[last]
+            moved.batch_index = index
+            self.enemies[index] = moved
+        self.enemies.pop()
+        self.count -= 1
+
+    def invalidate(self) -> None:
+        self.dirty = True
+
+    def sync_position(self, enemy: Any) -> None:
+        self.pos[enemy.batch_index] = (enemy.pos.x, enemy.pos.y)
+
+    #liczone leniwie przy pierwszym przeciwniku w klatce, gdy gracz juz sie poruszyl
+    def ensure_updated(self) -> None:
+        if not self.dirty:
+            return
+        self.dirty = False
+
+        n = self.count
+        if n == 0:
+            return
+
+        current_time = sim_clock.get_ticks()
+
+        vulnerable = self.vulnerable[:n]
+        recovered = current_time - self.hit_time[:n] > self.invincibility_duration[:n]
+        vulnerable |= recovered
+
+        delta = np.array((self.player.pos.x, self.player.pos.y)) - self.pos[:n]
+        distance = np.hypot(delta[:, 0], delta[:, 1])
+        safe_distance = np.where(distance > 0, distance, 1.0)
+        direction = np.where((distance > 0)[:, None], delta / safe_distance[:, None], 0.0)
+
+        chase = vulnerable & (distance < self.notice_radius[:n])
+        attack = chase & self.ranged[:n] & (distance < self.attack_radius[:n])
+
+        state = self.state[:n]
+        state[:] = IDLE
+        state[chase] = CHASE
+        state[attack] = ATTACK
+        state[~vulnerable] = KNOCKBACK
+
+        self.distance[:n] = distance
+        self.direction[:n] = direction
+        self.velocity[:n] = direction * (self.speed[:n] * (state == CHASE))[:, None]
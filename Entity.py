@@ -1,56 +1,69 @@
-import pygame
-from typing import List, Optional
-
-
-class Entity(pygame.sprite.Sprite):
-    def __init__(self, groups: List[pygame.sprite.Group]) -> None:
-        super().__init__(*groups)
-        self.frame_index: float = 0
-        self.animation_speed: float = 0.15
-        self.direction: pygame.math.Vector2 = pygame.math.Vector2()
-
-        self.velocity: pygame.math.Vector2 = pygame.math.Vector2(0, 0)
-        self.speed: int = 0
-
-        self.pos: pygame.math.Vector2 = pygame.math.Vector2(0.0, 0.0)
-
-        self.rect: pygame.Rect = pygame.Rect(0, 0, 0, 0)
-        self.hitbox: pygame.Rect = pygame.Rect(0, 0, 0, 0)
-
-        self.obstacle_sprites: Optional[pygame.sprite.Group] = None
-    #normalizacja wektora i obliczanie liczby klatek na sekunde
-    def move(self, dt: float) -> None:
-        if self.velocity.magnitude() > 0:
-            self.velocity = self.velocity.normalize() * self.speed
-
-        self.pos.x += self.velocity.x * dt
-        self.hitbox.centerx = round(self.pos.x)
-        self.collision('horizontal')
-
-        self.pos.y += self.velocity.y * dt
-        self.hitbox.centery = round(self.pos.y)
-        self.collision('vertical')
-
-        self.rect.center = self.hitbox.center
-    #odpowiada za kolizje, pozwala na slizganie sie postaci po scianie
-    def collision(self, direction: str) -> None:
-        if self.obstacle_sprites is None:
-            return
-
-        for sprite in self.obstacle_sprites:
-            obstacle_rect = getattr(sprite, 'hitbox', sprite.rect)
-
-            if obstacle_rect.colliderect(self.hitbox):
-                if direction == 'horizontal':
-                    if self.velocity.x > 0:
-                        self.hitbox.right = obstacle_rect.left
-                    if self.velocity.x < 0:
-                        self.hitbox.left = obstacle_rect.right
-                    self.pos.x = self.hitbox.centerx
-
-                if direction == 'vertical':
-                    if self.velocity.y > 0:
-                        self.hitbox.bottom = obstacle_rect.top
-                    if self.velocity.y < 0:
-                        self.hitbox.top = obstacle_rect.bottom
-                    self.pos.y = self.hitbox.centery
+import pygame
+from typing import List, Optional
+from SpatialGrid import SpatialGroup
+
+
+class Entity(pygame.sprite.Sprite):
+    def __init__(self, groups: List[pygame.sprite.Group]) -> None:
+        super().__init__(*groups)
+        self.frame_index: float = 0
+        self.animation_speed: float = 0.15
+        self.direction: pygame.math.Vector2 = pygame.math.Vector2()
+
+        self.velocity: pygame.math.Vector2 = pygame.math.Vector2(0, 0)
+        self.speed: int = 0
+
+        self.pos: pygame.math.Vector2 = pygame.math.Vector2(0.0, 0.0)
+
+        self.rect: pygame.Rect = pygame.Rect(0, 0, 0, 0)
+        self.hitbox: pygame.Rect = pygame.Rect(0, 0, 0, 0)
+
+        self.obstacle_sprites: Optional[pygame.sprite.Group] = None
+    #normalizacja wektora i obliczanie liczby klatek na sekunde
+    def move(self, dt: float) -> None:
+        if self.velocity.magnitude() > 0:
+            self.velocity = self.velocity.normalize() * self.speed
+
+        self.pos.x += self.velocity.x * dt
+        self.hitbox.centerx = round(self.pos.x)
+        self.collision('horizontal')
+
+        self.pos.y += self.velocity.y * dt
+        self.hitbox.centery = round(self.pos.y)
+        self.collision('vertical')
+
+        self.rect.center = self.hitbox.center
+        self.update_spatial_groups()
+
+    #aktualizacja komorek siatki w grupach, w ktorych jestesmy przeszkoda
+    def update_spatial_groups(self) -> None:
+        for group in self.groups():
+            if isinstance(group, SpatialGroup):
+                group.update_position(self)
+    #odpowiada za kolizje, pozwala na slizganie sie postaci po scianie
+    def collision(self, direction: str) -> None:
+        if self.obstacle_sprites is None:
+            return
+
+        if isinstance(self.obstacle_sprites, SpatialGroup):
+            candidates = self.obstacle_sprites.query(self.hitbox)
+        else:
+            candidates = self.obstacle_sprites
+
+        for sprite in candidates:
+            obstacle_rect = getattr(sprite, 'hitbox', sprite.rect)
+
+            if obstacle_rect.colliderect(self.hitbox):
+                if direction == 'horizontal':
+                    if self.velocity.x > 0:
+                        self.hitbox.right = obstacle_rect.left
+                    if self.velocity.x < 0:
+                        self.hitbox.left = obstacle_rect.right
+                    self.pos.x = self.hitbox.centerx
+
+                if direction == 'vertical':
+                    if self.velocity.y > 0:
+                        self.hitbox.bottom = obstacle_rect.top
+                    if self.velocity.y < 0:
+                        self.hitbox.top = obstacle_rect.bottom
+                    self.pos.y = self.hitbox.centery
@@ -1,322 +1,581 @@
-import pygame
-import random
-import sys
-import pytmx
-from typing import Optional, Callable, List, Dict
-
-from Settings import *
-from Support import load_font, SpriteSheet
-from Camera import Camera
-from Ui import UpgradeMenu
-from Enemy import Enemy, ENEMY_DATA
-from Hud import HUD
-from Sprites import Player, Wall, Tile, FloatingText, Door, Chest, CHEST_CONFIG
-
-
-class Game:
-    def __init__(self) -> None:
-
-        pygame.init()
-        self.screen: pygame.Surface = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption(TITLE)
-        self.clock: pygame.time.Clock = pygame.time.Clock()
-        self.running: bool = True
-
-        self.font_big: pygame.font.Font = load_font(MAIN_FONT, 90)
-        self.font_small: pygame.font.Font = load_font(MAIN_FONT, 30)
-        try:
-            pygame.mixer.music.load('audio/Dungeon.wav')
-            pygame.mixer.music.set_volume(0.3)
-            pygame.mixer.music.play(-1)
-        except Exception as e:
-            print(f"Nie udało się załadować muzyki: {e}")
-
-        self.coin_sound = None
-        try:
-            self.coin_sound = pygame.mixer.Sound('audio/coins.wav')
-            self.coin_sound.set_volume(0.4)
-        except Exception as e:
-            print(f"Nie udało się załadować dźwięku monety: {e}")
-
-        self.all_sprites: Optional[Camera] = None
-        self.wall_sprites: Optional[pygame.sprite.Group] = None
-        self.enemy_sprites: Optional[pygame.sprite.Group] = None
-        self.coin_sprites: Optional[pygame.sprite.Group] = None
-        self.player_obstacles: Optional[pygame.sprite.Group] = None
-        self.enemy_obstacles: Optional[pygame.sprite.Group] = None
-
-        self.player: Optional[Player] = None
-        self.upgrade_menu: Optional[UpgradeMenu] = None
-        self.hud: Optional[HUD] = None
-        self.door_sprites: Optional[pygame.sprite.Group] = None
-        self.chest_sprites: Optional[pygame.sprite.Group] = None
-
-        self.game_paused: bool = False
-        self.game_over: bool = False
-        self.victory: bool = False
-
-        self.new_game()
-
-    def new_game(self) -> None:
-        self.game_over = False
-        self.game_paused = False
-
-        self.all_sprites = Camera()
-        self.wall_sprites = pygame.sprite.Group()
-        self.enemy_sprites = pygame.sprite.Group()
-        self.coin_sprites = pygame.sprite.Group()
-        self.player_obstacles = pygame.sprite.Group()
-        self.enemy_obstacles = pygame.sprite.Group()
-
-        self.door_sprites = pygame.sprite.Group()
-        self.chest_sprites = pygame.sprite.Group()
-
-        self.player = Player(self.all_sprites, self.player_obstacles, self.door_sprites, self.chest_sprites)
-
-        self.enemy_obstacles.add(self.player)
-
-        self.create_map_tmx()
-        self.player.set_enemy_group(self.enemy_sprites)
-
-        self.upgrade_menu = UpgradeMenu(self.player)
-        self.victory = False
-        self.hud = HUD(self.player)
-
-    def _create_floor(self, pos: Tuple[int, int], surf: pygame.Surface, x: int, y: int) -> None:
-        Tile(self.all_sprites, pos, surf)
-        self.spawn_enemies_randomly(x, y, pos)
-
-    def _create_wall_main(self, pos: Tuple[int, int], surf: pygame.Surface, x: int, y: int) -> None:
-        wall = Wall([self.all_sprites, self.wall_sprites], pos, surf)
-        wall.z = LAYERS['main']
-        self.player_obstacles.add(wall)
-        self.enemy_obstacles.add(wall)
-
-    def _create_overhead(self, pos: Tuple[int, int], surf: pygame.Surface, x: int, y: int) -> None:
-        wall = Wall([self.all_sprites, self.wall_sprites], pos, surf)
-        wall.z = LAYERS['main']
-        self.enemy_obstacles.add(wall)
-
-    def _create_overhead_always(self, pos: Tuple[int, int], surf: pygame.Surface, x: int, y: int) -> None:
-        wall = Wall([self.all_sprites, self.wall_sprites], pos, surf)
-        wall.z = LAYERS['overhead_always']
-        self.enemy_obstacles.add(wall)
-
-
-    def _create_door(self, obj: pytmx.TiledObject, pos: Tuple[int, int], spritesheet: SpriteSheet) -> None:
-        Door(
-            groups=[self.all_sprites, self.door_sprites],
-            pos=pos,
-            obstacles_group=self.player_obstacles,
-            sprite_sheet=spritesheet,
-            door_sprites=self.door_sprites,
-            side=obj.name
-        )
-
-    def _create_chest(self, obj: pytmx.TiledObject, pos: Tuple[int, int], spritesheet: SpriteSheet) -> None:
-        Chest(
-            groups=[self.all_sprites, self.chest_sprites],
-            pos=pos,
-            obstacles_group=self.player_obstacles,
-            sprite_sheet=spritesheet,
-            on_open=self._on_normal_chest_open  # Przekazujemy funkcję!
-        )
-
-    def _create_special_chest(self, obj: pytmx.TiledObject, pos: Tuple[int, int], spritesheet: SpriteSheet) -> None:
-        Chest(
-            groups=[self.all_sprites, self.chest_sprites],
-            pos=pos,
-            obstacles_group=self.player_obstacles,
-            sprite_sheet=spritesheet,
-            on_open=self._on_special_chest_open # Przekazujemy inną funkcję!
-        )
-
-    def draw_victory_screen(self) -> None:
-        self.screen.fill(BLACK)
-        words = VICTORY_TEXT.split(' ')
-        lines = []
-        current_line = []
-
-        for word in words:
-            current_line.append(word)
-            if len(" ".join(current_line)) > 20:
-                lines.append(" ".join(current_line))
-                current_line = []
-        if current_line:
-            lines.append(" ".join(current_line))
-        y_offset = HEIGHT / 2 - (len(lines) * 50)
-        for line in lines:
-            text_surf = self.font_big.render(line, True, GOLD_COLOR)
-            text_rect = text_surf.get_rect(center=(WIDTH / 2, y_offset))
-            self.screen.blit(text_surf, text_rect)
-            y_offset += 100
-
-        restart_surf = self.font_small.render("Press ESC to Restart", True, (255, 255, 255))
-        restart_rect = restart_surf.get_rect(center=(WIDTH / 2, HEIGHT - 100))
-        self.screen.blit(restart_surf, restart_rect)
-
-        pygame.display.flip()
-
-    def create_map_tmx(self) -> None:
-        map_name: str = DEFAULT_MAP
-        try:
-            tmx_data: pytmx.TiledMap = pytmx.util_pygame.load_pygame(map_name)
-        except FileNotFoundError:
-            print(f"CRITICAL ERROR: Map {map_name} not found!")
-            sys.exit()
-
-        map_pixel_width: int = tmx_data.width * TILE_SIZE
-        map_pixel_height: int = tmx_data.height * TILE_SIZE
-        self.all_sprites.set_limits(map_pixel_width, map_pixel_height)
-
-        map_spritesheet: SpriteSheet = SpriteSheet("rpg pack/Spritesheet/roguelikeSheet_transparent.png")
-
-        tile_handler = Callable[[Tuple[int, int], pygame.Surface, int, int], None]
-        object_handler = Callable[[pytmx.TiledObject, Tuple[int, int], SpriteSheet], None]
-
-        tile_layer_handlers: Dict[str, tile_handler] = {
-            'Floor': self._create_floor,
-            'Walls': self._create_wall_main,
-            'Overhead': self._create_overhead,
-            'Overhead_Always': self._create_overhead_always
-        }
-
-        object_handlers: Dict[str, object_handler] = {
-            'left': self._create_door,
-            'right': self._create_door,
-            'chest': self._create_chest,
-            'special_chest': self._create_special_chest
-        }
-        for layer in tmx_data.visible_layers:
-            # --- Obsługa Warstw Kafelkowych ---
-            if isinstance(layer, pytmx.TiledTileLayer) and hasattr(layer, 'tiles'):
-                handler = tile_layer_handlers.get(layer.name)
-
-                if handler:
-                    for x, y, surf in layer.tiles():
-                        pos = (x * TILE_SIZE, y * TILE_SIZE)
-                        handler(pos, surf, x, y)
-
-            # --- Obsługa Warstw Obiektów ---
-            elif isinstance(layer, pytmx.TiledObjectGroup):
-                for obj in layer:
-                    # Obliczenia siatki
-                    grid_x: int = round(obj.x / ORIGINAL_TILE_SIZE)
-                    grid_y: int = round(obj.y / ORIGINAL_TILE_SIZE)
-                    pos: Tuple[int, int] = (grid_x * TILE_SIZE, grid_y * TILE_SIZE)
-
-                    handler = object_handlers.get(obj.name)
-
-                    if handler:
-                        handler(obj, pos, map_spritesheet)
-
-
-    def _on_normal_chest_open(self, player, pos_rect: Tuple[int, int], groups: List[pygame.sprite.Group]) -> None:
-        amount = CHEST_CONFIG['amount']
-        player.money += amount
-        FloatingText([self.all_sprites], pos_rect, f"+{amount} Gold", GOLD_COLOR)
-
-    def _on_special_chest_open(self, player, pos_rect: Tuple[int, int], groups: List[pygame.sprite.Group]) -> None:
-        self.victory = True
-
-    def spawn_enemies_randomly(self, grid_x: int, grid_y: int, pos: tuple[int, int]) -> None:
-        if random.randint(0, 400) < 7:
-            dist_x = abs(grid_x * TILE_SIZE - WIDTH / 2)
-            dist_y = abs(grid_y * TILE_SIZE - HEIGHT / 2)
-
-            if dist_x > 500 or dist_y > 500:
-                enemy_names = list(ENEMY_DATA.keys())
-                weights = [ENEMY_DATA[name].spawn_weigt for name in enemy_names]
-                enemy_name = random.choices(enemy_names, weights=weights, k=1)[0]
-
-                Enemy(
-                    groups=[self.all_sprites, self.enemy_sprites, self.player_obstacles],
-                    pos=pos,
-                    obstacles=self.enemy_obstacles,
-                    player=self.player,
-                    coin_group=self.coin_sprites,
-                    enemy_name=enemy_name
-                )
-
-    def run(self) -> None:
-        while self.running:
-            dt: float = self.clock.tick(FPS) / 1000.0
-            self.events()
-            if self.victory:
-                self.draw_victory_screen()
-            elif self.game_over:
-                self.draw_game_over_screen()
-            elif self.game_paused:
-                self.upgrade_menu.display()
-                self.upgrade_menu.input()
-                if self.upgrade_menu.should_close:
-                    self.game_paused = False
-                    self.upgrade_menu.should_close = False
-                    self.upgrade_menu.state = 'main'
-                    self.upgrade_menu.selection_index = 0
-                pygame.display.flip()
-            else:
-                self.update(dt)
-                self.draw()
-
-    def events(self) -> None:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-                pygame.quit()
-                sys.exit()
-
-            if event.type == pygame.KEYDOWN:
-                if not self.game_paused:
-                    self.handle_keydown(event)
-
-            if event.type == pygame.KEYUP:
-                if not self.game_over:
-                    if event.key == pygame.K_SPACE:
-                        self.player.hit = False
-
-            if event.type == pygame.MOUSEBUTTONUP:
-                if not self.game_over:
-                    if event.button == 1:
-                        self.player.hit = False
-
-    def handle_keydown(self, event: pygame.event.Event) -> None:
-        if self.game_over or self.victory:
-            if event.key == pygame.K_ESCAPE:
-                self.new_game()
-            return
-
-        if event.key == pygame.K_ESCAPE:
-            if not self.game_paused:
-                self.game_paused = True
-                self.upgrade_menu.reset()
-
-    def update(self, dt: float) -> None:
-        self.all_sprites.update(dt)
-
-        collected_coins = pygame.sprite.spritecollide(self.player, self.coin_sprites, True)
-        for coin in collected_coins:
-            amount = coin.value
-            if self.coin_sound:
-                self.coin_sound.play()
-            self.player.money += amount
-            FloatingText([self.all_sprites], self.player.rect.midtop, f"+{amount}", (255, 215, 0))
-
-        if self.player.stats['health'] <= 0:
-            self.game_over = True
-
-    def draw(self) -> None:
-        self.screen.fill(BLACK)
-        self.all_sprites.custom_draw(self.player)
-        self.hud.display()
-        pygame.display.flip()
-
-    def draw_game_over_screen(self) -> None:
-        self.screen.fill(BLACK)
-        game_over_surf = self.font_big.render("GAME OVER", True, (180, 0, 0))
-        game_over_rect = game_over_surf.get_rect(center=(WIDTH / 2, HEIGHT / 2 - 50))
-        restart_surf = self.font_small.render("Press ESC to restart", True, (255, 255, 255))
-        restart_rect = restart_surf.get_rect(center=(WIDTH / 2, HEIGHT / 2 + 50))
-        self.screen.blit(game_over_surf, game_over_rect)
-        self.screen.blit(restart_surf, restart_rect)
-        pygame.display.flip()
+import os
+import pygame
+import random
+import sys
+import time
+from typing import Optional, Callable, List, Dict, Set
+
+from Settings import *
+from Support import SpriteSheet, assets, sim_clock
+from Input import InputSource
+from Camera import Camera
+from SpatialGrid import SpatialGroup
+from TileGrid import FlowField, OccupancyGrid, TileMap
+from MapCache import CompiledMap, MapObject, load_map
+from Ui import UpgradeMenu
+from Enemy import Enemy, ENEMY_DATA
+from EnemyBatch import EnemyBatch
+from Hud import ProfilerHUD
+from Profiler import FrameProfiler
+from Loader import AssetLoader
+from Sprites import (Player, Wall, Tile, FloatingText, Door, Chest, CHEST_CONFIG, COIN_DATA, PROJECTILES, WEAPONS,
+                     build_rotation_atlas, POOLS)
+
+
+class Game:
+    def __init__(self, headless: bool = False, input_source: Optional[InputSource] = None,
+                 map_name: str = DEFAULT_MAP) -> None:
+        self.headless: bool = headless
+        self.map_name: str = map_name
+        self.input: InputSource = input_source if input_source else InputSource()
+        if headless:
+            #bez okna i karty dzwiekowej, np. na serwerze CI
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+            os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+        pygame.init()
+        self.screen: pygame.Surface = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption(TITLE)
+        self.clock: pygame.time.Clock = pygame.time.Clock()
+        self.running: bool = True
+        sim_clock.reset()
+
+        self.font_big: pygame.font.Font = assets.font(MAIN_FONT, 90)
+        self.font_small: pygame.font.Font = assets.font(MAIN_FONT, 30)
+        if ASYNC_LOADING:
+            self.load_assets()
+
+        try:
+            build_rotation_atlas()
+        except (FileNotFoundError, pygame.error) as e:
+            print(f"Rotation atlas error: {e}")
+
+        if not headless:
+            try:
+                pygame.mixer.music.load(MUSIC_FILE)
+                pygame.mixer.music.set_volume(0.3)
+                pygame.mixer.music.play(-1)
+            except Exception as e:
+                print(f"Nie udało się załadować muzyki: {e}")
+
+        self.coin_sound = None
+        try:
+            self.coin_sound = assets.sound('audio/coins.wav')
+            self.coin_sound.set_volume(0.4)
+        except Exception as e:
+            print(f"Nie udało się załadować dźwięku monety: {e}")
+
+        self.all_sprites: Optional[Camera] = None
+        self.wall_sprites: Optional[pygame.sprite.Group] = None
+        self.enemy_sprites: Optional[SpatialGroup] = None
+        self.coin_sprites: Optional[pygame.sprite.Group] = None
+        self.player_obstacles: Optional[SpatialGroup] = None
+        self.enemy_obstacles: Optional[SpatialGroup] = None
+        self.sight_grid: Optional[OccupancyGrid] = None
+        self.flow_field: Optional[FlowField] = None
+        self.enemy_batch: Optional[EnemyBatch] = None
+
+        self.player: Optional[Player] = None
+        self.upgrade_menu: Optional[UpgradeMenu] = None
+        self.hud: Optional[ProfilerHUD] = None
+        self.profiler: FrameProfiler = FrameProfiler()
+        self.door_sprites: Optional[pygame.sprite.Group] = None
+        self.chest_sprites: Optional[pygame.sprite.Group] = None
+
+        self.level_map: Optional[str] = None
+        self.static_sprites: Set[pygame.sprite.Sprite] = set()
+        self.spawn_points: List[Tuple[int, int, Tuple[int, int]]] = []
+        self.level_objects: List[Tuple[MapObject, Tuple[int, int]]] = []
+
+        self.game_paused: bool = False
+        self.menu_dirty: List[pygame.Rect] = []
+        self.game_over: bool = False
+        self.victory: bool = False
+        #(typ wroga, czas od pierwszego trafienia do smierci w ms) dla statystyk balansu
+        self.kill_log: List[Tuple[str, int]] = []
+
+        self.new_game()
+        self.input.attach(self)
+
+    #mapa, grafiki i dzwieki wczytywane rownolegle w tle, w tym czasie ekran ladowania z postepem
+    def load_assets(self) -> None:
+        loader = AssetLoader()
+        loader.level(self.map_name)
+
+        sheets = {PLAYER_CHARACTER, MAP_SPRITESHEET, COIN_DATA['image']}
+        sheets.update(projectile_data.image for projectile_data in PROJECTILES.values())
+        sheets.update(weapon_data.graphic_path for weapon_data in WEAPONS.values())
+        for path in sorted(sheets):
+            loader.sheet(path)
+        for path in sorted({enemy_info.image for enemy_info in ENEMY_DATA.values()}):
+            loader.image(path)
+        for path in PRELOAD_SOUNDS:
+            loader.sound(path)
+
+        try:
+            done = False
+            while not done:
+                if not self.headless:
+                    self.draw_loading_screen(loader.progress())
+                done = loader.process(1 / FPS)
+        finally:
+            loader.close()
+
+    def draw_loading_screen(self, progress: float) -> None:
+        self.screen.fill(BLACK)
+        loading_surf = self.font_small.render("Loading...", True, (255, 255, 255))
+        loading_rect = loading_surf.get_rect(center=(WIDTH / 2, HEIGHT / 2 - 50))
+        self.screen.blit(loading_surf, loading_rect)
+
+        bar_rect = pygame.Rect(0, 0, WIDTH // 2, 30)
+        bar_rect.center = (WIDTH // 2, HEIGHT // 2 + 20)
+        fill_rect = bar_rect.inflate(-8, -8)
+        fill_rect.width = int(fill_rect.width * progress)
+        pygame.draw.rect(self.screen, (255, 255, 255), bar_rect, 2)
+        pygame.draw.rect(self.screen, GOLD_COLOR, fill_rect)
+        pygame.display.flip()
+        #okno odpowiada w trakcie ladowania, zdarzenia zostaja w kolejce dla gry
+        pygame.event.pump()
+
+    def new_game(self) -> None:
+        self.game_over = False
+        self.game_paused = False
+        self.victory = False
+        self.kill_log = []
+
+        if LEVEL_SNAPSHOT and self.level_map == self.map_name:
+            self.clear_level()
+        else:
+            self.build_level()
+
+        self.player = Player(self.all_sprites, self.player_obstacles, self.door_sprites, self.chest_sprites,
+                             self.input)
+
+        self.enemy_obstacles.add(self.player)
+
+        self.enemy_batch = None
+        if BATCHED_AI and EnemyBatch.available():
+            self.enemy_batch = EnemyBatch(self.player)
+
+        self.populate_level()
+        self.player.set_enemy_group(self.enemy_sprites)
+
+        self.upgrade_menu = UpgradeMenu(self.player)
+        #jeden HUD na cala gre - nakladka wlaczona F3 zostaje po restarcie
+        if self.hud is None:
+            self.hud = ProfilerHUD(self.player, self.profiler, self.group_counts)
+        else:
+            self.hud.set_player(self.player)
+
+    #statyczna czesc poziomu (kafelki, sciany, siatka widocznosci) budowana raz na mape
+    def build_level(self) -> None:
+        self.all_sprites = Camera()
+        self.wall_sprites = pygame.sprite.Group()
+        self.enemy_sprites = SpatialGroup()
+        self.coin_sprites = pygame.sprite.Group()
+        self.player_obstacles = SpatialGroup()
+        self.enemy_obstacles = SpatialGroup()
+
+        self.door_sprites = pygame.sprite.Group()
+        self.chest_sprites = pygame.sprite.Group()
+
+        self.spawn_points = []
+        self.level_objects = []
+        self.create_map_tmx()
+        self.static_sprites = set(self.all_sprites.sprites())
+        self.level_map = self.map_name
+
+    #restart: usuwamy tylko dynamiczne obiekty, mapa zostaje
+    def clear_level(self) -> None:
+        for sprite in self.all_sprites.sprites():
+            if sprite not in self.static_sprites:
+                sprite.kill()
+        for group in (self.enemy_sprites, self.coin_sprites, self.door_sprites, self.chest_sprites):
+            group.empty()
+
+    def populate_level(self) -> None:
+        for x, y, pos in self.spawn_points:
+            self.spawn_enemies_randomly(x, y, pos)
+
+        object_handlers: Dict[str, Callable[[MapObject, Tuple[int, int], SpriteSheet], None]] = {
+            'left': self._create_door,
+            'right': self._create_door,
+            'chest': self._create_chest,
+            'special_chest': self._create_special_chest
+        }
+        map_spritesheet: SpriteSheet = assets.sheet(MAP_SPRITESHEET)
+        for obj, pos in self.level_objects:
+            handler = object_handlers.get(obj.name)
+
+            if handler:
+                handler(obj, pos, map_spritesheet)
+
+    def _create_floor(self, pos: Tuple[int, int], surf: pygame.Surface, x: int, y: int) -> None:
+        if TILE_RENDERER != 'tilemap':
+            Tile(self.all_sprites, pos, surf)
+        self.spawn_points.append((x, y, pos))
+
+    def _create_wall_main(self, pos: Tuple[int, int], surf: pygame.Surface, x: int, y: int) -> None:
+        wall = Wall([self.all_sprites, self.wall_sprites], pos, surf)
+        wall.z = LAYERS['main']
+        self.player_obstacles.add(wall)
+        self.enemy_obstacles.add(wall)
+
+    def _create_overhead(self, pos: Tuple[int, int], surf: pygame.Surface, x: int, y: int) -> None:
+        wall = Wall([self.all_sprites, self.wall_sprites], pos, surf)
+        wall.z = LAYERS['main']
+        self.enemy_obstacles.add(wall)
+
+    def _create_overhead_always(self, pos: Tuple[int, int], surf: pygame.Surface, x: int, y: int) -> None:
+        #w trybie tilemap rysuje ja TileMap, sprite zostaje tylko do kolizji
+        groups = [self.wall_sprites] if TILE_RENDERER == 'tilemap' else [self.all_sprites, self.wall_sprites]
+        wall = Wall(groups, pos, surf)
+        wall.z = LAYERS['overhead_always']
+        self.enemy_obstacles.add(wall)
+
+
+    def _create_door(self, obj: MapObject, pos: Tuple[int, int], spritesheet: SpriteSheet) -> None:
+        Door(
+            groups=[self.all_sprites, self.door_sprites],
+            pos=pos,
+            obstacles_group=self.player_obstacles,
+            sprite_sheet=spritesheet,
+            door_sprites=self.door_sprites,
+            side=obj.name
+        )
+
+    def _create_chest(self, obj: MapObject, pos: Tuple[int, int], spritesheet: SpriteSheet) -> None:
+        Chest(
+            groups=[self.all_sprites, self.chest_sprites],
+            pos=pos,
+            obstacles_group=self.player_obstacles,
+            sprite_sheet=spritesheet,
+            on_open=self._on_normal_chest_open  # Przekazujemy funkcję!
+        )
+
+    def _create_special_chest(self, obj: MapObject, pos: Tuple[int, int], spritesheet: SpriteSheet) -> None:
+        Chest(
+            groups=[self.all_sprites, self.chest_sprites],
+            pos=pos,
+            obstacles_group=self.player_obstacles,
+            sprite_sheet=spritesheet,
+            on_open=self._on_special_chest_open # Przekazujemy inną funkcję!
+        )
+
+    def draw_victory_screen(self) -> None:
+        self.screen.fill(BLACK)
+        words = VICTORY_TEXT.split(' ')
+        lines = []
+        current_line = []
+
+        for word in words:
+            current_line.append(word)
+            if len(" ".join(current_line)) > 20:
+                lines.append(" ".join(current_line))
+                current_line = []
+        if current_line:
+            lines.append(" ".join(current_line))
+        y_offset = HEIGHT / 2 - (len(lines) * 50)
+        for line in lines:
+            text_surf = self.font_big.render(line, True, GOLD_COLOR)
+            text_rect = text_surf.get_rect(center=(WIDTH / 2, y_offset))
+            self.screen.blit(text_surf, text_rect)
+            y_offset += 100
+
+        restart_surf = self.font_small.render("Press ESC to Restart", True, (255, 255, 255))
+        restart_rect = restart_surf.get_rect(center=(WIDTH / 2, HEIGHT - 100))
+        self.screen.blit(restart_surf, restart_rect)
+
+        pygame.display.flip()
+
+    def create_map_tmx(self) -> None:
+        map_name: str = self.map_name
+        try:
+            map_data: CompiledMap = load_map(map_name)
+        except FileNotFoundError:
+            print(f"CRITICAL ERROR: Map {map_name} not found!")
+            sys.exit()
+
+        map_pixel_width: int = map_data.width * TILE_SIZE
+        map_pixel_height: int = map_data.height * TILE_SIZE
+        self.all_sprites.set_limits(map_pixel_width, map_pixel_height)
+        self.sight_grid = OccupancyGrid.from_blocked(map_data.width, map_data.height, map_data.blocked)
+        self.flow_field = FlowField(self.sight_grid, FLOW_FIELD_RADIUS) if FLOW_FIELD else None
+
+        tilemap_layers: Dict[str, int] = {
+            'Floor': LAYERS['floor'],
+            'Overhead_Always': LAYERS['overhead_always']
+        }
+        tilemap: Optional[TileMap] = None
+        if TILE_RENDERER == 'tilemap':
+            tilemap = TileMap(map_data.width, map_data.height, map_data.tile_surfaces)
+        self.all_sprites.set_tilemap(tilemap)
+
+        tile_handler = Callable[[Tuple[int, int], pygame.Surface, int, int], None]
+
+        tile_layer_handlers: Dict[str, tile_handler] = {
+            'Floor': self._create_floor,
+            'Walls': self._create_wall_main,
+            'Overhead': self._create_overhead,
+            'Overhead_Always': self._create_overhead_always
+        }
+
+        for layer in map_data.layers:
+            # --- Obsługa Warstw Kafelkowych ---
+            if layer.kind == 'tiles':
+                if tilemap and layer.name in tilemap_layers:
+                    tilemap.add_layer(tilemap_layers[layer.name], layer.tiles)
+
+                handler = tile_layer_handlers.get(layer.name)
+
+                if handler:
+                    for x, y, surf in map_data.tiles(layer):
+                        pos = (x * TILE_SIZE, y * TILE_SIZE)
+                        handler(pos, surf, x, y)
+
+            # --- Obsługa Warstw Obiektów ---
+            elif layer.kind == 'objects':
+                for obj in layer.objects:
+                    # Obliczenia siatki
+                    grid_x: int = round(obj.x / ORIGINAL_TILE_SIZE)
+                    grid_y: int = round(obj.y / ORIGINAL_TILE_SIZE)
+                    pos: Tuple[int, int] = (grid_x * TILE_SIZE, grid_y * TILE_SIZE)
+
+                    #drzwi i skrzynie tworzone przy kazdym starcie w populate_level
+                    self.level_objects.append((obj, pos))
+
+        if TILE_RENDERER == 'chunks':
+            self.all_sprites.bake_static_layers()
+
+    def _on_normal_chest_open(self, player, pos_rect: Tuple[int, int], groups: List[pygame.sprite.Group]) -> None:
+        amount = CHEST_CONFIG['amount']
+        player.money += amount
+        FloatingText.spawn([self.all_sprites], pos_rect, f"+{amount} Gold", GOLD_COLOR)
+
+    def _on_special_chest_open(self, player, pos_rect: Tuple[int, int], groups: List[pygame.sprite.Group]) -> None:
+        self.victory = True
+
+    def spawn_enemies_randomly(self, grid_x: int, grid_y: int, pos: tuple[int, int]) -> None:
+        if random.randint(0, 400) < 7:
+            dist_x = abs(grid_x * TILE_SIZE - WIDTH / 2)
+            dist_y = abs(grid_y * TILE_SIZE - HEIGHT / 2)
+
+            if dist_x > 500 or dist_y > 500:
+                enemy_names = list(ENEMY_DATA.keys())
+                weights = [ENEMY_DATA[name].spawn_weigt for name in enemy_names]
+                enemy_name = random.choices(enemy_names, weights=weights, k=1)[0]
+                self.spawn_enemy(pos, enemy_name)
+
+    def spawn_enemy(self, pos: Tuple[int, int], enemy_name: str) -> Enemy:
+        return Enemy(
+            groups=[self.all_sprites, self.enemy_sprites, self.player_obstacles],
+            pos=pos,
+            obstacles=self.enemy_obstacles,
+            player=self.player,
+            coin_group=self.coin_sprites,
+            enemy_name=enemy_name,
+            sight_grid=self.sight_grid,
+            batch=self.enemy_batch,
+            flow_field=self.flow_field,
+            on_death=self._on_enemy_death
+        )
+
+    def _on_enemy_death(self, enemy: Enemy) -> None:
+        first_hit = enemy.first_hit_time if enemy.first_hit_time is not None else sim_clock.get_ticks()
+        self.kill_log.append((enemy.enemy_name, sim_clock.get_ticks() - first_hit))
+
+    #staly krok symulacji niezalezny od liczby klatek: zalegly czas nadrabiany krokami, najwyzej MAX_SIM_STEPS na klatke
+    def run(self, step: float = SIM_STEP) -> None:
+        accumulator = 0.0
+        while self.running:
+            accumulator += self.clock.tick(FPS) / 1000.0
+            self.profiler.begin_frame()
+
+            steps = 0
+            while accumulator >= step and steps < MAX_SIM_STEPS:
+                self.step(step)
+                accumulator -= step
+                steps += 1
+            if accumulator >= step:
+                #slaba maszyna - gubimy zalegle kroki zamiast spirali coraz dluzszych klatek
+                accumulator %= step
+
+            alpha = accumulator / step if RENDER_INTERPOLATION else 1.0
+            self.render(alpha)
+            self.profiler.end_frame()
+
+    def begin_step(self, dt: float) -> None:
+        sim_clock.advance(dt)
+        self.input.next_tick()
+        with self.profiler.phase('events'):
+            self.events()
+
+    def simulate(self, dt: float) -> None:
+        if self.game_paused:
+            #menu rysowane w kroku (tez bez okna) - pozycje opcji sa potrzebne do obslugi myszy
+            self.menu_dirty += self.upgrade_menu.display()
+            self.update_menu()
+            return
+        if RENDER_INTERPOLATION and not self.headless:
+            self.all_sprites.store_previous()
+        self.update(dt)
+        self.all_sprites.update_offset(self.player)
+
+    def step(self, dt: float) -> None:
+        self.begin_step(dt)
+        if not (self.victory or self.game_over):
+            self.simulate(dt)
+
+    def render(self, alpha: float = 1.0) -> None:
+        if self.victory:
+            self.draw_victory_screen()
+        elif self.game_over:
+            self.draw_game_over_screen()
+        elif self.game_paused:
+            if self.menu_dirty:
+                pygame.display.update(self.menu_dirty)
+                self.menu_dirty = []
+        else:
+            self.draw(alpha)
+
+    def update_menu(self) -> None:
+        self.upgrade_menu.input()
+        if self.upgrade_menu.should_close:
+            self.game_paused = False
+            self.upgrade_menu.should_close = False
+            self.upgrade_menu.state = 'main'
+            self.upgrade_menu.selection_index = 0
+
+    #symulacja ze stalym dt tak szybko jak pozwala CPU, bez rysowania
+    #restart_on_end=None - po smierci/wygranej restart tylko klawiszem ESC z wejscia, jak w oknie
+    def run_headless(self, ticks: int, dt: float = SIM_STEP,
+                     restart_on_end: Optional[bool] = True) -> Dict[str, float]:
+        restarts = 0
+        done = 0
+        start = time.perf_counter()
+
+        for _ in range(ticks):
+            if not self.running:
+                break
+            self.begin_step(dt)
+            done += 1
+
+            if self.victory or self.game_over:
+                if restart_on_end is None:
+                    continue
+                if not restart_on_end:
+                    break
+                restarts += 1
+                self.new_game()
+            else:
+                self.simulate(dt)
+                self.menu_dirty.clear()
+
+        elapsed = time.perf_counter() - start
+        return {
+            'ticks': done,
+            'seconds': elapsed,
+            'ticks_per_second': done / elapsed if elapsed > 0 else 0.0,
+            'sim_seconds': done * dt,
+            'restarts': restarts
+        }
+
+    def events(self) -> None:
+        for event in self.input.events():
+            if event.type == pygame.QUIT:
+                self.running = False
+                pygame.quit()
+                sys.exit()
+
+            if event.type == pygame.KEYDOWN:
+                if not self.game_paused:
+                    self.handle_keydown(event)
+
+            if event.type == pygame.KEYUP:
+                if not self.game_over:
+                    if event.key == pygame.K_SPACE:
+                        self.player.hit = False
+
+            if event.type == pygame.MOUSEBUTTONUP:
+                if not self.game_over:
+                    if event.button == 1:
+                        self.player.hit = False
+
+    def handle_keydown(self, event: pygame.event.Event) -> None:
+        if self.game_over or self.victory:
+            if event.key == pygame.K_ESCAPE:
+                self.new_game()
+            return
+
+        if event.key == pygame.K_F3:
+            self.hud.toggle()
+            return
+
+        if event.key == pygame.K_F4:
+            self.export_profile()
+            return
+
+        if event.key == pygame.K_ESCAPE:
+            if not self.game_paused:
+                self.game_paused = True
+                self.upgrade_menu.reset()
+
+    def update(self, dt: float) -> None:
+        if self.sight_grid:
+            self.sight_grid.new_frame()
+        if self.enemy_batch:
+            self.enemy_batch.invalidate()
+        if self.flow_field:
+            self.flow_field.update(self.sight_grid.tile_at(self.player.hitbox.center))
+        with self.profiler.phase('update'):
+            self.all_sprites.update(dt)
+
+        with self.profiler.phase('coins'):
+            self.collect_coins()
+
+        if self.player.stats['health'] <= 0:
+            self.game_over = True
+
+    def collect_coins(self) -> None:
+        collected_coins = pygame.sprite.spritecollide(self.player, self.coin_sprites, True)
+        for coin in collected_coins:
+            amount = coin.value
+            if self.coin_sound:
+                self.coin_sound.play()
+            self.player.money += amount
+            FloatingText.spawn([self.all_sprites], self.player.rect.midtop, f"+{amount}", (255, 215, 0))
+
+    def draw(self, alpha: float = 1.0) -> None:
+        with self.profiler.phase('draw'):
+            self.screen.fill(BLACK)
+            self.all_sprites.custom_draw(self.player, alpha)
+        with self.profiler.phase('hud'):
+            self.hud.display()
+        with self.profiler.phase('flip'):
+            pygame.display.flip()
+
+    def group_counts(self) -> Dict[str, int]:
+        reused = sum(pool.reused for pool in POOLS.values())
+        created = sum(pool.created for pool in POOLS.values())
+        return {
+            'sprites': len(self.all_sprites),
+            'enemies': len(self.enemy_sprites),
+            'coins': len(self.coin_sprites),
+            'obstacles': len(self.player_obstacles),
+            'pool reuse %': round(100 * reused / max(1, reused + created))
+        }
+
+    def export_profile(self) -> None:
+        self.profiler.export_csv(PROFILER_CSV)
+        self.profiler.export_chrome_trace(PROFILER_TRACE)
+        print(f"Profile saved to {PROFILER_CSV} and {PROFILER_TRACE}")
+
+    def draw_game_over_screen(self) -> None:
+        self.screen.fill(BLACK)
+        game_over_surf = self.font_big.render("GAME OVER", True, (180, 0, 0))
+        game_over_rect = game_over_surf.get_rect(center=(WIDTH / 2, HEIGHT / 2 - 50))
+        restart_surf = self.font_small.render("Press ESC to restart", True, (255, 255, 255))
+        restart_rect = restart_surf.get_rect(center=(WIDTH / 2, HEIGHT / 2 + 50))
+        self.screen.blit(game_over_surf, game_over_rect)
+        self.screen.blit(restart_surf, restart_rect)
+        pygame.display.flip()
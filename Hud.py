@@ -1,48 +1,122 @@
-import pygame
-from Settings import *
-from Support import load_font
-from Sprites import Player, WEAPONS, ARMORS
-
-
-class HUD:
-    def __init__(self, player: Player) -> None:
-        self.player = player
-        self.display_surface = pygame.display.get_surface()
-
-        self.font = load_font('fonts/Ac437_IBM_BIOS.ttf', 20)
-        self.text_color = (255, 255, 255)
-
-    def display(self) -> None:
-        base_atk = self.player.stats['attack']
-
-        weapon_name = self.player.inventory['weapon']
-        weapon_dmg = WEAPONS[weapon_name].damage
-
-        total_atk = base_atk + weapon_dmg
-
-        total_def = 0
-        for slot in ['body', 'head', 'shield']:
-            item_name = self.player.inventory.get(slot)
-            if item_name:
-                total_def += ARMORS[item_name].defense
-
-        stats_info = [
-            f"HP: {int(self.player.stats['health'])}",
-            f"Gold: {self.player.money}",
-            f"Dmg: {total_atk}",
-            f"Armor: {total_def}"
-        ]
-
-        if self.player.inventory['weapon'] == 'bow':
-            arrow_count = self.player.ammo['arrow']
-            stats_info.append(f"Arrows: {arrow_count}")
-
-        x, y = 10, 10
-        for line in stats_info:
-            shadow_surf = self.font.render(line, False, (0, 0, 0))
-            self.display_surface.blit(shadow_surf, (x + 2, y + 2))
-
-            text_surf = self.font.render(line, False, self.text_color)
-            self.display_surface.blit(text_surf, (x, y))
-
-            y += 30
+import pygame
+from typing import Callable, Dict, List, Tuple
+from Settings import *
+from Support import assets, texts
+from Sprites import Player, WEAPONS, ARMORS
+from Profiler import FrameProfiler
+
+
+class HUD:
+    def __init__(self, player: Player) -> None:
+        self.player = player
+        self.display_surface = pygame.display.get_surface()
+
+        self.font_size = 20
+        self.text_color = (255, 255, 255)
+        self.rendered_lines: List[Tuple[str, pygame.Surface, pygame.Surface]] = []
+
+    def set_player(self, player: Player) -> None:
+        self.player = player
+        self.rendered_lines.clear()
+
+    def display(self) -> None:
+        base_atk = self.player.stats['attack']
+
+        weapon_name = self.player.inventory['weapon']
+        weapon_dmg = WEAPONS[weapon_name].damage
+
+        total_atk = base_atk + weapon_dmg
+
+        total_def = 0
+        for slot in ['body', 'head', 'shield']:
+            item_name = self.player.inventory.get(slot)
+            if item_name:
+                total_def += ARMORS[item_name].defense
+
+        stats_info = [
+            f"HP: {int(self.player.stats['health'])}",
+            f"Gold: {self.player.money}",
+            f"Dmg: {total_atk}",
+            f"Armor: {total_def}"
+        ]
+
+        if self.player.inventory['weapon'] == 'bow':
+            arrow_count = self.player.ammo['arrow']
+            stats_info.append(f"Arrows: {arrow_count}")
+
+        x, y = 10, 10
+        for index, line in enumerate(stats_info):
+            shadow_surf, text_surf = self.render_line(index, line)
+            self.display_surface.blit(shadow_surf, (x + 2, y + 2))
+            self.display_surface.blit(text_surf, (x, y))
+
+            y += 30
+
+    #linia renderowana ponownie tylko gdy zmienila sie wartosc
+    def render_line(self, index: int, line: str) -> Tuple[pygame.Surface, pygame.Surface]:
+        if index < len(self.rendered_lines) and self.rendered_lines[index][0] == line:
+            return self.rendered_lines[index][1], self.rendered_lines[index][2]
+
+        shadow_surf = texts.render(MAIN_FONT, self.font_size, line, (0, 0, 0))
+        text_surf = texts.render(MAIN_FONT, self.font_size, line, self.text_color)
+        if index < len(self.rendered_lines):
+            self.rendered_lines[index] = (line, shadow_surf, text_surf)
+        else:
+            self.rendered_lines.append((line, shadow_surf, text_surf))
+        return shadow_surf, text_surf
+
+
+class ProfilerHUD(HUD):
+    #HUD z nakladka profilera: wykres czasu klatki, liczba obiektow i najwolniejsza faza
+    def __init__(self, player: Player, profiler: FrameProfiler, counts: Callable[[], Dict[str, int]]) -> None:
+        super().__init__(player)
+        self.profiler = profiler
+        self.counts = counts
+        self.visible: bool = False
+
+        self.small_font = assets.font(MAIN_FONT, 14)
+        self.panel_rect = pygame.Rect(WIDTH - 340, 10, 330, 250)
+        self.graph_rect = pygame.Rect(self.panel_rect.x + 10, self.panel_rect.y + 10, 310, 90)
+        self.panel = pygame.Surface(self.panel_rect.size, pygame.SRCALPHA)
+        self.panel.fill((0, 0, 0, 170))
+        self.budget = 1 / FPS
+
+    def toggle(self) -> None:
+        self.visible = not self.visible
+
+    def display(self) -> None:
+        super().display()
+        if self.visible:
+            self.draw_overlay()
+
+    def draw_overlay(self) -> None:
+        self.display_surface.blit(self.panel, self.panel_rect)
+
+        graph = self.graph_rect
+        frame_times = self.profiler.frame_times()
+        capacity = self.profiler.frames.maxlen or max(len(frame_times), 1)
+        bar_width = graph.width / capacity
+        for index, frame_time in enumerate(frame_times):
+            height = min(frame_time / (self.budget * 2), 1.0) * graph.height
+            color = (0, 200, 0) if frame_time <= self.budget else (220, 40, 40)
+            x = graph.x + index * bar_width
+            pygame.draw.line(self.display_surface, color, (x, graph.bottom), (x, graph.bottom - height))
+        budget_y = graph.bottom - graph.height // 2
+        pygame.draw.line(self.display_surface, (255, 255, 0), (graph.x, budget_y), (graph.right, budget_y))
+
+        lines = []
+        if frame_times:
+            recent = frame_times[-60:]
+            average = sum(recent) / len(recent)
+            lines.append(f"frame {average * 1000:.2f} ms  max {max(recent) * 1000:.2f} ms")
+        slowest = self.profiler.slowest_phase(60)
+        if slowest:
+            lines.append(f"slowest: {slowest[0]} {slowest[1] * 1000:.2f} ms")
+        for name, count in self.counts().items():
+            lines.append(f"{name}: {count}")
+
+        y = graph.bottom + 10
+        for line in lines:
+            text_surf = self.small_font.render(line, False, self.text_color)
+            self.display_surface.blit(text_surf, (graph.x, y))
+            y += 18
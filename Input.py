@@ -0,0 +1,126 @@
+import pygame
+import random
+from dataclasses import dataclass
+from typing import Any, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+from Settings import WIDTH, HEIGHT
+
+
+class KeyState:
+    #zamiennik pygame.key.get_pressed() dla wejscia ze skryptu
+    def __init__(self, pressed: Iterable[int] = ()) -> None:
+        self.pressed: FrozenSet[int] = frozenset(pressed)
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.pressed
+
+
+@dataclass(frozen=True)
+class InputFrame:
+    keys: FrozenSet[int] = frozenset()
+    buttons: Tuple[bool, bool, bool] = (False, False, False)
+    mouse_pos: Tuple[int, int] = (WIDTH // 2, HEIGHT // 2)
+    events: Tuple[pygame.event.Event, ...] = ()
+    #pozycja myszy w swiecie gry (np. z nagrania), None - liczona z pozycji na ekranie
+    world_mouse: Optional[Tuple[float, float]] = None
+
+
+class InputSource:
+    #domyslne zrodlo wejscia: klawiatura, mysz i kolejka zdarzen pygame
+    def attach(self, game: Any) -> None:
+        pass
+
+    def next_tick(self) -> None:
+        pass
+
+    def keys(self) -> Sequence[bool]:
+        return pygame.key.get_pressed()
+
+    def mouse_buttons(self) -> Tuple[bool, bool, bool]:
+        return pygame.mouse.get_pressed()
+
+    def mouse_pos(self) -> Tuple[int, int]:
+        return pygame.mouse.get_pos()
+
+    def world_mouse_pos(self, camera_offset: pygame.math.Vector2) -> pygame.math.Vector2:
+        return pygame.math.Vector2(self.mouse_pos()) + camera_offset
+
+    def events(self) -> List[pygame.event.Event]:
+        return pygame.event.get()
+
+
+class FrameInput(InputSource):
+    #wejscie podawane klatka po klatce, bez okna i bez sprzetu
+    def __init__(self) -> None:
+        self.frame = InputFrame()
+        self.key_state = KeyState()
+
+    def set_frame(self, frame: InputFrame) -> None:
+        self.frame = frame
+        self.key_state = KeyState(frame.keys)
+
+    def keys(self) -> KeyState:
+        return self.key_state
+
+    def mouse_buttons(self) -> Tuple[bool, bool, bool]:
+        return self.frame.buttons
+
+    def mouse_pos(self) -> Tuple[int, int]:
+        return self.frame.mouse_pos
+
+    def world_mouse_pos(self, camera_offset: pygame.math.Vector2) -> pygame.math.Vector2:
+        if self.frame.world_mouse is not None:
+            return pygame.math.Vector2(self.frame.world_mouse)
+        return super().world_mouse_pos(camera_offset)
+
+    def events(self) -> List[pygame.event.Event]:
+        return list(self.frame.events)
+
+
+class ScriptedInput(FrameInput):
+    def __init__(self, frames: Sequence[InputFrame], loop: bool = True) -> None:
+        super().__init__()
+        self.frames = list(frames)
+        self.loop = loop
+        self.index = -1
+
+    def next_tick(self) -> None:
+        if not self.frames:
+            return
+        self.index += 1
+        if self.index >= len(self.frames):
+            self.index = 0 if self.loop else len(self.frames) - 1
+        self.set_frame(self.frames[self.index])
+
+
+class RandomInput(FrameInput):
+    MOVE_KEYS = (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d)
+
+    def __init__(self, seed: Optional[int] = None, hold_ticks: int = 30) -> None:
+        super().__init__()
+        self.rng = random.Random(seed)
+        self.hold_ticks = hold_ticks
+        self.ticks_left = 0
+        self.held_keys: FrozenSet[int] = frozenset()
+        self.mouse = InputFrame().mouse_pos
+        self.mouse_down = False
+
+    def next_tick(self) -> None:
+        rng = self.rng
+        self.ticks_left -= 1
+        if self.ticks_left <= 0:
+            self.ticks_left = rng.randint(1, self.hold_ticks)
+            keys = {key for key in self.MOVE_KEYS if rng.random() < 0.3}
+            if rng.random() < 0.05:
+                keys.add(pygame.K_SPACE)
+            if rng.random() < 0.02:
+                keys.add(rng.choice((pygame.K_q, pygame.K_e)))
+            self.held_keys = frozenset(keys)
+            self.mouse = (rng.randrange(WIDTH), rng.randrange(HEIGHT))
+
+        events = []
+        was_down = self.mouse_down
+        self.mouse_down = rng.random() < 0.2
+        if was_down and not self.mouse_down:
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONUP, button=1, pos=self.mouse))
+
+        self.set_frame(InputFrame(self.held_keys, (self.mouse_down, False, False), self.mouse, tuple(events)))
@@ -0,0 +1,64 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, List, Optional, Tuple
+
+import pygame
+
+from MapCache import cached_map, open_map, read_map
+from Settings import LOADER_WORKERS
+from Support import assets
+
+
+class AssetLoader:
+    #dekodowanie plikow w puli watkow (pygame zwalnia GIL przy wczytywaniu obrazkow i dzwiekow),
+    #konwersja powierzchni i wpisy do cache tylko w watku glownym
+    def __init__(self, workers: Optional[int] = LOADER_WORKERS) -> None:
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='loader')
+        self.jobs: List[Tuple[str, Future, Callable[[Any], Any]]] = []
+        self.total: int = 0
+        self.done: int = 0
+
+    def submit(self, name: str, decode: Callable[[], Any], finish: Callable[[Any], Any]) -> None:
+        self.jobs.append((name, self.pool.submit(decode), finish))
+        self.total += 1
+
+    def image(self, path: str) -> None:
+        if not assets.cached(('image', path, None)):
+            self.submit(path, lambda: pygame.image.load(path), lambda surface: assets.image(path, decoded=surface))
+
+    def sheet(self, path: str) -> None:
+        if not assets.cached(('sheet', path)):
+            self.submit(path, lambda: pygame.image.load(path), lambda surface: assets.sheet(path, decoded=surface))
+
+    def sound(self, path: str) -> None:
+        if not assets.cached(('sound', path)):
+            self.submit(path, lambda: pygame.mixer.Sound(path), lambda sound: assets.sound(path, decoded=sound))
+
+    def level(self, tmx_path: str) -> None:
+        if cached_map(tmx_path) is None:
+            self.submit(tmx_path, lambda: read_map(tmx_path), lambda result: open_map(tmx_path, *result))
+
+    #konczy gotowe zadania, czeka najwyzej timeout sekund; True gdy wszystko wczytane
+    def process(self, timeout: float) -> bool:
+        if self.jobs:
+            wait([future for _, future, _ in self.jobs], timeout, FIRST_COMPLETED)
+
+        pending = []
+        for job in self.jobs:
+            name, future, finish = job
+            if not future.done():
+                pending.append(job)
+                continue
+            self.done += 1
+            try:
+                finish(future.result())
+            except Exception as e:
+                #plik zostaje niewczytany - zwykle ladowanie przy pierwszym uzyciu zglosi blad jak dotad
+                print(f"Background load error ({name}): {e}")
+        self.jobs = pending
+        return not self.jobs
+
+    def progress(self) -> float:
+        return self.done / self.total if self.total else 1.0
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True, cancel_futures=True)
@@ -1,5 +1,55 @@
-import Game
-
-if __name__ == '__main__':
-    game = Game.Game()
-    game.run()
+import argparse
+import random
+import Game
+from Input import InputSource, RandomInput
+from Replay import InputRecorder, ReplayHeader, ReplayInput, read_replay
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=Game.TITLE)
+    parser.add_argument('--headless', action='store_true', help='run the simulation without a window')
+    parser.add_argument('--ticks', type=int, default=10000, help='number of ticks in headless mode')
+    parser.add_argument('--seed', type=int, default=None, help='seed for enemy spawns and random input')
+    parser.add_argument('--record', default=None, help='save the input of this session to a file')
+    parser.add_argument('--replay', default=None, help='re-run a recorded session (with --headless: at full speed)')
+    args = parser.parse_args()
+
+    if args.replay:
+        header, frames = read_replay(args.replay)
+        random.seed(header.seed)
+        game = Game.Game(headless=args.headless, input_source=ReplayInput(frames), map_name=header.map_name)
+        if args.headless:
+            result = game.run_headless(len(frames), header.dt, restart_on_end=None)
+            print(f"replayed {result['ticks']} ticks in {result['seconds']:.2f}s "
+                  f"({result['ticks_per_second']:.0f} ticks/s)")
+        else:
+            game.run(step=header.dt)
+
+    elif args.record:
+        #bez podanego ziarna losujemy je, bo bez niego nagrania nie da sie odtworzyc
+        seed = args.seed if args.seed is not None else random.randrange(2 ** 31)
+        random.seed(seed)
+        header = ReplayHeader(seed, Game.SIM_STEP, Game.DEFAULT_MAP)
+        source = RandomInput(seed) if args.headless else InputSource()
+        recorder = InputRecorder(source, args.record, header)
+        try:
+            game = Game.Game(headless=args.headless, input_source=recorder)
+            if args.headless:
+                game.run_headless(args.ticks, header.dt, restart_on_end=None)
+            else:
+                game.run(step=header.dt)
+        finally:
+            recorder.close()
+            print(f"recorded {recorder.ticks} ticks to {args.record} (seed {seed})")
+
+    else:
+        if args.seed is not None:
+            random.seed(args.seed)
+
+        if args.headless:
+            game = Game.Game(headless=True, input_source=RandomInput(args.seed))
+            result = game.run_headless(args.ticks)
+            print(f"{result['ticks']} ticks in {result['seconds']:.2f}s "
+                  f"({result['ticks_per_second']:.0f} ticks/s, {result['restarts']} restarts)")
+        else:
+            game = Game.Game()
+            game.run()
@@ -0,0 +1,282 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import pygame
+import pytmx
+
+from Settings import TILE_SIZE, ORIGINAL_TILE_SIZE, MAP_CACHE, MAP_CACHE_DIR
+
+MAGIC = b'KVSMAP01'
+FORMAT_VERSION = 1
+ATLAS_COLUMNS = 32
+BLOCKING_LAYERS = ('Walls', 'Overhead', 'Overhead_Always')
+
+
+@dataclass
+class MapObject:
+    name: str
+    x: float
+    y: float
+
+
+@dataclass
+class MapLayer:
+    name: str
+    kind: str
+    tiles: Optional[memoryview] = None
+    objects: Optional[List[MapObject]] = None
+
+
+class CompiledMap:
+    #skompilowana mapa: tablice kafelkow na warstwe, siatka kolizji, obiekty i przeskalowany atlas
+    def __init__(self, width: int, height: int, layers: List[MapLayer], blocked: memoryview,
+                 atlas: pygame.Surface, tile_count: int) -> None:
+        self.width = width
+        self.height = height
+        self.layers = layers
+        self.blocked = blocked
+        self.atlas = atlas
+        self.tile_surfaces: List[Optional[pygame.Surface]] = [None]
+        for index in range(tile_count):
+            col, row = index % ATLAS_COLUMNS, index // ATLAS_COLUMNS
+            rect = pygame.Rect(col * TILE_SIZE, row * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+            self.tile_surfaces.append(atlas.subsurface(rect))
+
+    def tiles(self, layer: MapLayer):
+        width = self.width
+        tiles = layer.tiles
+        surfaces = self.tile_surfaces
+        for index, tile in enumerate(tiles):
+            if tile:
+                yield index % width, index // width, surfaces[tile]
+
+
+def cache_path(tmx_path: str) -> str:
+    name = os.path.abspath(tmx_path).replace(os.sep, '_').replace(':', '_').strip('_')
+    return os.path.join(MAP_CACHE_DIR, f"{name}.bin")
+
+
+def file_digest(path: str) -> str:
+    with open(path, 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def describe_dependency(path: str) -> Dict[str, Any]:
+    stat = os.stat(path)
+    return {'path': path, 'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'sha1': file_digest(path)}
+
+
+def dependencies_valid(dependencies: List[Dict[str, Any]]) -> bool:
+    for dependency in dependencies:
+        try:
+            stat = os.stat(dependency['path'])
+        except OSError:
+            return False
+        if stat.st_mtime_ns == dependency['mtime'] and stat.st_size == dependency['size']:
+            continue
+        #data zmieniona, ale plik moze byc taki sam (np. checkout) - porownujemy hash
+        if stat.st_size != dependency['size'] or file_digest(dependency['path']) != dependency['sha1']:
+            return False
+    return True
+
+
+def find_dependencies(tmx_path: str, tmx_data: pytmx.TiledMap) -> List[str]:
+    paths = [tmx_path]
+    base = os.path.dirname(tmx_path)
+    for tileset in ET.parse(tmx_path).getroot().findall('tileset'):
+        source = tileset.get('source')
+        if source:
+            paths.append(os.path.join(base, source))
+    for tileset in tmx_data.tilesets:
+        if tileset.source and os.path.exists(tileset.source):
+            paths.append(tileset.source)
+    return paths
+
+
+#jak pytmx.util_pygame.pygame_image_loader, ale bez convert() - kompilacja moze isc w watku ladujacym
+def decode_tiles(filename: str, colorkey: Optional[str], **kwargs: Any):
+    image = pygame.image.load(filename)
+
+    def load_image(rect=None, flags=None) -> pygame.Surface:
+        tile = image.subsurface(rect) if rect else image.copy()
+        if flags:
+            tile = pytmx.util_pygame.handle_transformation(tile, flags)
+        if colorkey:
+            tile = tile.copy()
+            tile.set_colorkey(pygame.Color(f"#{colorkey}"))
+        return tile
+
+    return load_image
+
+
+def compile_map(tmx_path: str) -> bytes:
+    tmx_data = pytmx.TiledMap(tmx_path, image_loader=decode_tiles)
+    width, height = tmx_data.width, tmx_data.height
+
+    atlas_index: Dict[int, int] = {}
+    atlas_tiles: List[pygame.Surface] = []
+    layers: List[Dict[str, Any]] = []
+    sections: List[bytes] = []
+    blocked = bytearray(width * height)
+
+    for layer in tmx_data.visible_layers:
+        if isinstance(layer, pytmx.TiledTileLayer):
+            tiles = bytearray(width * height * 4)
+            values = memoryview(tiles).cast('I')
+            for x, y, gid in layer.iter_data():
+                if not gid:
+                    continue
+                image = tmx_data.images[gid]
+                if image is None:
+                    continue
+                if gid not in atlas_index:
+                    atlas_tiles.append(pygame.transform.scale(image, (TILE_SIZE, TILE_SIZE)))
+                    atlas_index[gid] = len(atlas_tiles)
+                values[y * width + x] = atlas_index[gid]
+                if layer.name in BLOCKING_LAYERS:
+                    blocked[y * width + x] = 1
+            layers.append({'name': layer.name, 'kind': 'tiles', 'section': len(sections)})
+            sections.append(bytes(tiles))
+
+        elif isinstance(layer, pytmx.TiledObjectGroup):
+            objects = [{'name': obj.name, 'x': obj.x, 'y': obj.y} for obj in layer]
+            layers.append({'name': layer.name, 'kind': 'objects', 'objects': objects})
+
+    rows = max(1, (len(atlas_tiles) + ATLAS_COLUMNS - 1) // ATLAS_COLUMNS)
+    atlas = pygame.Surface((ATLAS_COLUMNS * TILE_SIZE, rows * TILE_SIZE), pygame.SRCALPHA)
+    for index, tile in enumerate(atlas_tiles):
+        atlas.blit(tile, ((index % ATLAS_COLUMNS) * TILE_SIZE, (index // ATLAS_COLUMNS) * TILE_SIZE))
+
+    sections.append(bytes(blocked))
+    sections.append(pygame.image.tobytes(atlas, 'RGBA'))
+
+    offsets = []
+    position = 0
+    for section in sections:
+        offsets.append((position, len(section)))
+        position += len(section) + (-len(section) % 8)
+
+    header = {
+        'version': FORMAT_VERSION,
+        'tile_size': TILE_SIZE,
+        'source_tile_size': ORIGINAL_TILE_SIZE,
+        'width': width,
+        'height': height,
+        'layers': layers,
+        'sections': offsets,
+        'blocked_section': len(sections) - 2,
+        'atlas_section': len(sections) - 1,
+        'atlas_size': list(atlas.get_size()),
+        'tile_count': len(atlas_tiles),
+        'dependencies': [describe_dependency(path) for path in find_dependencies(tmx_path, tmx_data)]
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    header_bytes += b' ' * (-(len(MAGIC) + 4 + len(header_bytes)) % 8)
+
+    parts = [MAGIC, struct.pack('<I', len(header_bytes)), header_bytes]
+    for section in sections:
+        parts.append(section)
+        parts.append(b'\0' * (-len(section) % 8))
+    return b''.join(parts)
+
+
+def write_map(data: bytes, output_path: str) -> None:
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    #osobny plik tymczasowy na proces - kilka procesow moze kompilowac te sama mape naraz
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(data)
+    os.replace(temp_path, output_path)
+
+
+def read_header(buffer) -> Optional[Tuple[Dict[str, Any], int]]:
+    try:
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            return None
+        (length,) = struct.unpack_from('<I', buffer, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(buffer[start:start + length]))
+    except (ValueError, struct.error):
+        return None
+    if header.get('version') != FORMAT_VERSION or header.get('tile_size') != TILE_SIZE:
+        return None
+    return header, start + length
+
+
+def map_file(path: str) -> Optional[mmap.mmap]:
+    try:
+        with open(path, 'rb') as file:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+    except (OSError, ValueError):
+        return None
+
+
+#tablice czytane prosto z bufora (plik zmapowany w pamieci), bez kopiowania
+def open_compiled(buffer, header: Dict[str, Any], data_start: int) -> CompiledMap:
+    view = memoryview(buffer)
+
+    def section(index: int) -> memoryview:
+        offset, length = header['sections'][index]
+        return view[data_start + offset:data_start + offset + length]
+
+    layers = []
+    for layer in header['layers']:
+        if layer['kind'] == 'tiles':
+            layers.append(MapLayer(layer['name'], 'tiles', tiles=section(layer['section']).cast('I')))
+        else:
+            objects = [MapObject(obj['name'], obj['x'], obj['y']) for obj in layer['objects']]
+            layers.append(MapLayer(layer['name'], 'objects', objects=objects))
+
+    atlas = pygame.image.frombuffer(section(header['atlas_section']), tuple(header['atlas_size']), 'RGBA')
+    if pygame.display.get_surface() is not None:
+        atlas = atlas.convert_alpha()
+
+    return CompiledMap(header['width'], header['height'], layers, section(header['blocked_section']),
+                       atlas, header['tile_count'])
+
+
+_loaded: Dict[str, Tuple[List[Dict[str, Any]], CompiledMap]] = {}
+
+
+def cached_map(tmx_path: str) -> Optional[CompiledMap]:
+    cached = _loaded.get(tmx_path)
+    if cached and dependencies_valid(cached[0]):
+        return cached[1]
+    return None
+
+
+#czesc bez konwersji powierzchni (odczyt pliku, ewentualna kompilacja) - bezpieczna w watku ladujacym
+def read_map(tmx_path: str, use_disk: bool = MAP_CACHE) -> Tuple[Any, Dict[str, Any], int]:
+    path = cache_path(tmx_path)
+    buffer = map_file(path) if use_disk else None
+    result = read_header(buffer) if buffer is not None else None
+    if result is None or not dependencies_valid(result[0]['dependencies']):
+        buffer = compile_map(tmx_path)
+        if use_disk:
+            try:
+                write_map(buffer, path)
+            except OSError as e:
+                print(f"Map cache write error: {e}")
+        result = read_header(buffer)
+
+    header, data_start = result
+    return buffer, header, data_start
+
+
+def open_map(tmx_path: str, buffer, header: Dict[str, Any], data_start: int) -> CompiledMap:
+    compiled = open_compiled(buffer, header, data_start)
+    _loaded[tmx_path] = (header['dependencies'], compiled)
+    return compiled
+
+
+def load_map(tmx_path: str, use_disk: bool = MAP_CACHE) -> CompiledMap:
+    compiled = cached_map(tmx_path)
+    if compiled is None:
+        compiled = open_map(tmx_path, *read_map(tmx_path, use_disk))
+    return compiled
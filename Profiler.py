@@ -0,0 +1,88 @@
+import csv
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+from Settings import PROFILER_FRAMES
+
+PHASES: Tuple[str, ...] = ('events', 'update', 'coins', 'draw', 'hud', 'flip')
+
+
+class FrameSample:
+    def __init__(self, start: float) -> None:
+        self.start = start
+        self.total: float = 0.0
+        self.phases: List[Tuple[str, float, float]] = []
+
+    def duration(self, name: str) -> float:
+        return sum(duration for phase, _, duration in self.phases if phase == name)
+
+
+class FrameProfiler:
+    #pomiar czasu faz klatki, ostatnie PROFILER_FRAMES klatek w buforze cyklicznym
+    def __init__(self, capacity: int = PROFILER_FRAMES) -> None:
+        self.frames: Deque[FrameSample] = deque(maxlen=capacity)
+        self.current: Optional[FrameSample] = None
+        self.origin = time.perf_counter()
+
+    def begin_frame(self) -> None:
+        self.current = FrameSample(time.perf_counter())
+
+    def end_frame(self) -> None:
+        if self.current is None:
+            return
+        self.current.total = time.perf_counter() - self.current.start
+        self.frames.append(self.current)
+        self.current = None
+
+    #poza begin_frame/end_frame (np. tryb headless) nic nie jest zapisywane
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        frame = self.current
+        if frame is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            frame.phases.append((name, start, time.perf_counter() - start))
+
+    def frame_times(self) -> List[float]:
+        return [frame.total for frame in self.frames]
+
+    def averages(self, last: Optional[int] = None) -> Dict[str, float]:
+        frames = list(self.frames)[-last:] if last else list(self.frames)
+        if not frames:
+            return {}
+        return {name: sum(frame.duration(name) for frame in frames) / len(frames) for name in PHASES}
+
+    def slowest_phase(self, last: Optional[int] = None) -> Optional[Tuple[str, float]]:
+        averages = self.averages(last)
+        if not averages:
+            return None
+        name = max(averages, key=averages.get)
+        return name, averages[name]
+
+    def export_csv(self, path: str) -> None:
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['frame', 'start_ms'] + [f"{name}_ms" for name in PHASES] + ['total_ms'])
+            for index, frame in enumerate(self.frames):
+                row = [index, round((frame.start - self.origin) * 1000, 3)]
+                row += [round(frame.duration(name) * 1000, 3) for name in PHASES]
+                row.append(round(frame.total * 1000, 3))
+                writer.writerow(row)
+
+    #format chrome://tracing / Perfetto
+    def export_chrome_trace(self, path: str) -> None:
+        events = []
+        for frame in self.frames:
+            events.append({'name': 'frame', 'ph': 'X', 'pid': 1, 'tid': 1,
+                           'ts': (frame.start - self.origin) * 1e6, 'dur': frame.total * 1e6})
+            for name, start, duration in frame.phases:
+                events.append({'name': name, 'ph': 'X', 'pid': 1, 'tid': 1,
+                               'ts': (start - self.origin) * 1e6, 'dur': duration * 1e6})
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
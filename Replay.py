@@ -0,0 +1,190 @@
+import struct
+from dataclasses import dataclass, replace
+from typing import Any, BinaryIO, List, Optional, Tuple
+
+import pygame
+
+from Input import FrameInput, InputFrame, InputSource
+from Settings import DEFAULT_MAP, SIM_STEP
+
+MAGIC = b'KVSREC01'
+HEADER = struct.Struct('<qdH')
+EVENT = struct.Struct('<Bi')
+KEYS = struct.Struct('<H')
+MOUSE = struct.Struct('<ff')
+
+#klawisze czytane przez gre (Player, UpgradeMenu) - w nagraniu jako maska bitowa
+RECORDED_KEYS: Tuple[int, ...] = (
+    pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d,
+    pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT,
+    pygame.K_SPACE, pygame.K_q, pygame.K_e, pygame.K_ESCAPE
+)
+#zdarzenia obslugiwane w Game.events, reszta nie wplywa na symulacje
+RECORDED_EVENTS: Tuple[int, ...] = (
+    pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.QUIT
+)
+
+FLAG_KEYS = 1 << 3
+FLAG_MOUSE = 1 << 4
+FLAG_EVENTS = 1 << 5
+
+
+@dataclass(frozen=True)
+class ReplayHeader:
+    seed: int
+    dt: float = SIM_STEP
+    map_name: str = DEFAULT_MAP
+
+
+def keys_mask(keys: Any) -> int:
+    mask = 0
+    for bit, key in enumerate(RECORDED_KEYS):
+        if keys[key]:
+            mask |= 1 << bit
+    return mask
+
+
+def mask_keys(mask: int) -> frozenset:
+    return frozenset(key for bit, key in enumerate(RECORDED_KEYS) if mask & (1 << bit))
+
+
+def event_code(event: pygame.event.Event) -> Optional[Tuple[int, int]]:
+    if event.type not in RECORDED_EVENTS:
+        return None
+    if event.type in (pygame.KEYDOWN, pygame.KEYUP):
+        value = event.key
+    elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        value = event.button
+    else:
+        value = 0
+    return RECORDED_EVENTS.index(event.type), value
+
+
+def code_event(code: int, value: int, mouse_pos: Tuple[int, int]) -> pygame.event.Event:
+    event_type = RECORDED_EVENTS[code]
+    if event_type in (pygame.KEYDOWN, pygame.KEYUP):
+        return pygame.event.Event(event_type, key=value)
+    if event_type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        return pygame.event.Event(event_type, button=value, pos=mouse_pos)
+    return pygame.event.Event(event_type)
+
+
+class InputRecorder(FrameInput):
+    #zapisuje wejscie zuzyte w kazdej klatce; gra czyta je z tej samej migawki, wiec odtworzenie jest dokladne
+    def __init__(self, source: InputSource, path: str, header: ReplayHeader) -> None:
+        super().__init__()
+        self.source = source
+        self.header = header
+        self.game: Optional[Any] = None
+        self.file: BinaryIO = open(path, 'wb')
+        map_bytes = header.map_name.encode('utf-8')
+        self.file.write(MAGIC + HEADER.pack(header.seed, header.dt, len(map_bytes)) + map_bytes)
+        self.last_keys = 0
+        self.last_mouse: Optional[Tuple[float, float]] = None
+        self.ticks = 0
+
+    def attach(self, game: Any) -> None:
+        self.game = game
+        self.source.attach(game)
+
+    def next_tick(self) -> None:
+        source = self.source
+        source.next_tick()
+        #najpierw zdarzenia - pobranie kolejki odswieza stan klawiatury i myszy
+        events = [event for event in source.events() if event.type in RECORDED_EVENTS]
+        keys = keys_mask(source.keys())
+        buttons = tuple(bool(button) for button in source.mouse_buttons()[:3])
+        mouse_pos = source.mouse_pos()
+        offset = self.game.all_sprites.offset if self.game else pygame.math.Vector2(0, 0)
+        world = source.world_mouse_pos(offset)
+        #float32 jak w pliku, zeby nagrywana sesja widziala te same wartosci co odtworzenie
+        world = MOUSE.unpack(MOUSE.pack(world.x, world.y))
+
+        self.set_frame(InputFrame(mask_keys(keys), buttons, mouse_pos, tuple(events), world))
+        self.write(keys, buttons, world, events)
+
+    def write(self, keys: int, buttons: Tuple[bool, ...], world: Tuple[float, float],
+              events: List[pygame.event.Event]) -> None:
+        flags = sum(1 << index for index, pressed in enumerate(buttons) if pressed)
+        parts = []
+        if keys != self.last_keys:
+            flags |= FLAG_KEYS
+            parts.append(KEYS.pack(keys))
+            self.last_keys = keys
+        if world != self.last_mouse:
+            flags |= FLAG_MOUSE
+            parts.append(MOUSE.pack(*world))
+            self.last_mouse = world
+        codes = [code for code in map(event_code, events) if code is not None]
+        if codes:
+            flags |= FLAG_EVENTS
+            parts.append(bytes([len(codes)]))
+            parts.extend(EVENT.pack(*code) for code in codes)
+        self.file.write(bytes([flags]) + b''.join(parts))
+        self.ticks += 1
+
+    def close(self) -> None:
+        if not self.file.closed:
+            self.file.close()
+
+
+def read_replay(path: str) -> Tuple[ReplayHeader, List[InputFrame]]:
+    with open(path, 'rb') as file:
+        data = file.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not an input recording")
+
+    position = len(MAGIC)
+    seed, dt, map_length = HEADER.unpack_from(data, position)
+    position += HEADER.size
+    map_name = data[position:position + map_length].decode('utf-8')
+    position += map_length
+
+    frames: List[InputFrame] = []
+    keys = frozenset()
+    world = (0.0, 0.0)
+    while position < len(data):
+        flags = data[position]
+        position += 1
+        if flags & FLAG_KEYS:
+            keys = mask_keys(KEYS.unpack_from(data, position)[0])
+            position += KEYS.size
+        if flags & FLAG_MOUSE:
+            world = MOUSE.unpack_from(data, position)
+            position += MOUSE.size
+        events = []
+        if flags & FLAG_EVENTS:
+            count = data[position]
+            position += 1
+            for _ in range(count):
+                events.append(EVENT.unpack_from(data, position))
+                position += EVENT.size
+        buttons = tuple(bool(flags & (1 << index)) for index in range(3))
+        #zdarzenia zostaja jako kody - pozycje myszy na ekranie zna dopiero odtwarzana gra
+        frames.append(InputFrame(keys, buttons, (0, 0), tuple(events), world))
+
+    return ReplayHeader(seed, dt, map_name), frames
+
+
+class ReplayInput(FrameInput):
+    #odtwarza nagrane klatki; po ostatniej wysyla QUIT
+    def __init__(self, frames: List[InputFrame]) -> None:
+        super().__init__()
+        self.frames = frames
+        self.index = -1
+        self.game: Optional[Any] = None
+
+    def attach(self, game: Any) -> None:
+        self.game = game
+
+    def next_tick(self) -> None:
+        self.index += 1
+        if self.index >= len(self.frames):
+            self.set_frame(InputFrame(events=(pygame.event.Event(pygame.QUIT),)))
+            return
+
+        frame = self.frames[self.index]
+        offset = self.game.all_sprites.offset if self.game else pygame.math.Vector2(0, 0)
+        mouse_pos = (round(frame.world_mouse[0] - offset.x), round(frame.world_mouse[1] - offset.y))
+        events = tuple(code_event(code, value, mouse_pos) for code, value in frame.events)
+        self.set_frame(replace(frame, mouse_pos=mouse_pos, events=events))
@@ -1,45 +1,87 @@
-
-from typing import Tuple,Final
-from enum import IntEnum
-
-WIDTH: Final[int] = 1280
-HEIGHT: Final[int] = 720
-FPS: Final[int] = 60
-TITLE: Final[str] = "Knight vs Sceletors"
-DEFAULT_MAP: Final[str] = "level2.tmx"
-
-BLACK: Final[Tuple[int, int, int]] = (0, 0, 0)
-MAIN_FONT: Final[str] = 'fonts/Ac437_IBM_BIOS.ttf'
-
-ORIGINAL_TILE_SIZE: Final[int] = 16
-SCALE_FACTOR: Final[int] = 3
-TILE_SIZE: Final[int] = ORIGINAL_TILE_SIZE * SCALE_FACTOR
-
-MAP_WIDTH: Final[int] = 4000
-MAP_HEIGHT: Final[int] = 4000
-
-
-class Layer(IntEnum):
-    FLOOR = 0
-    MAIN = 1
-    OVERHEAD_ALWAYS = 2
-    DOORS = 3
-
-LAYERS = {
-    'floor': Layer.FLOOR,
-    'main': Layer.MAIN,
-    'overhead_always': Layer.OVERHEAD_ALWAYS,
-    'doors': Layer.DOORS
-}
-
-PLAYER_START_POS: Tuple[int, int] = (400, 400)
-PLAYER_CHARACTER: Final[str] = "sprites/character/Spritesheet/roguelikeChar_transparent.png"
-PLAYER_ASSETS = {'body': (0, 0)}
-
-ARROW_COST: int = 50
-ARROW_BUNDLE: int = 10
-BOW_INITIAL_ARROWS: int = 20
-
-
-VICTORY_TEXT: Final[str] = "YOU WIN!!!"
+
+from typing import Tuple,Final,Optional
+from enum import IntEnum
+
+WIDTH: Final[int] = 1280
+HEIGHT: Final[int] = 720
+FPS: Final[int] = 60
+#symulacja w stalych krokach SIM_RATE/s, rysowanie do FPS klatek/s z interpolacja pozycji
+SIM_RATE: Final[int] = 120
+SIM_STEP: Final[float] = 1 / SIM_RATE
+MAX_SIM_STEPS: Final[int] = 8
+RENDER_INTERPOLATION: Final[bool] = True
+TITLE: Final[str] = "Knight vs Sceletors"
+DEFAULT_MAP: Final[str] = "level2.tmx"
+
+BLACK: Final[Tuple[int, int, int]] = (0, 0, 0)
+MAIN_FONT: Final[str] = 'fonts/Ac437_IBM_BIOS.ttf'
+
+ORIGINAL_TILE_SIZE: Final[int] = 16
+SCALE_FACTOR: Final[int] = 3
+TILE_SIZE: Final[int] = ORIGINAL_TILE_SIZE * SCALE_FACTOR
+
+MAP_WIDTH: Final[int] = 4000
+MAP_HEIGHT: Final[int] = 4000
+
+#'tilemap' - warstwy jako tablice kafelkow, 'chunks' - sklejone fragmenty, 'sprites' - sprite na kafelek
+TILE_RENDERER: Final[str] = 'tilemap'
+CHUNK_SIZE: Final[int] = 16
+MAP_CACHE: Final[bool] = True
+LEVEL_SNAPSHOT: Final[bool] = True
+MAP_CACHE_DIR: Final[str] = '.mapcache'
+#dekodowanie grafik, dzwiekow i mapy w puli watkow przy starcie, w tym czasie ekran ladowania
+ASYNC_LOADING: Final[bool] = True
+LOADER_WORKERS: Final[Optional[int]] = None
+MUSIC_FILE: Final[str] = 'audio/Dungeon.wav'
+MAP_SPRITESHEET: Final[str] = 'rpg pack/Spritesheet/roguelikeSheet_transparent.png'
+PRELOAD_SOUNDS: Final[Tuple[str, ...]] = (
+    'audio/coins.wav', 'audio/kill.wav', 'audio/zombie.wav', 'audio/sword.wav', 'audio/pain.wav',
+    'audio/arrow.mp3', 'audio/arrow_hit.mp3', 'audio/door_open.mp3',
+    'audio/menu_selection.mp3', 'audio/buy_sound.mp3', 'audio/error_sound.mp3'
+)
+
+BATCHED_AI: Final[bool] = True
+ENEMY_LOD: Final[bool] = True
+LOD_VIEW_MARGIN: Final[int] = 2 * TILE_SIZE
+LOD_MID_DISTANCE: Final[int] = 1600
+LOD_MID_INTERVAL: Final[int] = 4
+FLOW_FIELD: Final[bool] = True
+FLOW_FIELD_RADIUS: Final[int] = 20
+ASSET_CACHE_LIMIT: Final[Optional[int]] = None
+ROTATION_STEPS: Final[int] = 64
+TEXT_CACHE_SIZE: Final[int] = 256
+TINT_BUCKETS: Final[int] = 16
+PLAYER_COMPOSITE_CACHE: Final[int] = 128
+PROJECTILE_POOL_LIMIT: Final[int] = 256
+COIN_POOL_LIMIT: Final[int] = 128
+TEXT_POOL_LIMIT: Final[int] = 128
+
+PROFILER_FRAMES: Final[int] = 240
+PROFILER_CSV: Final[str] = 'profile.csv'
+PROFILER_TRACE: Final[str] = 'profile_trace.json'
+
+
+class Layer(IntEnum):
+    FLOOR = 0
+    MAIN = 1
+    OVERHEAD_ALWAYS = 2
+    DOORS = 3
+
+LAYERS = {
+    'floor': Layer.FLOOR,
+    'main': Layer.MAIN,
+    'overhead_always': Layer.OVERHEAD_ALWAYS,
+    'doors': Layer.DOORS
+}
+
+PLAYER_START_POS: Tuple[int, int] = (400, 400)
+PLAYER_CHARACTER: Final[str] = "sprites/character/Spritesheet/roguelikeChar_transparent.png"
+PLAYER_ASSETS = {'body': (0, 0)}
+
+ARROW_COST: int = 50
+ARROW_BUNDLE: int = 10
+BOW_INITIAL_ARROWS: int = 20
+
+
+VICTORY_TEXT: Final[str] = "YOU WIN!!!"
 GOLD_COLOR: Final[Tuple[int, int, int]] = (255, 215, 0)
\ No newline at end of file
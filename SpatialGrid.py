@@ -0,0 +1,81 @@
+import pygame
+from typing import Dict, Iterable, List, Tuple
+from Settings import TILE_SIZE
+
+Cell = Tuple[int, int]
+
+
+class SpatialGroup(pygame.sprite.Group):
+    #grupa sprite'ow z siatka komorek TILE_SIZE, pozwala pytac tylko o najblizsze obiekty
+    def __init__(self, *sprites: pygame.sprite.Sprite, cell_size: int = TILE_SIZE) -> None:
+        self.cell_size = cell_size
+        self.cells: Dict[Cell, Dict[pygame.sprite.Sprite, None]] = {}
+        self.sprite_cells: Dict[pygame.sprite.Sprite, Tuple[Cell, ...]] = {}
+        self.insert_order: Dict[pygame.sprite.Sprite, int] = {}
+        self.next_order: int = 0
+        super().__init__(*sprites)
+
+    @staticmethod
+    def bounds(sprite: pygame.sprite.Sprite) -> pygame.Rect:
+        hitbox = getattr(sprite, 'hitbox', None)
+        if hitbox is None:
+            return sprite.rect
+        return sprite.rect.union(hitbox)
+
+    def cells_for(self, rect: pygame.Rect) -> Tuple[Cell, ...]:
+        size = self.cell_size
+        left = rect.left // size
+        top = rect.top // size
+        right = max(left, (rect.right - 1) // size)
+        bottom = max(top, (rect.bottom - 1) // size)
+        return tuple((x, y) for y in range(top, bottom + 1) for x in range(left, right + 1))
+
+    def add_internal(self, sprite: pygame.sprite.Sprite, layer=None) -> None:
+        super().add_internal(sprite)
+        self.insert_order[sprite] = self.next_order
+        self.next_order += 1
+        #Entity dodaje sie do grup zanim ma rect, komorki uzupelni update_position
+        if hasattr(sprite, 'rect'):
+            self._insert(sprite, self.cells_for(self.bounds(sprite)))
+        else:
+            self._insert(sprite, ())
+
+    def remove_internal(self, sprite: pygame.sprite.Sprite) -> None:
+        super().remove_internal(sprite)
+        self._discard(sprite)
+        del self.insert_order[sprite]
+
+    def update_position(self, sprite: pygame.sprite.Sprite) -> None:
+        old_cells = self.sprite_cells.get(sprite)
+        if old_cells is None:
+            return
+        new_cells = self.cells_for(self.bounds(sprite))
+        if new_cells != old_cells:
+            self._discard(sprite)
+            self._insert(sprite, new_cells)
+
+    #kandydaci w kolejnosci dodania do grupy, tak jak przy iteracji po calej grupie
+    def query(self, rect: pygame.Rect) -> List[pygame.sprite.Sprite]:
+        found: Dict[pygame.sprite.Sprite, None] = {}
+        for cell in self.cells_for(rect):
+            bucket = self.cells.get(cell)
+            if bucket:
+                found.update(bucket)
+
+        if len(found) < 2:
+            return list(found)
+        return sorted(found, key=self.insert_order.__getitem__)
+
+    def _insert(self, sprite: pygame.sprite.Sprite, cells: Iterable[Cell]) -> None:
+        cells = tuple(cells)
+        for cell in cells:
+            self.cells.setdefault(cell, {})[sprite] = None
+        self.sprite_cells[sprite] = cells
+
+    def _discard(self, sprite: pygame.sprite.Sprite) -> None:
+        for cell in self.sprite_cells.pop(sprite, ()):
+            bucket = self.cells.get(cell)
+            if bucket is not None:
+                bucket.pop(sprite, None)
+                if not bucket:
+                    del self.cells[cell]
@@ -1,740 +1,908 @@
-import pygame
-from typing import List, Optional, Union, Sequence, Callable, Dict
-from Settings import *
-from Entity import Entity
-from Support import SpriteSheet
-from dataclasses import dataclass
-
-
-@dataclass(frozen=True)
-class WeaponData:
-    name: str
-    damage: int
-    cost: int
-    range: int
-    id: Tuple[int, int]
-    graphic_path: str = PLAYER_CHARACTER
-    flip_horizontal: bool = False
-    scale: float = SCALE_FACTOR
-    offset: Tuple[int, int] = (0, 0)
-    rotates_to_mouse: bool = False
-
-@dataclass(frozen=True)
-class ArmorData:
-    name: str
-    defense: int
-    cost: int
-    slot: str
-    id: Tuple[int, int]
-    graphic_path: str = PLAYER_CHARACTER
-
-@dataclass(frozen=True)
-class ProjectileData:
-    damage: int
-    speed: int
-    image: str
-    id: Tuple[int, int]
-    lifetime: int
-    scale: float = SCALE_FACTOR
-
-WEAPONS: Dict[str, WeaponData] = {
-    'short_sword': WeaponData('short sword', 1, 0, 1, (45, 7)),
-    'axe': WeaponData('axe', 3, 250, 1, (48, 7)),
-    'long_sword': WeaponData('long sword', 6, 600, 2, (45, 6)),
-    'pique': WeaponData('pique', 5, 1200, 3, (47, 5)),
-    'bow': WeaponData(
-        name='bow', damage=12, cost=1500, range=-1,
-        id=(0, 0), graphic_path="sprites/Bow and Arrows.png",
-        scale=2, offset=(8, 8), rotates_to_mouse=True
-    )
-}
-
-PROJECTILES: Dict[str, ProjectileData] = {
-    'arrow': ProjectileData(
-        damage=15,
-        speed=600,
-        image="sprites/Bow and Arrows.png",
-        id=(2, 1),
-        lifetime=3000,
-        scale=1.5,
-    ),
-    'venom': ProjectileData(
-        damage=10,
-        speed=400,
-        image="sprites/venom_red.png",
-        id=(0, 0),
-        lifetime=3000,
-        scale=1.5,
-    )
-}
-
-ARMORS: Dict[str, ArmorData] = {
-    'Leather': ArmorData('Leather Armor', 0, 150, 'body', (6, 0)),
-    'steel': ArmorData('Steel Armor', 5, 800, 'body', (12, 4)),
-    'helmet': ArmorData('Helmet', 5, 400, 'head', (30, 0)),
-    'shield': ArmorData('Shield', 10, 1000, 'shield', (40, 0))
-}
-
-DOOR_CONFIG = {
-    'left': {'open': (28, 8), 'closed': (28, 7)},
-    'right': {'open': (29, 8), 'closed': (29, 7)}
-}
-
-CHEST_CONFIG = {
-    'closed': (38, 10),
-    'open': (38, 11),
-    'amount': 500
-}
-
-COIN_DATA = {
-    'amount': 100,
-    'image': 'sprites/coin.png',
-    'frames': 7,
-    'cols': 3,
-    'scale': 2,
-    'speed': 6
-}
-
-START_MONEY = 0
-
-
-def get_input_direction(keys: pygame.key.ScancodeWrapper) -> pygame.math.Vector2:
-    direction = pygame.math.Vector2(0, 0)
-    if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-        direction.x = -1
-    if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-        direction.x = 1
-    if keys[pygame.K_UP] or keys[pygame.K_w]:
-        direction.y = -1
-    if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-        direction.y = 1
-
-    if direction.length() > 0:
-        return direction.normalize()
-    return direction
-
-class Tile(pygame.sprite.Sprite):
-    def __init__(self, group: Union[pygame.sprite.Group, List], pos: Tuple[int, int], surface: pygame.Surface) -> None:
-        if isinstance(group, list):
-            super().__init__(*group)
-        else:
-            super().__init__(group)
-        self.z = LAYERS['floor']
-        self.image = pygame.transform.scale(surface, (TILE_SIZE, TILE_SIZE))
-        self.rect = self.image.get_rect(topleft=pos)
-
-
-class Wall(pygame.sprite.Sprite):
-    def __init__(self, groups: Sequence[pygame.sprite.AbstractGroup], pos: Tuple[int, int], surface: pygame.Surface) -> None:
-        super().__init__(*groups)
-        self.z = LAYERS['main']
-        self.image = pygame.transform.scale(surface, (TILE_SIZE, TILE_SIZE))
-        self.rect = self.image.get_rect(topleft=pos)
-        self.hitbox = self.rect.inflate(0, -10)
-
-class FloatingText(pygame.sprite.Sprite):
-    def __init__(self, groups: List[pygame.sprite.Group], pos: Tuple[int, int], text: str,
-                 color: Tuple[int, int, int]) -> None:
-        super().__init__(groups)
-        try:
-            font = pygame.font.Font(MAIN_FONT, 20)
-        except FileNotFoundError:
-            font = pygame.font.Font(None, 20)
-        self.image = font.render(text, True, color)
-        self.rect = self.image.get_rect(midbottom=pos)
-        self.pos = pygame.math.Vector2(self.rect.center)
-        self.velocity = pygame.math.Vector2(0, -60)
-        self.timer: float = 0
-        self.lifespan: int = 800
-        self.z = LAYERS['main']
-
-    def update(self, dt: float) -> None:
-        self.pos += self.velocity * dt
-        self.rect.center = (round(self.pos.x), round(self.pos.y))
-        self.timer += dt * 1000
-        if self.timer >= self.lifespan:
-            self.kill()
-
-
-class Player(Entity):
-    def __init__(self, group: pygame.sprite.Group, obstacles: pygame.sprite.Group,
-                 door_group: pygame.sprite.Group, chest_group: pygame.sprite.Group) -> None:
-        super().__init__([group])
-
-        self.door_group = door_group
-        self.chest_group = chest_group
-        self.display_group = group
-        self.image = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
-        self.z = LAYERS['main']
-
-        self.obstacle_sprites = obstacles
-        self.door_group = door_group
-
-        self.hit: bool = False
-        self.enemy_group: Optional[pygame.sprite.Group] = None
-        self.can_shoot: bool = True
-        self.shoot_time: int = 0
-        self.shoot_cooldown: int = 200
-        self.mouse_pressed_handled: bool = False
-
-        self.sprite_sheet = SpriteSheet(PLAYER_CHARACTER)
-        self.base_body_img = self.sprite_sheet.get_image(*PLAYER_ASSETS['body'], scale=SCALE_FACTOR)
-        self.weapon_img = self.sprite_sheet.get_image(*WEAPONS['short_sword'].id, scale=SCALE_FACTOR)
-        self.armor_body_img = self.sprite_sheet.get_image(*ARMORS['Leather'].id, scale=SCALE_FACTOR)
-        self.armor_head_img: Optional[pygame.Surface] = None
-        self.armor_shield_img: Optional[pygame.Surface] = None
-
-        self.weapon_hand: str = 'left'
-
-        self.inventory: Dict[str, Optional[str]] = {
-            'weapon': 'short_sword',
-            'body': 'Leather',
-            'head': None,
-            'shield': None
-        }
-        self.ammo: Dict[str, int] = {'arrow': 0}
-        self.owned_weapons: List[str] = ['short_sword']
-        self.owned_armors: List[str] = ['Leather']
-
-        self.can_switch_weapon: bool = True
-        self.switch_weapon_time: int = 0
-        self.switch_weapon_cooldown: int = 200
-
-        self.rect = self.image.get_rect(center=PLAYER_START_POS)
-        self.hitbox = self.rect.inflate(-10, -26)
-        self.speed = 250
-        self.pos = pygame.math.Vector2(PLAYER_START_POS)
-        self.money: int = START_MONEY
-        self.stats: Dict[str, int] = {'health': 100, 'attack': 19, 'speed': self.speed}
-        self.vulnerable: bool = True
-        self.hurt_time: int = 0
-        self.invincibility_duration: int = 500
-
-        self.attack_sound = None
-        try:
-            self.attack_sound = pygame.mixer.Sound('audio/sword.wav')
-            self.attack_sound.set_volume(0.3)
-            self.pain_sound = pygame.mixer.Sound('audio/pain.wav')
-            self.pain_sound.set_volume(0.3)
-            self.arrow_sound = pygame.mixer.Sound('audio/arrow.mp3')
-        except Exception as e:
-            print(f"Brak dźwięku: {e}")
-
-        self.weapon_offset: pygame.math.Vector2 = pygame.math.Vector2(0, 0)
-        self.update_weapon_graphics()
-        self.setup_graphics()
-
-    def input_attack(self) -> None:
-        if not self.can_shoot:
-            return
-
-        mouse_buttons = pygame.mouse.get_pressed()
-        keys = pygame.key.get_pressed()
-
-        if not mouse_buttons[0]:
-            self.mouse_pressed_handled = False
-
-        if mouse_buttons[0] and not self.mouse_pressed_handled and self.can_shoot:
-            self.mouse_pressed_handled = True
-            weapon_name = self.inventory['weapon']
-
-            if weapon_name == 'bow':
-                if self.ammo['arrow'] > 0:
-                    self.ammo['arrow'] -= 1
-                    self.arrow_sound.play()
-                    self.can_shoot = False
-                    self.shoot_time = pygame.time.get_ticks()
-
-                    mouse_pos_screen = pygame.mouse.get_pos()
-                    camera_offset = pygame.math.Vector2(0, 0)
-                    if hasattr(self.display_group, 'offset'):
-                        camera_offset = self.display_group.offset
-                    mouse_pos_world = pygame.math.Vector2(mouse_pos_screen) + camera_offset
-
-                    direction_vector = mouse_pos_world - self.pos
-                    if direction_vector.length() > 0:
-                        direction = direction_vector.normalize()
-                        target_group = self.enemy_group if self.enemy_group else pygame.sprite.Group()
-                        Projectile(self.rect.center, direction, [self.display_group], self.obstacle_sprites,
-                                   target_group,
-                                   PROJECTILES['arrow'])
-            elif weapon_name != 'bow':
-                self.can_shoot = False
-                self.shoot_time = pygame.time.get_ticks()
-
-                self.hit = True
-                if self.attack_sound:
-                    self.attack_sound.play()
-
-                if self.enemy_group:
-                    effective_range = self.get_effective_range()
-                    for enemy in self.enemy_group:
-                        distance = enemy.pos.distance_to(self.pos)
-                        if distance < effective_range:
-                            enemy.get_damage(self)
-
-        elif keys[pygame.K_SPACE]:
-            self.can_shoot = False
-            self.shoot_time = pygame.time.get_ticks()
-
-            interaction_area = self.hitbox.inflate(40, 40)
-
-            doors_hit = [sprite for sprite in self.door_group if sprite.hitbox.colliderect(interaction_area)]
-            if doors_hit:
-                doors_hit[0].toggle()
-                return
-
-            chests_hit = [sprite for sprite in self.chest_group if sprite.hitbox.colliderect(interaction_area)]
-            if chests_hit:
-                chests_hit[0].open(self)
-                return
-
-
-
-    def set_enemy_group(self, enemy_group: pygame.sprite.Group) -> None:
-        self.enemy_group = enemy_group
-
-    def get_status(self) -> None:
-        if not self.can_shoot:
-            current_time = pygame.time.get_ticks()
-            if current_time - self.shoot_time > self.shoot_cooldown:
-                self.can_shoot = True
-
-    def input_weapon_switch(self) -> None:
-        keys = pygame.key.get_pressed()
-
-        if not self.can_switch_weapon:
-            current_time = pygame.time.get_ticks()
-            if current_time - self.switch_weapon_time > self.switch_weapon_cooldown:
-                self.can_switch_weapon = True
-            else:
-                return
-
-        if not self.owned_weapons:
-            return
-
-        current_weapon = self.inventory['weapon']
-        try:
-            index = self.owned_weapons.index(current_weapon)
-        except ValueError:
-            index = 0
-
-        changed = False
-
-        if keys[pygame.K_q]:
-            index = (index - 1) % len(self.owned_weapons)
-            changed = True
-
-        elif keys[pygame.K_e]:
-            index = (index + 1) % len(self.owned_weapons)
-            changed = True
-
-        if changed:
-            self.inventory['weapon'] = self.owned_weapons[index]
-            self.update_weapon_graphics()
-
-            self.can_switch_weapon = False
-            self.switch_weapon_time = pygame.time.get_ticks()
-
-    def input_hand_swap(self) -> None:
-        keys = pygame.key.get_pressed()
-        weapon_name = self.inventory['weapon']
-
-        if not weapon_name:
-            return
-        weapon_data = WEAPONS[weapon_name]
-        if weapon_data.rotates_to_mouse:
-            return
-
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            if self.weapon_hand == 'right':
-                self.weapon_img = pygame.transform.flip(self.weapon_img, True, False)
-                self.weapon_hand = 'left'
-
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            if self.weapon_hand == 'left':
-                self.weapon_img = pygame.transform.flip(self.weapon_img, True, False)
-                self.weapon_hand = 'right'
-
-    def get_effective_range(self) -> int:
-        weapon_name = self.inventory['weapon']
-
-        if not weapon_name or weapon_name == 'bow':
-            return 0
-
-        weapon_data = WEAPONS[weapon_name]
-        return TILE_SIZE + (weapon_data.range * 16)
-
-    def get_damage(self, amount: float) -> None:
-        if self.vulnerable:
-            total_def = self.get_total_armor()
-            actual_damage = amount - total_def
-            actual_damage = max(1, actual_damage)
-            self.stats['health'] -= actual_damage
-            if self.pain_sound:
-                self.pain_sound.play()
-            self.vulnerable = False
-            self.hurt_time = pygame.time.get_ticks()
-            FloatingText([self.display_group], self.rect.midtop, f"-{int(actual_damage)}", (255, 0, 0))
-
-    def get_total_armor(self) -> int:
-        total_def = 0
-        for slot in ['body', 'head', 'shield']:
-            item_name = self.inventory.get(slot)
-            if item_name:
-                total_def += ARMORS[item_name].defense
-        return total_def
-
-    def check_invincibility(self) -> None:
-        if not self.vulnerable:
-            current_time = pygame.time.get_ticks()
-            if current_time - self.hurt_time > self.invincibility_duration:
-                self.vulnerable = True
-
-    def get_full_weapon_damage(self) -> int:
-        base_damage = self.stats['attack']
-        weapon_name = self.inventory['weapon']
-        if weapon_name:
-            weapon_damage = WEAPONS[weapon_name].damage
-            return base_damage + weapon_damage
-        return base_damage
-
-    def rotate_weapon(self, hand: str, hit: bool) -> Tuple[pygame.Surface, Tuple[int, int]]:
-        rotate_vector = (0, 0)
-        image = self.weapon_img
-
-        weapon_name = self.inventory['weapon']
-        if not weapon_name:
-            return image, rotate_vector
-
-        weapon_data = WEAPONS[weapon_name]
-
-        if weapon_data.rotates_to_mouse:
-            camera_offset = pygame.math.Vector2(0, 0)
-            if hasattr(self.display_group, 'offset'):
-                camera_offset = self.display_group.offset
-            mouse_pos_world = pygame.math.Vector2(pygame.mouse.get_pos()) + camera_offset
-            direction_vector = mouse_pos_world - self.pos
-
-            if direction_vector.length() > 0:
-                angle = direction_vector.angle_to(pygame.math.Vector2(1, 0))
-            else:
-                angle = 0
-
-            image = pygame.transform.rotate(image, angle)
-            rotate_vector = (0, 0)
-
-        else:
-            if hit:
-                rotate_vector = (0, 0)
-                image = pygame.transform.rotate(image, 90)
-                image = pygame.transform.flip(image, False, True)
-                if hand == 'right':
-                    rotate_vector = (0, 27)
-                    image = pygame.transform.flip(image, True, False)
-
-        return image, rotate_vector
-
-    def update_weapon_graphics(self) -> None:
-        weapon_name = self.inventory['weapon']
-
-        if weapon_name == 'bow':
-            if self.inventory['shield'] is not None:
-                self.inventory['shield'] = None
-                self.update_armor_graphics()
-
-        if weapon_name:
-            weapon_data = WEAPONS[weapon_name]
-            try:
-                temp_sheet = SpriteSheet(weapon_data.graphic_path)
-                self.weapon_img = temp_sheet.get_image(*weapon_data.id, scale=weapon_data.scale)
-            except Exception as e:
-                print(f"Error loading weapon: {e}")
-                self.weapon_img = pygame.Surface((10, 10))
-                self.weapon_img.fill('red')
-
-            if weapon_data.flip_horizontal:
-                self.weapon_img = pygame.transform.flip(self.weapon_img, True, False)
-
-            self.weapon_hand = 'right'
-
-            self.weapon_offset = pygame.math.Vector2(weapon_data.offset)
-            self.setup_graphics()
-
-    def update_armor_graphics(self) -> None:
-        body_name = self.inventory['body']
-        if body_name:
-            self.armor_body_img = self.sprite_sheet.get_image(*ARMORS[body_name].id, scale=SCALE_FACTOR)
-        else:
-            self.armor_body_img = self.sprite_sheet.get_image(*ARMORS['Leather'].id, scale=SCALE_FACTOR)
-
-        head_name = self.inventory['head']
-        if head_name:
-            self.armor_head_img = self.sprite_sheet.get_image(*ARMORS[head_name].id, scale=SCALE_FACTOR)
-        else:
-            self.armor_head_img = None
-
-        shield_name = self.inventory['shield']
-        if shield_name:
-            self.armor_shield_img = pygame.transform.flip(self.sprite_sheet.get_image(*ARMORS[shield_name].id, scale=SCALE_FACTOR),True,False)
-        else:
-            self.armor_shield_img = None
-
-        self.setup_graphics()
-
-    def setup_graphics(self) -> None:
-        self.image.fill((0, 0, 0, 0))
-        rotate_image, rotate_vector = self.rotate_weapon(self.weapon_hand, self.hit)
-
-        self.image.blit(self.base_body_img, (0, 0))
-        if self.armor_body_img: self.image.blit(self.armor_body_img, (0, 0))
-        if self.armor_head_img: self.image.blit(self.armor_head_img, (0, 0))
-
-        if self.armor_shield_img:
-            shield_surf = self.armor_shield_img
-            if self.weapon_hand == 'right':
-                shield_surf = pygame.transform.flip(shield_surf, True, False)
-            self.image.blit(shield_surf, (0, 0))
-
-        weapon_data = WEAPONS.get(self.inventory['weapon'])
-        center_x = TILE_SIZE // 2
-        center_y = TILE_SIZE // 2
-        pivot_pos = pygame.math.Vector2(center_x, center_y) + self.weapon_offset
-
-        if weapon_data and not weapon_data.rotates_to_mouse:
-            if self.weapon_hand == 'left':
-                pivot_pos.x = TILE_SIZE - pivot_pos.x
-
-        weapon_rect = rotate_image.get_rect(center=(int(pivot_pos.x), int(pivot_pos.y)))
-        weapon_rect.x += rotate_vector[0]
-        weapon_rect.y += rotate_vector[1]
-
-        self.image.blit(rotate_image, weapon_rect)
-
-        if not self.vulnerable:
-            tint_surf = pygame.Surface(self.image.get_size()).convert_alpha()
-            tint_surf.fill((255, 0, 0, 0))
-            self.image.blit(tint_surf, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
-
-    def update(self, dt: float) -> None:
-        self.get_status()
-        self.check_invincibility()
-
-        keys = pygame.key.get_pressed()
-        direction = get_input_direction(keys)
-        self.velocity = direction * self.speed
-        self.move(dt)
-
-        self.input_hand_swap()
-        self.input_weapon_switch()
-        self.input_attack()
-        self.setup_graphics()
-
-
-class Coin(pygame.sprite.Sprite):
-    def __init__(self, groups: List[pygame.sprite.Group], pos: Tuple[int, int],value: int) -> None:
-        super().__init__(groups)
-
-        self.frames: List[pygame.Surface] = []
-        self.frame_index: float = 0
-        self.animation_speed: float = COIN_DATA['speed']
-        self.value = value
-
-        try:
-            ss = SpriteSheet(COIN_DATA['image'])
-            sheet_w = ss.sheet.get_width()
-            sheet_h = ss.sheet.get_height()
-
-            cols = COIN_DATA['cols']
-            frame_w = sheet_w // cols
-            frame_h = sheet_h // 3
-            scale = COIN_DATA['scale']
-
-            for i in range(COIN_DATA['frames']):
-                col = i % cols
-                row = i // cols
-                img = ss.get_image(col, row, frame_w, frame_h, scale)
-                self.frames.append(img)
-
-        except Exception as e:
-            print(f"Error loading coin: {e}")
-            self.image = pygame.Surface((20, 20))
-            self.image.fill('yellow')
-
-        if self.frames:
-            self.image = self.frames[int(self.frame_index)]
-        else:
-            self.image = pygame.Surface((20, 20))
-
-        self.rect = self.image.get_rect(center=pos)
-        self.hitbox = self.rect.inflate(-10, -10)
-        self.z = LAYERS['main']
-
-    def update(self, dt: float) -> None:
-        self.frame_index += self.animation_speed * dt
-        if self.frame_index >= len(self.frames):
-            self.frame_index = 0
-        self.image = self.frames[int(self.frame_index)]
-
-
-class Projectile(pygame.sprite.Sprite):
-    def __init__(self,
-                 pos: Tuple[int, int],
-                 direction: pygame.math.Vector2,
-                 groups: List[pygame.sprite.Group],
-                 obstacles: pygame.sprite.Group,
-                 damage_group: pygame.sprite.Group,
-                 projectile_data: ProjectileData) -> None:
-        super().__init__(groups)
-
-        self.damage = projectile_data.damage
-        self.speed = projectile_data.speed
-        self.lifetime = projectile_data.lifetime
-        self.start_time = pygame.time.get_ticks()
-        self.obstacles = obstacles
-        self.damage_group = damage_group
-        self.arrow_hit = pygame.mixer.Sound('audio/arrow_hit.mp3')
-
-        try:
-            ss = SpriteSheet(projectile_data.image)
-            original_image = ss.get_image(*projectile_data.id, scale=projectile_data.scale)
-
-        except (FileNotFoundError, Exception) as e:
-            print(f"Error loading projectile sprite: {e}")
-            original_image = pygame.Surface((20, 5))
-            original_image.fill((200, 200, 200))
-
-        angle = direction.angle_to(pygame.math.Vector2(1, 0))
-        self.image = pygame.transform.rotate(original_image, angle)
-
-        self.rect = self.image.get_rect(center=pos)
-        self.hitbox = self.rect.inflate(-10, -10)
-
-        self.pos = pygame.math.Vector2(pos)
-        self.direction = direction.normalize()
-        self.z = LAYERS['main']
-
-    def update(self, dt: float) -> None:
-        self.pos += self.direction * self.speed * dt
-        self.hitbox.center = (round(self.pos.x), round(self.pos.y))
-        self.rect.center = self.hitbox.center
-
-        if pygame.sprite.spritecollide(self, self.obstacles, False):
-            self.kill()
-
-        hits = pygame.sprite.spritecollide(self, self.damage_group, False)
-        for target in hits:
-            if self.arrow_hit:
-                self.arrow_hit.play()
-
-            if isinstance(target, Player):
-                target.get_damage(self.damage)
-                self.kill()
-
-            elif hasattr(target, 'health'):
-                if getattr(target, 'vulnerable', True):
-                    target.health -= self.damage
-                    target.vulnerable = False
-                    target.hit_time = pygame.time.get_ticks()
-
-                    if hasattr(target, 'knockback_direction'):
-                        target.knockback_direction = self.direction.normalize()
-
-                    self.kill()
-
-
-class Door(pygame.sprite.Sprite):
-    def __init__(self, groups: List[pygame.sprite.Group], pos: Tuple[int, int],
-                 obstacles_group: pygame.sprite.Group, sprite_sheet: SpriteSheet,
-                 door_sprites: pygame.sprite.Group, side: str) -> None:
-        super().__init__(groups)
-
-        self.door_sprites = door_sprites
-        self.side = side
-
-        config = DOOR_CONFIG.get(side)
-        if config:
-            self.closed_image = sprite_sheet.get_image(*config['closed'], scale=SCALE_FACTOR)
-            self.open_image = sprite_sheet.get_image(*config['open'], scale=SCALE_FACTOR)
-        else:
-            self.closed_image = pygame.Surface((TILE_SIZE, TILE_SIZE))
-            self.closed_image.fill('brown')
-            self.open_image = pygame.Surface((TILE_SIZE, TILE_SIZE))
-            self.open_image.fill('black')
-
-        self.image = self.closed_image
-        self.rect = self.image.get_rect(topleft=pos)
-        self.hitbox = self.rect.inflate(0, -10)
-        self.z = LAYERS['main']
-
-        self.is_open = False
-        self.obstacles_group = obstacles_group
-        self.obstacles_group.add(self)
-
-        try:
-            self.open_sound = pygame.mixer.Sound('audio/door_open.mp3')
-            self.open_sound.set_volume(0.3)
-        except (FileNotFoundError, Exception):
-            self.open_sound = None
-
-    def toggle(self, from_neighbor: bool = False) -> None:
-        if self.is_open:
-            self.is_open = False
-            self.image = self.closed_image
-            self.obstacles_group.add(self)
-        else:
-            self.is_open = True
-            self.image = self.open_image
-            self.obstacles_group.remove(self)
-            if self.open_sound and not from_neighbor:
-                self.open_sound.play()
-
-        if not from_neighbor:
-            neighbor = self.find_neighbor()
-            if neighbor:
-                neighbor.toggle(from_neighbor=True)
-
-    def find_neighbor(self):
-        offset = 0
-        if self.side == 'left':
-            offset = TILE_SIZE
-        elif self.side == 'right':
-            offset = -TILE_SIZE
-
-        if offset != 0:
-            target_pos = (self.rect.x + offset, self.rect.y)
-            for sprite in self.door_sprites:
-                if sprite.rect.collidepoint(target_pos) and sprite != self:
-                    return sprite
-        return None
-
-
-class Chest(pygame.sprite.Sprite):
-    def __init__(self, groups: List[pygame.sprite.Group], pos: Tuple[int, int],
-                 obstacles_group: pygame.sprite.Group, sprite_sheet: SpriteSheet,
-                 on_open: Callable[['Player', pygame.math.Vector2, List[pygame.sprite.Group]], None]) -> None:
-        super().__init__(groups)
-
-        self.closed_image = sprite_sheet.get_image(*CHEST_CONFIG['closed'], scale=SCALE_FACTOR)
-        self.open_image = sprite_sheet.get_image(*CHEST_CONFIG['open'], scale=SCALE_FACTOR)
-        self.image = self.closed_image
-        self.rect = self.image.get_rect(topleft=pos)
-        self.hitbox = self.rect.inflate(0, -10)
-        self.z = LAYERS['main']
-
-        self.is_open = False
-
-        self.on_open_callback = on_open
-
-        self.obstacles_group = obstacles_group
-        self.obstacles_group.add(self)
-
-    def open(self, player) -> None:
-        if not self.is_open:
-            self.is_open = True
-            self.image = self.open_image
-            if self.on_open_callback:
-                self.on_open_callback(player, self.rect.midtop, self.groups())
-
-            if hasattr(player, 'coin_sound') and player.coin_sound:
+import pygame
+from collections import OrderedDict
+from typing import List, Optional, Union, Sequence, Callable, Dict
+from Settings import *
+from Entity import Entity
+from SpatialGrid import SpatialGroup
+from Support import ObjectPool, SpriteSheet, assets, rotations, sim_clock, texts, tints
+from Input import InputSource
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class WeaponData:
+    name: str
+    damage: int
+    cost: int
+    range: int
+    id: Tuple[int, int]
+    graphic_path: str = PLAYER_CHARACTER
+    flip_horizontal: bool = False
+    scale: float = SCALE_FACTOR
+    offset: Tuple[int, int] = (0, 0)
+    rotates_to_mouse: bool = False
+
+@dataclass(frozen=True)
+class ArmorData:
+    name: str
+    defense: int
+    cost: int
+    slot: str
+    id: Tuple[int, int]
+    graphic_path: str = PLAYER_CHARACTER
+
+@dataclass(frozen=True)
+class ProjectileData:
+    damage: int
+    speed: int
+    image: str
+    id: Tuple[int, int]
+    lifetime: int
+    scale: float = SCALE_FACTOR
+
+WEAPONS: Dict[str, WeaponData] = {
+    'short_sword': WeaponData('short sword', 1, 0, 1, (45, 7)),
+    'axe': WeaponData('axe', 3, 250, 1, (48, 7)),
+    'long_sword': WeaponData('long sword', 6, 600, 2, (45, 6)),
+    'pique': WeaponData('pique', 5, 1200, 3, (47, 5)),
+    'bow': WeaponData(
+        name='bow', damage=12, cost=1500, range=-1,
+        id=(0, 0), graphic_path="sprites/Bow and Arrows.png",
+        scale=2, offset=(8, 8), rotates_to_mouse=True
+    )
+}
+
+PROJECTILES: Dict[str, ProjectileData] = {
+    'arrow': ProjectileData(
+        damage=15,
+        speed=600,
+        image="sprites/Bow and Arrows.png",
+        id=(2, 1),
+        lifetime=3000,
+        scale=1.5,
+    ),
+    'venom': ProjectileData(
+        damage=10,
+        speed=400,
+        image="sprites/venom_red.png",
+        id=(0, 0),
+        lifetime=3000,
+        scale=1.5,
+    )
+}
+
+ARMORS: Dict[str, ArmorData] = {
+    'Leather': ArmorData('Leather Armor', 0, 150, 'body', (6, 0)),
+    'steel': ArmorData('Steel Armor', 5, 800, 'body', (12, 4)),
+    'helmet': ArmorData('Helmet', 5, 400, 'head', (30, 0)),
+    'shield': ArmorData('Shield', 10, 1000, 'shield', (40, 0))
+}
+
+DOOR_CONFIG = {
+    'left': {'open': (28, 8), 'closed': (28, 7)},
+    'right': {'open': (29, 8), 'closed': (29, 7)}
+}
+
+CHEST_CONFIG = {
+    'closed': (38, 10),
+    'open': (38, 11),
+    'amount': 500
+}
+
+COIN_DATA = {
+    'amount': 100,
+    'image': 'sprites/coin.png',
+    'frames': 7,
+    'cols': 3,
+    'scale': 2,
+    'speed': 6
+}
+
+START_MONEY = 0
+
+
+def build_rotation_atlas() -> None:
+    for projectile_data in PROJECTILES.values():
+        image = assets.sprite(projectile_data.image, *projectile_data.id, scale=projectile_data.scale)
+        rotations.build(projectile_data, image)
+
+    for weapon_data in WEAPONS.values():
+        if weapon_data.rotates_to_mouse:
+            image = assets.sprite(weapon_data.graphic_path, *weapon_data.id, scale=weapon_data.scale)
+            if weapon_data.flip_horizontal:
+                image = pygame.transform.flip(image, True, False)
+            rotations.build(weapon_data, image)
+
+
+def get_input_direction(keys: pygame.key.ScancodeWrapper) -> pygame.math.Vector2:
+    direction = pygame.math.Vector2(0, 0)
+    if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        direction.x = -1
+    if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        direction.x = 1
+    if keys[pygame.K_UP] or keys[pygame.K_w]:
+        direction.y = -1
+    if keys[pygame.K_DOWN] or keys[pygame.K_s]:
+        direction.y = 1
+
+    if direction.length() > 0:
+        return direction.normalize()
+    return direction
+
+#kafelki z atlasu mapy sa juz w rozmiarze TILE_SIZE, skalujemy tylko surowe
+def tile_surface(surface: pygame.Surface) -> pygame.Surface:
+    if surface.get_size() == (TILE_SIZE, TILE_SIZE):
+        return surface
+    return pygame.transform.scale(surface, (TILE_SIZE, TILE_SIZE))
+
+
+class Tile(pygame.sprite.Sprite):
+    is_static: bool = True
+
+    def __init__(self, group: Union[pygame.sprite.Group, List], pos: Tuple[int, int], surface: pygame.Surface) -> None:
+        if isinstance(group, list):
+            super().__init__(*group)
+        else:
+            super().__init__(group)
+        self.z = LAYERS['floor']
+        self.image = tile_surface(surface)
+        self.rect = self.image.get_rect(topleft=pos)
+
+
+class Wall(pygame.sprite.Sprite):
+    is_static: bool = True
+
+    def __init__(self, groups: Sequence[pygame.sprite.AbstractGroup], pos: Tuple[int, int], surface: pygame.Surface) -> None:
+        super().__init__(*groups)
+        self.z = LAYERS['main']
+        self.image = tile_surface(surface)
+        self.rect = self.image.get_rect(topleft=pos)
+        self.hitbox = self.rect.inflate(0, -10)
+
+class FloatingText(pygame.sprite.Sprite):
+    pool: ObjectPool
+
+    def __init__(self, groups: List[pygame.sprite.Group], pos: Tuple[int, int], text: str,
+                 color: Tuple[int, int, int]) -> None:
+        super().__init__()
+        self.velocity = pygame.math.Vector2(0, -60)
+        self.lifespan: int = 800
+        self.z = LAYERS['main']
+        self.reset(groups, pos, text, color)
+
+    def reset(self, groups: List[pygame.sprite.Group], pos: Tuple[int, int], text: str,
+              color: Tuple[int, int, int]) -> None:
+        self.add(groups)
+        self.image = texts.render(MAIN_FONT, 20, text, color, True)
+        self.rect = self.image.get_rect(midbottom=pos)
+        self.pos = pygame.math.Vector2(self.rect.center)
+        self.timer: float = 0
+
+    @classmethod
+    def spawn(cls, groups: List[pygame.sprite.Group], pos: Tuple[int, int], text: str,
+              color: Tuple[int, int, int]) -> 'FloatingText':
+        return cls.pool.acquire(groups, pos, text, color)
+
+    def kill(self) -> None:
+        if self.alive():
+            super().kill()
+            self.pool.release(self)
+
+    def update(self, dt: float) -> None:
+        self.pos += self.velocity * dt
+        self.rect.center = (round(self.pos.x), round(self.pos.y))
+        self.timer += dt * 1000
+        if self.timer >= self.lifespan:
+            self.kill()
+
+
+class Player(Entity):
+    def __init__(self, group: pygame.sprite.Group, obstacles: pygame.sprite.Group,
+                 door_group: pygame.sprite.Group, chest_group: pygame.sprite.Group,
+                 input_source: Optional[InputSource] = None) -> None:
+        super().__init__([group])
+
+        self.input = input_source if input_source else InputSource()
+        #wspolna grupa celu dla pociskow przeciwnikow
+        self.target_group = pygame.sprite.Group()
+        self.target_group.add(self)
+
+        self.door_group = door_group
+        self.chest_group = chest_group
+        self.display_group = group
+        self.image = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
+        self.composites: OrderedDict[Tuple, pygame.Surface] = OrderedDict()
+        self.z = LAYERS['main']
+
+        self.obstacle_sprites = obstacles
+        self.door_group = door_group
+
+        self.hit: bool = False
+        self.enemy_group: Optional[pygame.sprite.Group] = None
+        self.can_shoot: bool = True
+        self.shoot_time: int = 0
+        self.shoot_cooldown: int = 200
+        self.mouse_pressed_handled: bool = False
+
+        self.sprite_sheet = assets.sheet(PLAYER_CHARACTER)
+        self.base_body_img = assets.sprite(PLAYER_CHARACTER, *PLAYER_ASSETS['body'], scale=SCALE_FACTOR)
+        self.weapon_img = assets.sprite(PLAYER_CHARACTER, *WEAPONS['short_sword'].id, scale=SCALE_FACTOR)
+        self.armor_body_img = assets.sprite(PLAYER_CHARACTER, *ARMORS['Leather'].id, scale=SCALE_FACTOR)
+        self.armor_head_img: Optional[pygame.Surface] = None
+        self.armor_shield_img: Optional[pygame.Surface] = None
+
+        self.weapon_hand: str = 'left'
+
+        self.inventory: Dict[str, Optional[str]] = {
+            'weapon': 'short_sword',
+            'body': 'Leather',
+            'head': None,
+            'shield': None
+        }
+        self.ammo: Dict[str, int] = {'arrow': 0}
+        self.owned_weapons: List[str] = ['short_sword']
+        self.owned_armors: List[str] = ['Leather']
+
+        self.can_switch_weapon: bool = True
+        self.switch_weapon_time: int = 0
+        self.switch_weapon_cooldown: int = 200
+
+        self.rect = self.image.get_rect(center=PLAYER_START_POS)
+        self.hitbox = self.rect.inflate(-10, -26)
+        self.speed = 250
+        self.pos = pygame.math.Vector2(PLAYER_START_POS)
+        self.money: int = START_MONEY
+        self.stats: Dict[str, int] = {'health': 100, 'attack': 19, 'speed': self.speed}
+        self.vulnerable: bool = True
+        self.hurt_time: int = 0
+        self.invincibility_duration: int = 500
+
+        self.attack_sound = None
+        try:
+            self.attack_sound = assets.sound('audio/sword.wav')
+            self.attack_sound.set_volume(0.3)
+            self.pain_sound = assets.sound('audio/pain.wav')
+            self.pain_sound.set_volume(0.3)
+            self.arrow_sound = assets.sound('audio/arrow.mp3')
+        except Exception as e:
+            print(f"Brak dźwięku: {e}")
+
+        self.weapon_offset: pygame.math.Vector2 = pygame.math.Vector2(0, 0)
+        self.update_weapon_graphics()
+        self.setup_graphics()
+
+    def input_attack(self) -> None:
+        if not self.can_shoot:
+            return
+
+        mouse_buttons = self.input.mouse_buttons()
+        keys = self.input.keys()
+
+        if not mouse_buttons[0]:
+            self.mouse_pressed_handled = False
+
+        if mouse_buttons[0] and not self.mouse_pressed_handled and self.can_shoot:
+            self.mouse_pressed_handled = True
+            weapon_name = self.inventory['weapon']
+
+            if weapon_name == 'bow':
+                if self.ammo['arrow'] > 0:
+                    self.ammo['arrow'] -= 1
+                    self.arrow_sound.play()
+                    self.can_shoot = False
+                    self.shoot_time = sim_clock.get_ticks()
+
+                    camera_offset = pygame.math.Vector2(0, 0)
+                    if hasattr(self.display_group, 'offset'):
+                        camera_offset = self.display_group.offset
+                    mouse_pos_world = self.input.world_mouse_pos(camera_offset)
+
+                    direction_vector = mouse_pos_world - self.pos
+                    if direction_vector.length() > 0:
+                        direction = direction_vector.normalize()
+                        target_group = self.enemy_group if self.enemy_group else pygame.sprite.Group()
+                        Projectile.spawn(self.rect.center, direction, [self.display_group], self.obstacle_sprites,
+                                   target_group,
+                                   PROJECTILES['arrow'])
+            elif weapon_name != 'bow':
+                self.can_shoot = False
+                self.shoot_time = sim_clock.get_ticks()
+
+                self.hit = True
+                if self.attack_sound:
+                    self.attack_sound.play()
+
+                if self.enemy_group:
+                    effective_range = self.get_effective_range()
+                    for enemy in self.enemy_group:
+                        distance = enemy.pos.distance_to(self.pos)
+                        if distance < effective_range:
+                            enemy.get_damage(self)
+
+        elif keys[pygame.K_SPACE]:
+            self.can_shoot = False
+            self.shoot_time = sim_clock.get_ticks()
+
+            interaction_area = self.hitbox.inflate(40, 40)
+
+            doors_hit = [sprite for sprite in self.door_group if sprite.hitbox.colliderect(interaction_area)]
+            if doors_hit:
+                doors_hit[0].toggle()
+                return
+
+            chests_hit = [sprite for sprite in self.chest_group if sprite.hitbox.colliderect(interaction_area)]
+            if chests_hit:
+                chests_hit[0].open(self)
+                return
+
+
+
+    def set_enemy_group(self, enemy_group: pygame.sprite.Group) -> None:
+        self.enemy_group = enemy_group
+
+    def get_status(self) -> None:
+        if not self.can_shoot:
+            current_time = sim_clock.get_ticks()
+            if current_time - self.shoot_time > self.shoot_cooldown:
+                self.can_shoot = True
+
+    def input_weapon_switch(self) -> None:
+        keys = self.input.keys()
+
+        if not self.can_switch_weapon:
+            current_time = sim_clock.get_ticks()
+            if current_time - self.switch_weapon_time > self.switch_weapon_cooldown:
+                self.can_switch_weapon = True
+            else:
+                return
+
+        if not self.owned_weapons:
+            return
+
+        current_weapon = self.inventory['weapon']
+        try:
+            index = self.owned_weapons.index(current_weapon)
+        except ValueError:
+            index = 0
+
+        changed = False
+
+        if keys[pygame.K_q]:
+            index = (index - 1) % len(self.owned_weapons)
+            changed = True
+
+        elif keys[pygame.K_e]:
+            index = (index + 1) % len(self.owned_weapons)
+            changed = True
+
+        if changed:
+            self.inventory['weapon'] = self.owned_weapons[index]
+            self.update_weapon_graphics()
+
+            self.can_switch_weapon = False
+            self.switch_weapon_time = sim_clock.get_ticks()
+
+    def input_hand_swap(self) -> None:
+        keys = self.input.keys()
+        weapon_name = self.inventory['weapon']
+
+        if not weapon_name:
+            return
+        weapon_data = WEAPONS[weapon_name]
+        if weapon_data.rotates_to_mouse:
+            return
+
+        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+            if self.weapon_hand == 'right':
+                self.weapon_img = pygame.transform.flip(self.weapon_img, True, False)
+                self.weapon_hand = 'left'
+
+        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+            if self.weapon_hand == 'left':
+                self.weapon_img = pygame.transform.flip(self.weapon_img, True, False)
+                self.weapon_hand = 'right'
+
+    def get_effective_range(self) -> int:
+        weapon_name = self.inventory['weapon']
+
+        if not weapon_name or weapon_name == 'bow':
+            return 0
+
+        weapon_data = WEAPONS[weapon_name]
+        return TILE_SIZE + (weapon_data.range * 16)
+
+    def get_damage(self, amount: float) -> None:
+        if self.vulnerable:
+            total_def = self.get_total_armor()
+            actual_damage = amount - total_def
+            actual_damage = max(1, actual_damage)
+            self.stats['health'] -= actual_damage
+            if self.pain_sound:
+                self.pain_sound.play()
+            self.vulnerable = False
+            self.hurt_time = sim_clock.get_ticks()
+            FloatingText.spawn([self.display_group], self.rect.midtop, f"-{int(actual_damage)}", (255, 0, 0))
+
+    def get_total_armor(self) -> int:
+        total_def = 0
+        for slot in ['body', 'head', 'shield']:
+            item_name = self.inventory.get(slot)
+            if item_name:
+                total_def += ARMORS[item_name].defense
+        return total_def
+
+    def check_invincibility(self) -> None:
+        if not self.vulnerable:
+            current_time = sim_clock.get_ticks()
+            if current_time - self.hurt_time > self.invincibility_duration:
+                self.vulnerable = True
+
+    def get_full_weapon_damage(self) -> int:
+        base_damage = self.stats['attack']
+        weapon_name = self.inventory['weapon']
+        if weapon_name:
+            weapon_damage = WEAPONS[weapon_name].damage
+            return base_damage + weapon_damage
+        return base_damage
+
+    def aim_angle(self) -> float:
+        camera_offset = pygame.math.Vector2(0, 0)
+        if hasattr(self.display_group, 'offset'):
+            camera_offset = self.display_group.offset
+        mouse_pos_world = self.input.world_mouse_pos(camera_offset)
+        direction_vector = mouse_pos_world - self.pos
+
+        if direction_vector.length() > 0:
+            return direction_vector.angle_to(pygame.math.Vector2(1, 0))
+        return 0
+
+    def rotate_weapon(self, hand: str, hit: bool) -> Tuple[pygame.Surface, Tuple[int, int]]:
+        rotate_vector = (0, 0)
+        image = self.weapon_img
+
+        weapon_name = self.inventory['weapon']
+        if not weapon_name:
+            return image, rotate_vector
+
+        weapon_data = WEAPONS[weapon_name]
+
+        if weapon_data.rotates_to_mouse:
+            image = rotations.get(weapon_data, self.aim_angle(), image)
+            rotate_vector = (0, 0)
+
+        else:
+            if hit:
+                rotate_vector = (0, 0)
+                image = pygame.transform.rotate(image, 90)
+                image = pygame.transform.flip(image, False, True)
+                if hand == 'right':
+                    rotate_vector = (0, 27)
+                    image = pygame.transform.flip(image, True, False)
+
+        return image, rotate_vector
+
+    def update_weapon_graphics(self) -> None:
+        weapon_name = self.inventory['weapon']
+
+        if weapon_name == 'bow':
+            if self.inventory['shield'] is not None:
+                self.inventory['shield'] = None
+                self.update_armor_graphics()
+
+        if weapon_name:
+            weapon_data = WEAPONS[weapon_name]
+            try:
+                self.weapon_img = assets.sprite(weapon_data.graphic_path, *weapon_data.id, scale=weapon_data.scale)
+            except Exception as e:
+                print(f"Error loading weapon: {e}")
+                self.weapon_img = pygame.Surface((10, 10))
+                self.weapon_img.fill('red')
+
+            if weapon_data.flip_horizontal:
+                self.weapon_img = pygame.transform.flip(self.weapon_img, True, False)
+
+            self.weapon_hand = 'right'
+
+            self.weapon_offset = pygame.math.Vector2(weapon_data.offset)
+            self.clear_composites()
+            self.setup_graphics()
+
+    def update_armor_graphics(self) -> None:
+        body_name = self.inventory['body']
+        if body_name:
+            self.armor_body_img = assets.sprite(PLAYER_CHARACTER, *ARMORS[body_name].id, scale=SCALE_FACTOR)
+        else:
+            self.armor_body_img = assets.sprite(PLAYER_CHARACTER, *ARMORS['Leather'].id, scale=SCALE_FACTOR)
+
+        head_name = self.inventory['head']
+        if head_name:
+            self.armor_head_img = assets.sprite(PLAYER_CHARACTER, *ARMORS[head_name].id, scale=SCALE_FACTOR)
+        else:
+            self.armor_head_img = None
+
+        shield_name = self.inventory['shield']
+        if shield_name:
+            self.armor_shield_img = pygame.transform.flip(assets.sprite(PLAYER_CHARACTER, *ARMORS[shield_name].id, scale=SCALE_FACTOR),True,False)
+        else:
+            self.armor_shield_img = None
+
+        self.clear_composites()
+        self.setup_graphics()
+
+    #klucz zlozonego obrazka: wyposazenie, reka, atak, nietykalnosc i skwantowany kat celowania
+    def graphics_key(self) -> Tuple:
+        weapon_data = WEAPONS.get(self.inventory['weapon'])
+        aim_step = -1
+        if weapon_data and weapon_data.rotates_to_mouse:
+            aim_step = rotations.step_for(self.aim_angle())
+        return tuple(self.inventory.items()), self.weapon_hand, self.hit, self.vulnerable, aim_step
+
+    #gotowy obrazek z cache, skladanie warstw tylko przy braku trafienia
+    def setup_graphics(self) -> None:
+        key = self.graphics_key()
+        image = self.composites.get(key)
+        if image is None:
+            image = self.compose_graphics()
+            self.composites[key] = image
+            if len(self.composites) > PLAYER_COMPOSITE_CACHE:
+                self.composites.popitem(last=False)
+        else:
+            self.composites.move_to_end(key)
+        self.image = image
+
+    def clear_composites(self) -> None:
+        self.composites.clear()
+
+    def compose_graphics(self) -> pygame.Surface:
+        image = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
+        rotate_image, rotate_vector = self.rotate_weapon(self.weapon_hand, self.hit)
+
+        image.blit(self.base_body_img, (0, 0))
+        if self.armor_body_img: image.blit(self.armor_body_img, (0, 0))
+        if self.armor_head_img: image.blit(self.armor_head_img, (0, 0))
+
+        if self.armor_shield_img:
+            shield_surf = self.armor_shield_img
+            if self.weapon_hand == 'right':
+                shield_surf = pygame.transform.flip(shield_surf, True, False)
+            image.blit(shield_surf, (0, 0))
+
+        weapon_data = WEAPONS.get(self.inventory['weapon'])
+        center_x = TILE_SIZE // 2
+        center_y = TILE_SIZE // 2
+        pivot_pos = pygame.math.Vector2(center_x, center_y) + self.weapon_offset
+
+        if weapon_data and not weapon_data.rotates_to_mouse:
+            if self.weapon_hand == 'left':
+                pivot_pos.x = TILE_SIZE - pivot_pos.x
+
+        weapon_rect = rotate_image.get_rect(center=(int(pivot_pos.x), int(pivot_pos.y)))
+        weapon_rect.x += rotate_vector[0]
+        weapon_rect.y += rotate_vector[1]
+
+        image.blit(rotate_image, weapon_rect)
+
+        if not self.vulnerable:
+            tint_surf = tints.overlay(image.get_size(), (255, 0, 0, 0))
+            image.blit(tint_surf, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+        return image
+
+    def update(self, dt: float) -> None:
+        self.get_status()
+        self.check_invincibility()
+
+        keys = self.input.keys()
+        direction = get_input_direction(keys)
+        self.velocity = direction * self.speed
+        self.move(dt)
+
+        self.input_hand_swap()
+        self.input_weapon_switch()
+        self.input_attack()
+        self.setup_graphics()
+
+
+class Coin(pygame.sprite.Sprite):
+    pool: ObjectPool
+
+    def __init__(self, groups: List[pygame.sprite.Group], pos: Tuple[int, int],value: int) -> None:
+        super().__init__()
+
+        self.frames: List[pygame.Surface] = []
+        self.animation_speed: float = COIN_DATA['speed']
+
+        try:
+            ss = assets.sheet(COIN_DATA['image'])
+            sheet_w = ss.sheet.get_width()
+            sheet_h = ss.sheet.get_height()
+
+            cols = COIN_DATA['cols']
+            frame_w = sheet_w // cols
+            frame_h = sheet_h // 3
+            scale = COIN_DATA['scale']
+
+            for i in range(COIN_DATA['frames']):
+                col = i % cols
+                row = i // cols
+                img = assets.sprite(COIN_DATA['image'], col, row, frame_w, frame_h, scale)
+                self.frames.append(img)
+
+        except Exception as e:
+            print(f"Error loading coin: {e}")
+            self.image = pygame.Surface((20, 20))
+            self.image.fill('yellow')
+
+        if not self.frames:
+            self.image = pygame.Surface((20, 20))
+
+        self.z = LAYERS['main']
+        self.reset(groups, pos, value)
+
+    def reset(self, groups: List[pygame.sprite.Group], pos: Tuple[int, int], value: int) -> None:
+        self.add(groups)
+        self.frame_index: float = 0
+        self.value = value
+
+        if self.frames:
+            self.image = self.frames[int(self.frame_index)]
+
+        self.rect = self.image.get_rect(center=pos)
+        self.hitbox = self.rect.inflate(-10, -10)
+
+    @classmethod
+    def spawn(cls, groups: List[pygame.sprite.Group], pos: Tuple[int, int], value: int) -> 'Coin':
+        return cls.pool.acquire(groups, pos, value)
+
+    def kill(self) -> None:
+        if self.alive():
+            super().kill()
+            self.pool.release(self)
+
+    def update(self, dt: float) -> None:
+        self.frame_index += self.animation_speed * dt
+        if self.frame_index >= len(self.frames):
+            self.frame_index = 0
+        self.image = self.frames[int(self.frame_index)]
+
+
+class Projectile(pygame.sprite.Sprite):
+    pool: ObjectPool
+
+    def __init__(self,
+                 pos: Tuple[int, int],
+                 direction: pygame.math.Vector2,
+                 groups: List[pygame.sprite.Group],
+                 obstacles: pygame.sprite.Group,
+                 damage_group: pygame.sprite.Group,
+                 projectile_data: ProjectileData) -> None:
+        super().__init__()
+        self.arrow_hit = assets.sound('audio/arrow_hit.mp3')
+        self.z = LAYERS['main']
+        self.reset(pos, direction, groups, obstacles, damage_group, projectile_data)
+
+    def reset(self,
+              pos: Tuple[int, int],
+              direction: pygame.math.Vector2,
+              groups: List[pygame.sprite.Group],
+              obstacles: pygame.sprite.Group,
+              damage_group: pygame.sprite.Group,
+              projectile_data: ProjectileData) -> None:
+        self.add(groups)
+
+        self.damage = projectile_data.damage
+        self.speed = projectile_data.speed
+        self.lifetime = projectile_data.lifetime
+        self.start_time = sim_clock.get_ticks()
+        self.obstacles = obstacles
+        self.damage_group = damage_group
+
+        try:
+            original_image = assets.sprite(projectile_data.image, *projectile_data.id, scale=projectile_data.scale)
+
+        except (FileNotFoundError, Exception) as e:
+            print(f"Error loading projectile sprite: {e}")
+            original_image = pygame.Surface((20, 5))
+            original_image.fill((200, 200, 200))
+
+        angle = direction.angle_to(pygame.math.Vector2(1, 0))
+        self.image = rotations.get(projectile_data, angle, original_image)
+
+        self.rect = self.image.get_rect(center=pos)
+        self.hitbox = self.rect.inflate(-10, -10)
+
+        self.pos = pygame.math.Vector2(pos)
+        self.direction = direction.normalize()
+
+    @classmethod
+    def spawn(cls,
+              pos: Tuple[int, int],
+              direction: pygame.math.Vector2,
+              groups: List[pygame.sprite.Group],
+              obstacles: pygame.sprite.Group,
+              damage_group: pygame.sprite.Group,
+              projectile_data: ProjectileData) -> 'Projectile':
+        return cls.pool.acquire(pos, direction, groups, obstacles, damage_group, projectile_data)
+
+    #kill moze byc wywolane dwa razy w jednej klatce (sciana i cel), do puli trafia raz
+    def kill(self) -> None:
+        if self.alive():
+            super().kill()
+            self.pool.release(self)
+
+    def update(self, dt: float) -> None:
+        start = pygame.math.Vector2(self.hitbox.center)
+        swept = self.rect.copy()
+        self.pos += self.direction * self.speed * dt
+        self.hitbox.center = (round(self.pos.x), round(self.pos.y))
+        self.rect.center = self.hitbox.center
+        swept.union_ip(self.rect)
+        end = pygame.math.Vector2(self.hitbox.center)
+
+        #test ciagly: odcinek ruchu srodka przeciw prostokatom powiekszonym o rozmiar pocisku,
+        #szybka strzala nie przeleci przez cienka sciane przy niskim FPS
+        wall_time = None
+        for obstacle in self.candidates(self.obstacles, swept):
+            entry = self.sweep(obstacle.rect, start, end)
+            if entry is not None and (wall_time is None or entry < wall_time):
+                wall_time = entry
+
+        hits = []
+        for target in self.candidates(self.damage_group, swept):
+            entry = self.sweep(target.rect, start, end)
+            if entry is not None and (wall_time is None or entry <= wall_time):
+                hits.append((entry, target))
+        hits.sort(key=lambda hit: hit[0])
+
+        for _, target in hits:
+            if self.arrow_hit:
+                self.arrow_hit.play()
+
+            if isinstance(target, Player):
+                target.get_damage(self.damage)
+                self.kill()
+                return
+
+            elif hasattr(target, 'health'):
+                if getattr(target, 'vulnerable', True):
+                    target.health -= self.damage
+                    target.vulnerable = False
+                    target.hit_time = sim_clock.get_ticks()
+
+                    if hasattr(target, 'knockback_direction'):
+                        target.knockback_direction = self.direction.normalize()
+
+                    self.kill()
+                    return
+
+        if wall_time is not None:
+            self.kill()
+
+    @staticmethod
+    def candidates(group: pygame.sprite.Group, area: pygame.Rect) -> List[pygame.sprite.Sprite]:
+        if isinstance(group, SpatialGroup):
+            return group.query(area)
+        return group.sprites()
+
+    #czas wejscia (0..1) odcinka start-end w prostokat powiekszony o rect pocisku, None gdy brak trafienia
+    def sweep(self, rect: pygame.Rect, start: pygame.math.Vector2, end: pygame.math.Vector2) -> Optional[float]:
+        expanded = rect.inflate(self.rect.width, self.rect.height)
+        clipped = expanded.clipline(start, end)
+        if not clipped:
+            return None
+        length = start.distance_to(end)
+        if length == 0:
+            return 0.0
+        return start.distance_to(clipped[0]) / length
+
+
+FloatingText.pool = ObjectPool(FloatingText, TEXT_POOL_LIMIT)
+Coin.pool = ObjectPool(Coin, COIN_POOL_LIMIT)
+Projectile.pool = ObjectPool(Projectile, PROJECTILE_POOL_LIMIT)
+
+
+POOLS: Dict[str, ObjectPool] = {
+    'projectile': Projectile.pool,
+    'coin': Coin.pool,
+    'text': FloatingText.pool
+}
+
+
+class Door(pygame.sprite.Sprite):
+    is_static: bool = True
+
+    def __init__(self, groups: List[pygame.sprite.Group], pos: Tuple[int, int],
+                 obstacles_group: pygame.sprite.Group, sprite_sheet: SpriteSheet,
+                 door_sprites: pygame.sprite.Group, side: str) -> None:
+        super().__init__(groups)
+
+        self.door_sprites = door_sprites
+        self.side = side
+
+        config = DOOR_CONFIG.get(side)
+        if config:
+            self.closed_image = sprite_sheet.get_image(*config['closed'], scale=SCALE_FACTOR)
+            self.open_image = sprite_sheet.get_image(*config['open'], scale=SCALE_FACTOR)
+        else:
+            self.closed_image = pygame.Surface((TILE_SIZE, TILE_SIZE))
+            self.closed_image.fill('brown')
+            self.open_image = pygame.Surface((TILE_SIZE, TILE_SIZE))
+            self.open_image.fill('black')
+
+        self.image = self.closed_image
+        self.rect = self.image.get_rect(topleft=pos)
+        self.hitbox = self.rect.inflate(0, -10)
+        self.z = LAYERS['main']
+
+        self.is_open = False
+        self.obstacles_group = obstacles_group
+        self.obstacles_group.add(self)
+
+        try:
+            self.open_sound = assets.sound('audio/door_open.mp3')
+            self.open_sound.set_volume(0.3)
+        except (FileNotFoundError, Exception):
+            self.open_sound = None
+
+    def toggle(self, from_neighbor: bool = False) -> None:
+        if self.is_open:
+            self.is_open = False
+            self.image = self.closed_image
+            self.obstacles_group.add(self)
+        else:
+            self.is_open = True
+            self.image = self.open_image
+            self.obstacles_group.remove(self)
+            if self.open_sound and not from_neighbor:
+                self.open_sound.play()
+
+        if not from_neighbor:
+            neighbor = self.find_neighbor()
+            if neighbor:
+                neighbor.toggle(from_neighbor=True)
+
+    def find_neighbor(self):
+        offset = 0
+        if self.side == 'left':
+            offset = TILE_SIZE
+        elif self.side == 'right':
+            offset = -TILE_SIZE
+
+        if offset != 0:
+            target_pos = (self.rect.x + offset, self.rect.y)
+            for sprite in self.door_sprites:
+                if sprite.rect.collidepoint(target_pos) and sprite != self:
+                    return sprite
+        return None
+
+
+class Chest(pygame.sprite.Sprite):
+    is_static: bool = True
+
+    def __init__(self, groups: List[pygame.sprite.Group], pos: Tuple[int, int],
+                 obstacles_group: pygame.sprite.Group, sprite_sheet: SpriteSheet,
+                 on_open: Callable[['Player', pygame.math.Vector2, List[pygame.sprite.Group]], None]) -> None:
+        super().__init__(groups)
+
+        self.closed_image = sprite_sheet.get_image(*CHEST_CONFIG['closed'], scale=SCALE_FACTOR)
+        self.open_image = sprite_sheet.get_image(*CHEST_CONFIG['open'], scale=SCALE_FACTOR)
+        self.image = self.closed_image
+        self.rect = self.image.get_rect(topleft=pos)
+        self.hitbox = self.rect.inflate(0, -10)
+        self.z = LAYERS['main']
+
+        self.is_open = False
+
+        self.on_open_callback = on_open
+
+        self.obstacles_group = obstacles_group
+        self.obstacles_group.add(self)
+
+    def open(self, player) -> None:
+        if not self.is_open:
+            self.is_open = True
+            self.image = self.open_image
+            if self.on_open_callback:
+                self.on_open_callback(player, self.rect.midtop, self.groups())
+
+            if hasattr(player, 'coin_sound') and player.coin_sound:
                 player.coin_sound.play()
\ No newline at end of file
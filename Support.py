@@ -1,27 +1,190 @@
-import pygame
-
-def load_font(path: str, size: int) -> pygame.font.Font:
-    try:
-        return pygame.font.Font(path, size)
-    except (FileNotFoundError, OSError):
-        print(f"Warning: Font {path} not found. Loading default system font.")
-        return pygame.font.Font(None, size)
-
-
-class SpriteSheet:
-    def __init__(self, filename: str):
-        self.filename = filename
-        try:
-            self.sheet = pygame.image.load(filename).convert_alpha()
-        except (FileNotFoundError, pygame.error) as e:
-            raise FileNotFoundError(f"Unable to load spritesheet: {filename}") from e
-
-    def get_image(self, col: int, row: int, width: int = 16, height: int = 16, scale: int = 1) -> pygame.Surface:
-        x = col * (width + 1)
-        y = row * (height + 1)
-
-        image = pygame.Surface((width, height), pygame.SRCALPHA)
-        image.blit(self.sheet, (0, 0), (x, y, width, height))
-        image = pygame.transform.scale(image, (int(width * scale), int(height * scale)))
-
-        return image
+import pygame
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from Settings import ASSET_CACHE_LIMIT, ROTATION_STEPS, TEXT_CACHE_SIZE
+
+def load_font(path: str, size: int) -> pygame.font.Font:
+    try:
+        return pygame.font.Font(path, size)
+    except (FileNotFoundError, OSError):
+        print(f"Warning: Font {path} not found. Loading default system font.")
+        return pygame.font.Font(None, size)
+
+
+class SpriteSheet:
+    def __init__(self, filename: str, decoded: Optional[pygame.Surface] = None):
+        self.filename = filename
+        try:
+            self.sheet = (decoded if decoded is not None else pygame.image.load(filename)).convert_alpha()
+        except (FileNotFoundError, pygame.error) as e:
+            raise FileNotFoundError(f"Unable to load spritesheet: {filename}") from e
+
+    def get_image(self, col: int, row: int, width: int = 16, height: int = 16, scale: int = 1) -> pygame.Surface:
+        x = col * (width + 1)
+        y = row * (height + 1)
+
+        image = pygame.Surface((width, height), pygame.SRCALPHA)
+        image.blit(self.sheet, (0, 0), (x, y, width, height))
+        image = pygame.transform.scale(image, (int(width * scale), int(height * scale)))
+
+        return image
+
+
+class AssetCache:
+    #wspolny cache grafik i dzwiekow, kazdy plik/wycinek ladowany tylko raz
+    def __init__(self, max_entries: Optional[int] = None) -> None:
+        self.entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self.max_entries = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def _get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        self.misses += 1
+        value = loader()
+        self.entries[key] = value
+        if self.max_entries is not None and len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return value
+
+    #decoded - plik juz zdekodowany w tle (AssetLoader), tu zostaje tylko konwersja
+    def image(self, path: str, size: Optional[Tuple[int, int]] = None,
+              decoded: Optional[pygame.Surface] = None) -> pygame.Surface:
+        if size is not None:
+            return self._get(('image', path, size),
+                             lambda: pygame.transform.scale(self.image(path, decoded=decoded), size))
+        return self._get(('image', path, None),
+                         lambda: (decoded if decoded is not None else pygame.image.load(path)).convert_alpha())
+
+    def sheet(self, path: str, decoded: Optional[pygame.Surface] = None) -> 'SpriteSheet':
+        return self._get(('sheet', path), lambda: SpriteSheet(path, decoded))
+
+    def sprite(self, path: str, col: int, row: int, width: int = 16, height: int = 16,
+               scale: float = 1) -> pygame.Surface:
+        key = ('sprite', path, col, row, width, height, scale)
+        return self._get(key, lambda: self.sheet(path).get_image(col, row, width, height, scale))
+
+    def sound(self, path: str, decoded: Optional[pygame.mixer.Sound] = None) -> pygame.mixer.Sound:
+        return self._get(('sound', path), lambda: decoded if decoded is not None else pygame.mixer.Sound(path))
+
+    def font(self, path: str, size: int) -> pygame.font.Font:
+        return self._get(('font', path, size), lambda: load_font(path, size))
+
+    def cached(self, key: Hashable) -> bool:
+        return key in self.entries
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class TextCache(AssetCache):
+    #gotowe powierzchnie z tekstem, najdawniej uzywane wypadaja po przekroczeniu limitu
+    def render(self, font_path: str, size: int, text: str, color: Tuple[int, int, int],
+               antialias: bool = False) -> pygame.Surface:
+        key = (font_path, size, text, tuple(color), antialias)
+        return self._get(key, lambda: assets.font(font_path, size).render(text, antialias, color))
+
+
+class TintCache(AssetCache):
+    #podbarwione kopie obrazkow (BLEND_RGB_ADD), wspolne dla wszystkich instancji o tym samym kluczu
+    def overlay(self, size: Tuple[int, int], color: Tuple[int, int, int, int]) -> pygame.Surface:
+        def build() -> pygame.Surface:
+            surface = pygame.Surface(size).convert_alpha()
+            surface.fill(color)
+            return surface
+        return self._get(('overlay', size, tuple(color)), build)
+
+    def tinted(self, key: Hashable, image: pygame.Surface, color: Tuple[int, int, int, int]) -> pygame.Surface:
+        def build() -> pygame.Surface:
+            surface = image.copy()
+            surface.blit(self.overlay(image.get_size(), color), (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+            return surface
+        return self._get(('tinted', key, tuple(color)), build)
+
+
+class RotationAtlas:
+    #obrazki obrocone z gory o N skwantowanych katow, obrot w grze to tylko odczyt z listy
+    def __init__(self, steps: int = ROTATION_STEPS) -> None:
+        self.steps = steps
+        self.step_angle = 360 / steps
+        self.frames: Dict[Hashable, List[pygame.Surface]] = {}
+
+    def build(self, key: Hashable, image: pygame.Surface) -> List[pygame.Surface]:
+        frames = [pygame.transform.rotate(image, i * self.step_angle) for i in range(self.steps)]
+        self.frames[key] = frames
+        return frames
+
+    def step_for(self, angle: float) -> int:
+        return round(angle / self.step_angle) % self.steps
+
+    def get(self, key: Hashable, angle: float, image: Optional[pygame.Surface] = None) -> pygame.Surface:
+        frames = self.frames.get(key)
+        if frames is None:
+            if image is None:
+                raise KeyError(f"No rotations built for {key}")
+            frames = self.build(key, image)
+        return frames[self.step_for(angle)]
+
+
+class SimClock:
+    #czas symulacji w ms, przesuwany o dt co klatke zamiast pygame.time.get_ticks()
+    def __init__(self) -> None:
+        self.time_ms: float = 0.0
+
+    def advance(self, dt: float) -> None:
+        self.time_ms += dt * 1000
+
+    def get_ticks(self) -> int:
+        return int(self.time_ms)
+
+    def reset(self) -> None:
+        self.time_ms = 0.0
+
+
+class ObjectPool:
+    #ponowne uzycie obiektow zamiast tworzenia nowych, klasa musi miec metode reset(*args)
+    def __init__(self, factory: Callable[..., Any], max_free: int) -> None:
+        self.factory = factory
+        self.max_free = max_free
+        self.free: List[Any] = []
+        self.created: int = 0
+        self.reused: int = 0
+        self.dropped: int = 0
+
+    def acquire(self, *args: Any, **kwargs: Any) -> Any:
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args, **kwargs)
+            self.reused += 1
+            return obj
+        self.created += 1
+        return self.factory(*args, **kwargs)
+
+    def release(self, obj: Any) -> None:
+        if len(self.free) < self.max_free:
+            self.free.append(obj)
+        else:
+            self.dropped += 1
+
+    def reuse_rate(self) -> float:
+        total = self.created + self.reused
+        return self.reused / total if total else 0.0
+
+    def stats(self) -> Dict[str, int]:
+        return {'created': self.created, 'reused': self.reused, 'dropped': self.dropped, 'free': len(self.free)}
+
+
+assets = AssetCache(ASSET_CACHE_LIMIT)
+rotations = RotationAtlas(ROTATION_STEPS)
+texts = TextCache(TEXT_CACHE_SIZE)
+tints = TintCache()
+sim_clock = SimClock()
@@ -0,0 +1,249 @@
+import pygame
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+from Settings import TILE_SIZE
+
+
+class OccupancyGrid:
+    #siatka zajetosci kafelkow (1 = sciana), sluzy do szybkiego sprawdzania linii wzroku
+    def __init__(self, width: int, height: int, tile_size: int = TILE_SIZE) -> None:
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.blocked = bytearray(width * height)
+        self.sight_cache: Dict[Tuple[int, int, int, int], bool] = {}
+
+    #siatka wczytana z pliku mapy (MapCache), kopia zeby set_blocked nie zmienial bufora pliku
+    @classmethod
+    def from_blocked(cls, width: int, height: int, blocked: Sequence[int],
+                     tile_size: int = TILE_SIZE) -> 'OccupancyGrid':
+        grid = cls(width, height, tile_size)
+        grid.blocked[:] = blocked
+        return grid
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def set_blocked(self, x: int, y: int, blocked: bool = True) -> None:
+        if self.in_bounds(x, y):
+            self.blocked[y * self.width + x] = 1 if blocked else 0
+            self.sight_cache.clear()
+
+    def is_blocked(self, x: int, y: int) -> bool:
+        if not self.in_bounds(x, y):
+            return False
+        return self.blocked[y * self.width + x] == 1
+
+    def tile_at(self, pos: Tuple[float, float]) -> Tuple[int, int]:
+        return int(pos[0] // self.tile_size), int(pos[1] // self.tile_size)
+
+    def new_frame(self) -> None:
+        self.sight_cache.clear()
+
+    def tile_center(self, tile: Tuple[int, int]) -> Tuple[float, float]:
+        return (tile[0] + 0.5) * self.tile_size, (tile[1] + 0.5) * self.tile_size
+
+    #promien miedzy srodkami kafelkow, wiec wynik dla pary (kafelek startu, kafelek celu) jest dokladny
+    #i nie zalezy od tego, ktory wrog z tego kafelka zapytal pierwszy; zapamietany do konca klatki
+    def line_of_sight(self, start: Tuple[float, float], end: Tuple[float, float]) -> bool:
+        start_tile = self.tile_at(start)
+        end_tile = self.tile_at(end)
+        key = (start_tile[0], start_tile[1], end_tile[0], end_tile[1])
+
+        cached = self.sight_cache.get(key)
+        if cached is None:
+            cached = self.cast_ray(self.tile_center(start_tile), self.tile_center(end_tile))
+            self.sight_cache[key] = cached
+        return cached
+
+    #przejscie po kafelkach wzdluz odcinka (DDA), koszt zalezy tylko od dlugosci promienia
+    def cast_ray(self, start: Tuple[float, float], end: Tuple[float, float]) -> bool:
+        size = self.tile_size
+        x0, y0 = start
+        x1, y1 = end
+        tile_x, tile_y = self.tile_at(start)
+        end_x, end_y = self.tile_at(end)
+
+        dx = x1 - x0
+        dy = y1 - y0
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+
+        if dx != 0:
+            delta_x = size / abs(dx)
+            boundary_x = (tile_x + 1) * size - x0 if dx > 0 else x0 - tile_x * size
+            max_x = boundary_x / abs(dx)
+        else:
+            delta_x = max_x = float('inf')
+
+        if dy != 0:
+            delta_y = size / abs(dy)
+            boundary_y = (tile_y + 1) * size - y0 if dy > 0 else y0 - tile_y * size
+            max_y = boundary_y / abs(dy)
+        else:
+            delta_y = max_y = float('inf')
+
+        while True:
+            if self.is_blocked(tile_x, tile_y):
+                return False
+            if tile_x == end_x and tile_y == end_y:
+                return True
+
+            if max_x < max_y:
+                if max_x > 1:
+                    return True
+                tile_x += step_x
+                max_x += delta_x
+            else:
+                if max_y > 1:
+                    return True
+                tile_y += step_y
+                max_y += delta_y
+
+
+class FlowField:
+    #odleglosci BFS od kafelka gracza po wolnych kafelkach, wspolne dla wszystkich goniacych wrogow
+    NEIGHBOURS: Tuple[Tuple[int, int], ...] = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1))
+
+    def __init__(self, grid: OccupancyGrid, radius: int) -> None:
+        self.grid = grid
+        self.radius = radius
+        self.distance: List[int] = [-1] * (grid.width * grid.height)
+        self.reached: List[int] = []
+        self.target: Optional[Tuple[int, int]] = None
+
+    #bez scinania rogow: ruch po skosie tylko gdy oba sasiednie kafelki sa wolne
+    def can_step(self, x: int, y: int, dx: int, dy: int) -> bool:
+        grid = self.grid
+        nx, ny = x + dx, y + dy
+        if not grid.in_bounds(nx, ny) or grid.is_blocked(nx, ny):
+            return False
+        if dx and dy:
+            return not grid.is_blocked(nx, y) and not grid.is_blocked(x, ny)
+        return True
+
+    #przeliczane tylko gdy gracz zmieni kafelek, czyszczone sa tylko odwiedzone pola
+    def update(self, target: Tuple[int, int]) -> None:
+        if target == self.target:
+            return
+        self.target = target
+
+        distance = self.distance
+        for index in self.reached:
+            distance[index] = -1
+        self.reached = []
+
+        grid = self.grid
+        x, y = target
+        if not grid.in_bounds(x, y) or grid.is_blocked(x, y):
+            return
+
+        width, height = grid.width, grid.height
+        blocked = grid.blocked
+        reached = self.reached
+        start = y * width + x
+        distance[start] = 0
+        reached.append(start)
+        frontier = deque([start])
+        while frontier:
+            index = frontier.popleft()
+            step = distance[index] + 1
+            if step > self.radius:
+                continue
+            x, y = index % width, index // width
+            for dx, dy in self.NEIGHBOURS:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                neighbour = ny * width + nx
+                if distance[neighbour] >= 0 or blocked[neighbour]:
+                    continue
+                if dx and dy and (blocked[y * width + nx] or blocked[ny * width + x]):
+                    continue
+                distance[neighbour] = step
+                reached.append(neighbour)
+                frontier.append(neighbour)
+
+    def next_tile(self, tile: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        grid = self.grid
+        x, y = tile
+        if not grid.in_bounds(x, y):
+            return None
+        current = self.distance[y * grid.width + x]
+        #poza zasiegiem albo tuz przy graczu - wrog idzie prosto na gracza
+        if current <= 1:
+            return None
+        for dx, dy in self.NEIGHBOURS:
+            if self.can_step(x, y, dx, dy) and self.distance[(y + dy) * grid.width + x + dx] == current - 1:
+                return x + dx, y + dy
+        return None
+
+    #gdy prosta droga do gracza tez schodzi w dol pola, zostajemy przy niej (plynny ruch na otwartej przestrzeni)
+    def direction(self, pos: pygame.math.Vector2,
+                  direct: Optional[pygame.math.Vector2] = None) -> Optional[pygame.math.Vector2]:
+        grid = self.grid
+        tile = grid.tile_at(pos)
+        next_tile = self.next_tile(tile)
+        if next_tile is None:
+            return None
+
+        if direct is not None:
+            ahead = grid.tile_at(pos + direct * grid.tile_size)
+            dx, dy = ahead[0] - tile[0], ahead[1] - tile[1]
+            current = self.distance[tile[1] * grid.width + tile[0]]
+            if (dx or dy) and abs(dx) <= 1 and abs(dy) <= 1 and self.can_step(tile[0], tile[1], dx, dy):
+                if self.distance[ahead[1] * grid.width + ahead[0]] == current - 1:
+                    return direct
+
+        size = grid.tile_size
+        steering = pygame.math.Vector2((next_tile[0] + 0.5) * size, (next_tile[1] + 0.5) * size) - pos
+        if steering.length_squared() == 0:
+            return None
+        return steering.normalize()
+
+
+class TileMap:
+    #warstwy mapy jako tablice indeksow kafelkow (0 = pusto), jedna powierzchnia na rozny kafelek
+    def __init__(self, width: int, height: int, surfaces: Sequence[Optional[pygame.Surface]],
+                 tile_size: int = TILE_SIZE) -> None:
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.surfaces = surfaces
+        self.layers: Dict[int, List[Sequence[int]]] = {}
+
+    def add_layer(self, z: int, tiles: Sequence[int]) -> None:
+        self.layers.setdefault(z, []).append(tiles)
+
+    def visible_range(self, offset: pygame.math.Vector2, view_width: int,
+                      view_height: int) -> Tuple[int, int, int, int]:
+        size = self.tile_size
+        first_x = max(0, int(offset.x // size))
+        first_y = max(0, int(offset.y // size))
+        last_x = min(self.width - 1, int((offset.x + view_width - 1) // size))
+        last_y = min(self.height - 1, int((offset.y + view_height - 1) // size))
+        return first_x, first_y, last_x, last_y
+
+    #koszt zalezy tylko od rozmiaru ekranu, nie od rozmiaru mapy
+    def draw(self, screen: pygame.Surface, z: int, offset: pygame.math.Vector2) -> None:
+        layers = self.layers.get(z)
+        if not layers:
+            return
+
+        size = self.tile_size
+        width = self.width
+        surfaces = self.surfaces
+        first_x, first_y, last_x, last_y = self.visible_range(offset, *screen.get_size())
+        origin_x = int(offset.x)
+        origin_y = int(offset.y)
+
+        blits = []
+        for tiles in layers:
+            for y in range(first_y, last_y + 1):
+                row = y * width
+                screen_y = y * size - origin_y
+                for x in range(first_x, last_x + 1):
+                    tile = tiles[row + x]
+                    if tile:
+                        blits.append((surfaces[tile], (x * size - origin_x, screen_y)))
+        screen.blits(blits, False)